@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+bench_translate.py — speed/accuracy check for translate_prop_prob.
+
+    python3 bench_translate.py            # default 20000 translations
+    python3 bench_translate.py 100000
+
+Replays a fixed, seeded workload of off-line prop translations (normal and
+Poisson stats) through the original 60-step bisection kernel and through
+web_arbitrage's kernel, then reports:
+  - kernel: the numeric step alone, every quote evaluated from scratch —
+            ref_kernel (bisection) vs wa._xlate_eval, both handed the
+            quote's precomputed line-pair inputs, no per-quote memo on
+            either side. This is the number the gate is on.
+  - cold:   translate_prop_prob end to end with a fresh LRU: the kernel
+            plus the guards and the LRU bookkeeping (~0.5us a miss here),
+            which no kernel can remove. Shown, not gated.
+  - rescan: the same slate again (what every scan after the first does
+            while the snapshot is unchanged): LRU hits, not gated.
+  - max |difference| vs the reference, gated for both kernel and cold.
+Line-pair plans and Poisson tables are per line pair, not per quote; they
+are built once before timing, as a running process has them.
+Exits non-zero unless results agree to 1e-12 and the kernel is
+>= MIN_SPEEDUP x the reference (default 50).
+Nothing touches the network or the DB beyond importing the app.
+"""
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault('DISABLE_CLV_WORKER', '1')
+import web_arbitrage as wa
+
+N = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+MIN_SPEEDUP = float(os.environ.get('MIN_SPEEDUP', '50'))   # kernel vs reference kernel
+
+
+# ---- reference kernel: the original 60-step bisections ----
+def ref_phi_inv(p):
+    p = min(max(p, 1e-9), 1 - 1e-9)
+    lo, hi = -8.0, 8.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if wa._phi(mid) < p:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2
+
+
+def ref_translate(market_key, from_line, over_prob, to_line):
+    if from_line == to_line:
+        return over_prob
+    spec = wa.PROP_DIST.get(market_key)
+    if not spec:
+        return None
+    if not (0.05 < over_prob < 0.95):
+        return None
+    ref = max(abs(from_line), abs(to_line), 3.0)
+    if abs(from_line - to_line) > wa.MAX_TRANSLATE_FRAC * ref:
+        return None
+    shape, cv = spec
+    if shape != 'normal' and (abs(from_line % 1 - 0.5) > 0.01 or abs(to_line % 1 - 0.5) > 0.01):
+        return None
+    return ref_kernel(shape, cv, from_line, over_prob, to_line)
+
+
+def ref_kernel(shape, cv, from_line, over_prob, to_line):
+    """The numeric part of ref_translate, after its guards."""
+    if shape == 'normal':
+        z = ref_phi_inv(1.0 - over_prob)
+        denom = 1.0 + z * cv
+        if denom < 0.25:
+            return None
+        mu = from_line / denom
+        if mu <= 0:
+            return None
+        sigma = cv * mu
+        return max(0.0, min(1.0, 1.0 - wa._phi((to_line - mu) / sigma)))
+    k1, k2 = int(from_line) + 1, int(to_line) + 1
+    lo, hi = 0.01, 80.0
+    for _ in range(60):
+        lam = (lo + hi) / 2
+        if wa._pois_sf(lam, k1) < over_prob:
+            lo = lam
+        else:
+            hi = lam
+    return wa._pois_sf((lo + hi) / 2, k2)
+
+
+def workload(n, seed=7):
+    """Quotes as a prop slate produces them: devigged two-way prices at a
+    book's line, translated to a neighbouring line."""
+    rnd = random.Random(seed)
+    normal = [('player_points', 8.5, 34.5), ('player_rebounds', 3.5, 13.5),
+              ('player_assists', 2.5, 10.5), ('player_pass_yds', 180.5, 300.5),
+              ('player_rush_yds', 30.5, 100.5)]
+    pois = [('player_strikeouts', 3.5, 9.5), ('player_receptions', 1.5, 8.5),
+            ('player_shots_on_goal', 1.5, 5.5), ('player_total_bases', 0.5, 2.5)]
+    out = []
+    for _ in range(n):
+        mk, lo, hi = rnd.choice(normal + pois)
+        frm = rnd.randint(int(lo), int(hi)) + 0.5
+        to = frm + rnd.choice((-2, -1, 1, 2)) * (1 if mk in dict((p[0], 0) for p in pois) or frm < 40 else 5)
+        ov = wa.american_to_implied(rnd.randint(-180, 150))
+        un = wa.american_to_implied(rnd.randint(-180, 150))
+        out.append((mk, frm, ov / (ov + un), to))
+    return out
+
+
+def timed(fn, work, reps=3):
+    """Best of `reps` passes (each starting from a cleared cache when fn is
+    the memoized translate_prop_prob) — this box's timer noise swamps
+    single runs."""
+    best, res = None, None
+    for _ in range(reps):
+        if fn is wa.translate_prop_prob:
+            wa.translate_prop_prob.cache_clear()
+        t0 = time.perf_counter()
+        res = [fn(*w) for w in work]
+        t = time.perf_counter() - t0
+        best = t if best is None else min(best, t)
+    return best, res
+
+
+def main():
+    work = workload(N)
+    t_ref_all, ref_all = timed(ref_translate, work)
+    # the guards (unknown stat, hop too far, extreme quote) cost the same in
+    # both; time the translations that actually run the numeric kernel
+    work = [w for w, r in zip(work, ref_all) if r is not None]
+    n = len(work)
+    ref_in = [(*wa.PROP_DIST[mk], frm, p, to) for mk, frm, p, to in work]
+    plans = [(wa._xlate_plan(mk, frm, to), p) for mk, frm, p, to in work]
+    t_ref, ref = timed(ref_translate, work)
+    t_rk, ref_k = timed(ref_kernel, ref_in)
+    t_k, kern = timed(wa._xlate_eval, plans)
+    t_cold, cold = timed(wa.translate_prop_prob, work)
+    t0 = time.perf_counter()
+    warm = [wa.translate_prop_prob(*w) for w in work]
+    t_warm = time.perf_counter() - t0
+
+    err = max(abs(r - c) for r, c in zip(ref, cold))
+    err_k = max(abs(r - c) for r, c in zip(ref_k, kern))
+    print(f"{N} translations, {n} through the numeric kernel")
+    print(f"  kernel, reference   : {t_rk * 1e6 / n:8.2f} us/call")
+    print(f"  kernel, _xlate_eval : {t_k * 1e6 / n:8.2f} us/call  {t_rk / t_k:6.1f}x")
+    print(f"  reference bisection : {t_ref * 1e6 / n:8.2f} us/call  (with guards)")
+    print(f"  cold (fresh cache)  : {t_cold * 1e6 / n:8.2f} us/call  {t_ref / t_cold:6.1f}x"
+          "  (kernel + guards + LRU miss, not gated)")
+    print(f"  rescan (cache warm) : {t_warm * 1e6 / n:8.2f} us/call  {t_ref / t_warm:6.1f}x"
+          "  (LRU hits, not gated)")
+    print(f"  max |diff| vs ref   : {max(err, err_k):.2e}")
+    ok = max(err, err_k) < 1e-12 and warm == cold and t_rk / t_k >= MIN_SPEEDUP
+    print('  OK' if ok else f"  FAILED (need max diff < 1e-12 and kernel >= {MIN_SPEEDUP:g}x; "
+                          f"kernel is {t_rk / t_k:.1f}x)")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,7 +9,11 @@ your home IP looks like a normal customer. The worker:
 
   1. fetches all providers locally (providers.py),
   2. POSTs the merged snapshot to  {APP_URL}/api/ingest?key=SCAN_KEY
-  3. triggers a scan via            {APP_URL}/api/scan?key=SCAN_KEY
+     (after the first full push, only a delta against the version the
+     app last acknowledged; a 409 from the app triggers a full resync),
+  3. has the app re-analyze just the games that changed
+     (/api/ingest?scan=incremental), or with WORKER_SCAN=full triggers
+     a full scan via                {APP_URL}/api/scan?key=SCAN_KEY
   4. sleeps, repeats.
 
 The web app then serves opportunities from the ingested snapshot —
@@ -20,6 +24,10 @@ Env / flags:
   SCAN_KEY         same key the app uses for /api/scan           (required)
   WORKER_SPORTS    csv, default: all configured sports
   WORKER_INTERVAL  seconds between cycles, default 300
+  WORKER_ENCODING  columnar (default) | json   — body layout for /api/ingest
+  WORKER_COMPRESS  zstd | gzip | none          — default zstd if the
+                   `zstandard` package is installed, else gzip
+  WORKER_SCAN      incremental (default) | full
   --once           single cycle, then exit (good for cron / Task Scheduler)
 
 Example:
@@ -74,8 +82,12 @@ APP_URL, SCAN_KEY = _load_config()
 SPORTS = [s for s in os.environ.get('WORKER_SPORTS', '').split(',') if s] \
     or list(P.SPORTS.keys())
 INTERVAL = int(os.environ.get('WORKER_INTERVAL', '300'))
+COLUMNAR = os.environ.get('WORKER_ENCODING', 'columnar') != 'json'
+COMPRESS = os.environ.get('WORKER_COMPRESS', 'zstd' if P._zstd else 'gzip')
+INCREMENTAL = os.environ.get('WORKER_SCAN', 'incremental') != 'full'
 ONCE = '--once' in sys.argv
 _MGM_ANNOUNCED = [False]
+_acked = [None]   # last payload the app acknowledged (base for deltas)
 
 
 def log(msg):
@@ -98,21 +110,43 @@ def _announce_mgm():
         log('=' * 62)
 
 
+def _push(sess, payload, n_games, kind):
+    body, headers = P.encode_ingest_body(payload, columnar=COLUMNAR,
+                                         compression=COMPRESS)
+    log(f"snapshot: {n_games} games, {kind} {len(body)//1024} KB "
+        f"({headers['Content-Type'].split('/')[-1]}, "
+        f"{headers.get('Content-Encoding', 'uncompressed')})")
+    params = {'key': SCAN_KEY}
+    if INCREMENTAL:
+        params['scan'] = 'incremental'
+    r = sess.post(f"{APP_URL}/api/ingest", params=params,
+                  data=body, headers=headers, timeout=60)
+    log(f"ingest -> {r.status_code} {r.text[:120]}")
+    return r
+
+
 def cycle(sess):
     payload = P.snapshot_payload(SPORTS, log=log)
     _announce_mgm()
     n_games = sum(len(v['games']) for v in payload['sports'].values())
-    body = json.dumps(payload)
-    log(f"snapshot: {n_games} games, {len(body)//1024} KB")
     if n_games == 0:
         log("nothing fetched — skipping push (check smoke_test.py)")
         return
 
-    r = sess.post(f"{APP_URL}/api/ingest", params={'key': SCAN_KEY},
-                  data=body, headers={'Content-Type': 'application/json'},
-                  timeout=60)
-    log(f"ingest -> {r.status_code} {r.text[:120]}")
+    r = None
+    if _acked[0] is not None:
+        r = _push(sess, P.snapshot_delta(_acked[0], payload), n_games, 'delta')
+        if r.status_code == 409:
+            log("app is on a different snapshot version — full resync")
+            r = None
+    if r is None:
+        r = _push(sess, payload, n_games, 'full')
+    if r.status_code != 200:
+        _acked[0] = None
     r.raise_for_status()
+    _acked[0] = payload
+    if INCREMENTAL:
+        return
 
     r = sess.post(f"{APP_URL}/api/scan", params={'key': SCAN_KEY},
                   timeout=300)
@@ -17,22 +17,33 @@ so web_arbitrage.py's analysis code runs unchanged.
 Notes:
 - These are the books' own public website JSON endpoints. They serve them
   to every browser, but automated access is technically against their ToS.
-  Polite pacing (RATE_DELAY) is enforced. If a host starts 403'ing your
+  Polite pacing (RATE_DELAY) is enforced per host. If a host starts 403'ing your
   server IP (datacenter IPs sometimes are), run fetch_worker.py from a
   residential connection and POST snapshots to /api/ingest instead.
 - Endpoints drift occasionally. Run smoke_test.py after any silence.
 """
 
+import functools
+import gzip
 import json
 import os
 import re
 import time
 import threading
 import unicodedata
+import zlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from datetime import datetime, timezone
+from urllib.parse import urlsplit
 
 import requests
 
+# zstd is optional for /api/ingest bodies; gzip (stdlib) always works
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
 # ============================================================
 # CONFIG
 # ============================================================
@@ -42,9 +53,16 @@ ENABLED = os.environ.get('DIRECT_FEEDS', '1') != '0'
 UA = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) '
       'AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36')
 
-RATE_DELAY = float(os.environ.get('FEED_RATE_DELAY', '0.4'))   # s between HTTP calls
+RATE_DELAY = float(os.environ.get('FEED_RATE_DELAY', '0.4'))   # s between calls to ONE host
+FEED_WORKERS = int(os.environ.get('FEED_WORKERS', '20'))       # concurrent provider fetches (5 books x 4 scan stages)
+FEED_PARALLEL = os.environ.get('FEED_PARALLEL', '1') != '0'    # fan books out at once
+FEED_DEADLINE = float(os.environ.get('FEED_PROVIDER_DEADLINE', '15'))  # s per book, parallel mode
+FEED_QUEUE_WAIT = float(os.environ.get('FEED_QUEUE_WAIT', '5'))  # s a book may wait for a pool slot (capped at FEED_DEADLINE)
 SNAPSHOT_TTL = int(os.environ.get('FEED_SNAPSHOT_TTL', '55'))  # s
+STALE_MAX = int(os.environ.get('FEED_STALE_MAX', '600'))  # s past TTL a snapshot is served while refreshing
 PROP_EVENT_LIMIT = int(os.environ.get('FEED_PROP_EVENTS', '8'))  # FD event-page calls per sport
+INGEST_MAX_BYTES = int(os.environ.get('INGEST_MAX_BYTES', str(64 << 20)))  # decoded body cap
+NORM_CACHE_SIZE = int(os.environ.get('FEED_NORM_CACHE', '20000'))  # memoized names per normalizer
 
 # Pinnacle guest key: public, embedded in pinnacle.com's own JS for years.
 PINNACLE_KEY = os.environ.get('PINNACLE_GUEST_KEY', 'CmX2KcMrXuFmNg6YFbmTxE0y9CIrOi0R')
@@ -181,16 +199,34 @@ PROVIDER_TITLES = {
 _session = requests.Session()
 _session.headers.update({'User-Agent': UA, 'Accept': 'application/json',
                          'Accept-Language': 'en-US,en;q=0.9'})
-_last_call = [0.0]
-_http_lock = threading.Lock()
+# Pacing is per host: each book gets its own RATE_DELAY spacing, so
+# Pinnacle, DK, FD, MGM and Kambi are fetched side by side instead of
+# queueing behind one process-wide lock.
+_host_gates = {}   # netloc -> {'lock': Lock, 'last': epoch of last call}
+_host_gates_lock = threading.Lock()
+
+# Bounded pool the providers run on (see build_sport). Provider functions
+# must never submit to it themselves, or a full pool deadlocks.
+_feed_pool = ThreadPoolExecutor(max_workers=max(1, FEED_WORKERS),
+                                thread_name_prefix='feed')
+
+
+def _pace(url, delay=None):
+    """Block until `url`'s host may be called again, then claim the slot."""
+    host = urlsplit(url).netloc
+    with _host_gates_lock:
+        gate = _host_gates.get(host)
+        if gate is None:
+            gate = _host_gates[host] = {'lock': threading.Lock(), 'last': 0.0}
+    with gate['lock']:
+        wait = (RATE_DELAY if delay is None else delay) - (time.time() - gate['last'])
+        if wait > 0:
+            time.sleep(wait)
+        gate['last'] = time.time()
 
 
 def _get_json(url, headers=None, params=None, timeout=20):
-    with _http_lock:
-        wait = RATE_DELAY - (time.time() - _last_call[0])
-        if wait > 0:
-            time.sleep(wait)
-        _last_call[0] = time.time()
+    _pace(url)
     try:
         r = _session.get(url, headers=headers or {}, params=params, timeout=timeout)
         if r.status_code != 200:
@@ -254,13 +290,28 @@ _SOCCER_ALIASES = {
 }
 
 
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9 ]')
+_NON_ALPHA_RE = re.compile(r'[^a-z ]')
+_WS_RE = re.compile(r'\s+')
+_SOCCER_AFFIX_RE = re.compile(r'\b(fc|cf|sc|afc|national team)\b')
+
+# The same few hundred team/player strings come through every build, once per
+# outcome row, so the normalizers are memoized (bounded LRU; hit/miss counts
+# surface in /api/feed-status via norm_cache_stats()).
+
+
 def _team_key(name, soccer=False):
-    s = _strip_accents(str(name)).lower().strip()
-    s = re.sub(r'[^a-z0-9 ]', '', s)
-    s = re.sub(r'\s+', ' ', s).strip()
+    return _team_key_cached(str(name), bool(soccer))
+
+
+@functools.lru_cache(maxsize=NORM_CACHE_SIZE)
+def _team_key_cached(name, soccer):
+    s = _strip_accents(name).lower().strip()
+    s = _NON_ALNUM_RE.sub('', s)
+    s = _WS_RE.sub(' ', s).strip()
     if soccer:
-        s = re.sub(r'\b(fc|cf|sc|afc|national team)\b', '', s).strip()
-        s = re.sub(r'\s+', ' ', s).strip()
+        s = _SOCCER_AFFIX_RE.sub('', s).strip()
+        s = _WS_RE.sub(' ', s).strip()
         return _SOCCER_ALIASES.get(s, s)
     toks = s.split()
     if not toks:
@@ -272,10 +323,15 @@ def _team_key(name, soccer=False):
 
 def _full_toks(name, soccer=False):
     """Full normalized token set of a team name (for fuzzy bucket matching)."""
-    s = _strip_accents(str(name)).lower()
-    s = re.sub(r'[^a-z0-9 ]', '', s)
+    return _full_toks_cached(str(name), bool(soccer))
+
+
+@functools.lru_cache(maxsize=NORM_CACHE_SIZE)
+def _full_toks_cached(name, soccer):
+    s = _strip_accents(name).lower()
+    s = _NON_ALNUM_RE.sub('', s)
     if soccer:
-        s = re.sub(r'\b(fc|cf|sc|afc|national team)\b', '', s)
+        s = _SOCCER_AFFIX_RE.sub('', s)
     return frozenset(t for t in s.split() if t)
 
 
@@ -302,9 +358,27 @@ def _sides_match(toks_a, key_a, toks_b, key_b):
 
 
 def _norm_player(name):
-    s = _strip_accents(str(name)).lower()
-    s = re.sub(r'[^a-z ]', '', s)
-    return re.sub(r'\s+', ' ', s).strip()
+    return _norm_player_cached(str(name))
+
+
+@functools.lru_cache(maxsize=NORM_CACHE_SIZE)
+def _norm_player_cached(name):
+    s = _strip_accents(name).lower()
+    s = _NON_ALPHA_RE.sub('', s)
+    return _WS_RE.sub(' ', s).strip()
+
+
+def norm_cache_stats():
+    """Hit/miss counters of the memoized name normalizers."""
+    out = {}
+    for label, fn in (('team_key', _team_key_cached), ('full_toks', _full_toks_cached),
+                      ('norm_player', _norm_player_cached)):
+        ci = fn.cache_info()
+        total = ci.hits + ci.misses
+        out[label] = {'hits': ci.hits, 'misses': ci.misses, 'size': ci.currsize,
+                      'maxsize': ci.maxsize,
+                      'hit_rate': round(ci.hits / total, 3) if total else None}
+    return out
 
 
 def _parse_ts(val):
@@ -1155,13 +1229,43 @@ _CANON_ORDER = ['pinnacle', 'draftkings', 'fanduel', 'betmgm', 'betrivers']
 # MERGE -> The Odds API v4 shape
 # ============================================================
 
+_SLOT = 8 * 3600   # kickoff tolerance for one fixture across books
+
+
 def _merge_to_v4(sport_key, per_book, log=print):
     soccer = SPORTS[sport_key].get('soccer', False)
     merged = {}    # pair-key -> bucket (several keys may alias one bucket)
     buckets = []   # unique buckets, creation order
+    # Fuzzy-match index: (term, kickoff slot) -> bucket positions, where term
+    # is ('k', team key) or ('t', name token) from either side and the slot
+    # is ts // _SLOT (None if the bucket has no kickoff yet). Any bucket that
+    # can pass _sides_match shares a key or a token with the incoming team,
+    # and any bucket that can pass _ts_ok sits in an adjacent slot.
+    idx = {}
+    idx_any = {}   # term -> positions, all slots (incoming game with no ts)
 
     def _ts_ok(a, b):
-        return a is None or b is None or abs(a - b) <= 8 * 3600
+        return a is None or b is None or abs(a - b) <= _SLOT
+
+    def _index(i):
+        b = buckets[i]
+        slot = None if b['ts'] is None else int(b['ts'] // _SLOT)
+        terms = [('k', b['home_key']), ('k', b['away_key'])]
+        terms += [('t', t) for t in b['home_toks']]
+        terms += [('t', t) for t in b['away_toks']]
+        for term in terms:
+            idx.setdefault((term, slot), set()).add(i)
+            idx_any.setdefault(term, set()).add(i)
+
+    def _fuzzy_pool(hk, htoks, ts):
+        terms = [('k', hk)] + [('t', t) for t in htoks]
+        if ts is None:
+            found = set().union(*(idx_any.get(t, ()) for t in terms))
+        else:
+            s = int(ts // _SLOT)
+            found = set().union(*(idx.get((t, sl), ())
+                                  for t in terms for sl in (s - 1, s, s + 1, None)))
+        return [buckets[i] for i in sorted(found)]
 
     def _bucket_for(g):
         """Return (bucket, aligned) where aligned=True means g.home
@@ -1173,14 +1277,16 @@ def _merge_to_v4(sport_key, per_book, log=print):
         pair = frozenset((hk, ak))
         b = merged.get(pair)
         if b is not None and not _ts_ok(g['ts'], b['ts']):
-            pair = (pair, int(g['ts'] // (8 * 3600)))
+            pair = (pair, int(g['ts'] // _SLOT))
             b = merged.get(pair)
         if b is not None:
             return b, (hk == b['home_key'] or ak == b['away_key'])
         # Fuzzy fallback: city-only vs nickname vs full names.
         # Merge only if exactly one candidate matches (ambiguity -> new bucket).
+        # The home side must match one side of any candidate, so the index
+        # lookup on it alone is a superset of the full scan's hits.
         cands = []
-        for cb in buckets:
+        for cb in _fuzzy_pool(hk, htoks, g['ts']):
             if not _ts_ok(g['ts'], cb['ts']):
                 continue
             if (_sides_match(htoks, hk, cb['home_toks'], cb['home_key']) and
@@ -1198,13 +1304,15 @@ def _merge_to_v4(sport_key, per_book, log=print):
             else:
                 b['home_toks'] |= atoks
                 b['away_toks'] |= htoks
+            _index(b['pos'])
             return b, aligned
         b = {'home': g['home'], 'away': g['away'],
              'home_key': hk, 'away_key': ak,
              'home_toks': set(htoks), 'away_toks': set(atoks),
-             'ts': g['ts'], 'canon_rank': 99, 'books': {}}
+             'ts': g['ts'], 'canon_rank': 99, 'books': {}, 'pos': len(buckets)}
         merged[pair] = b
         buckets.append(b)
+        _index(b['pos'])
         return b, True
 
     for book, games in per_book.items():
@@ -1214,6 +1322,7 @@ def _merge_to_v4(sport_key, per_book, log=print):
             if b is None:
                 continue
             hk, ak = _team_key(g['home'], soccer), _team_key(g['away'], soccer)
+            reindex = False
             if rank < b['canon_rank']:
                 if aligned:
                     b['home'], b['away'] = g['home'], g['away']
@@ -1222,8 +1331,12 @@ def _merge_to_v4(sport_key, per_book, log=print):
                     b['home'], b['away'] = g['away'], g['home']
                     b['home_key'], b['away_key'] = ak, hk
                 b['canon_rank'] = rank
-            if b['ts'] is None:
+                reindex = True
+            if b['ts'] is None and g['ts'] is not None:
                 b['ts'] = g['ts']
+                reindex = True
+            if reindex:
+                _index(b['pos'])
             # this game's own keys -> bucket canonical names
             if aligned:
                 name_map = {hk: b['home'], ak: b['away']}
@@ -1308,106 +1421,597 @@ def _merge_to_v4(sport_key, per_book, log=print):
 # ============================================================
 
 _snap_lock = threading.Lock()
-_snapshots = {}   # sport_key -> {'ts': epoch, 'games': [...], 'source': 'direct'|'ingest'}
+_snapshots = {}   # sport_key -> {'ts': epoch, 'games': [...], 'source': 'direct'|'ingest',
+#                                 'books': {provider: 'ok'|'empty'|'late'|'error'},
+#                                 'index': _index_games(games)}
+_inflight = {}    # sport_key -> threading.Event set when its running build finishes
+_changes = {}     # sport_key -> ids of games added/changed/removed since take_changes()
+#                   (None = treat the whole sport as changed)
+_pending = []     # (sport_key, ids) not yet delivered to _listeners
+_listeners = []   # see subscribe()
+
+
+def _fetch_serial(sport_key, log):
+    per_book, books = {}, {}
+    for name, fn in PROVIDERS:
+        try:
+            per_book[name] = fn(sport_key, log=log)
+            books[name] = 'ok' if per_book[name] else 'empty'
+        except Exception as e:
+            log(f'    {name}: error {str(e)[:80]}')
+            per_book[name] = []
+            books[name] = 'error'
+    return per_book, books
+
+
+def _fetch_parallel(sport_key, log):
+    """Run every provider at once on the feed pool (each book is its own
+    host, so per-host pacing keeps them polite) and give each FEED_DEADLINE
+    seconds from the moment its task starts running — time spent queued
+    behind other sports' builds on the shared pool doesn't count. A book
+    that misses it is merged as empty and marked 'late'; its thread
+    finishes in the background and the result is dropped. A book still
+    queued after FEED_QUEUE_WAIT (never more than FEED_DEADLINE) is
+    cancelled and marked 'late' too, so no book holds a build up longer
+    than 2 x FEED_DEADLINE from submit — abandoned fetches still hanging
+    on pool slots can't stretch that."""
+    started = {name: threading.Event() for name, _fn in PROVIDERS}
+    t_start = {}
+
+    def run(name, fn):
+        t_start[name] = time.time()
+        started[name].set()
+        return fn(sport_key, log=log)
+
+    futs = [(name, _feed_pool.submit(run, name, fn)) for name, fn in PROVIDERS]
+    queue_cap = time.time() + min(FEED_QUEUE_WAIT, FEED_DEADLINE)
+    per_book, books = {}, {}
+    for name, fut in futs:
+        try:
+            if not started[name].wait(max(0.0, queue_cap - time.time())) and fut.cancel():
+                raise FutureTimeout()
+            started[name].wait()          # cancel() lost the race: it is running now
+            deadline = t_start[name] + FEED_DEADLINE
+            per_book[name] = fut.result(timeout=max(0.0, deadline - time.time()))
+            books[name] = 'ok' if per_book[name] else 'empty'
+        except FutureTimeout:
+            log(f'    {name}: no answer within {FEED_DEADLINE:.0f}s — merging without it')
+            per_book[name] = []
+            books[name] = 'late'
+        except Exception as e:
+            log(f'    {name}: error {str(e)[:80]}')
+            per_book[name] = []
+            books[name] = 'error'
+    return per_book, books
 
 
 def build_sport(sport_key, log=print, force=False):
+    """Current games for a sport. Only one build per sport runs at a time;
+    concurrent callers wait on it instead of refetching every book. A snapshot
+    past SNAPSHOT_TTL (but within STALE_MAX of it) is returned immediately
+    while the refresh runs in the background (stale-while-revalidate)."""
     if sport_key not in SPORTS:
         return []
     with _snap_lock:
         cur = _snapshots.get(sport_key)
-        if cur and not force and time.time() - cur['ts'] < SNAPSHOT_TTL:
+        age = time.time() - cur['ts'] if cur else None
+        if cur and not force and age < SNAPSHOT_TTL:
             return cur['games']
-    log(f'  [direct feeds] building {sport_key}')
-    per_book = {}
-    for name, fn in PROVIDERS:
-        try:
-            per_book[name] = fn(sport_key, log=log)
-        except Exception as e:
-            log(f'    {name}: error {str(e)[:80]}')
-            per_book[name] = []
-    games = _merge_to_v4(sport_key, per_book, log=log)
+        done = _inflight.get(sport_key)
+        leader = done is None
+        if leader:
+            done = _inflight[sport_key] = threading.Event()
+        stale_ok = cur and not force and age < SNAPSHOT_TTL + STALE_MAX
+    if stale_ok:
+        if leader:
+            threading.Thread(target=_run_build, args=(sport_key, done, log),
+                             daemon=True).start()
+        return cur['games']
+    if leader:
+        return _run_build(sport_key, done, log)
+    done.wait(120)
     with _snap_lock:
-        # don't clobber a fresher externally-ingested snapshot with nothing
         cur = _snapshots.get(sport_key)
-        if games or not cur or cur.get('source') != 'ingest':
-            _snapshots[sport_key] = {'ts': time.time(), 'games': games,
-                                     'source': 'direct'}
-    return games
+    return cur['games'] if cur else []
 
 
-def _filter_market(games, market):
-    out = []
+def _run_build(sport_key, done, log):
+    try:
+        log(f'  [direct feeds] building {sport_key}')
+        per_book, books = (_fetch_parallel if FEED_PARALLEL else _fetch_serial)(sport_key, log)
+        games = _merge_to_v4(sport_key, per_book, log=log)
+        with _snap_lock:
+            # don't clobber a fresher externally-ingested snapshot with nothing
+            cur = _snapshots.get(sport_key)
+            if games or not cur or cur.get('source') != 'ingest':
+                _store_snapshot(sport_key, _snapshot_entry(games, 'direct', books=books))
+        _notify_pending()
+        return games
+    except Exception as e:
+        log(f'  [direct feeds] {sport_key} build failed: {str(e)[:80]}')
+        return []
+    finally:
+        with _snap_lock:
+            _inflight.pop(sport_key, None)
+        done.set()
+
+
+def _index_games(games):
+    """One pass over a slate -> everything the drop-in API serves:
+      by_id:   event_id -> game
+      markets: market -> {'games': [per-game view], 'by_id': {event_id: view}}
+      events:  the /events listing
+    A view is the game with only that market's book blocks (books without
+    it dropped), built once per build/ingest instead of filtering the whole
+    slate on every fetch_* call. Treat views as read-only: they are shared
+    by every caller until the next snapshot."""
+    by_id, markets, events = {}, {}, []
     for g in games:
-        bks = []
+        gid = g.get('id')
+        by_id.setdefault(gid, g)
+        events.append({'id': gid, 'sport_key': g.get('sport_key'),
+                       'commence_time': g.get('commence_time'),
+                       'home_team': g.get('home_team'), 'away_team': g.get('away_team')})
+        per_mkt = {}     # market -> [book blocks], book order preserved
         for bk in g.get('bookmakers', []):
-            ms = [m for m in bk.get('markets', []) if m.get('key') == market]
-            if ms:
-                bks.append({'key': bk['key'], 'title': bk.get('title', bk['key']),
-                            'markets': ms})
-        if bks:
+            grouped = {}
+            for m in bk.get('markets', []):
+                grouped.setdefault(m.get('key'), []).append(m)
+            for mkey, ms in grouped.items():
+                per_mkt.setdefault(mkey, []).append(
+                    {'key': bk['key'], 'title': bk.get('title', bk['key']),
+                     'markets': ms})
+        for mkey, bks in per_mkt.items():
             ng = dict(g)
             ng['bookmakers'] = bks
-            out.append(ng)
+            view = markets.setdefault(mkey, {'games': [], 'by_id': {}})
+            view['games'].append(ng)
+            view['by_id'].setdefault(gid, ng)
+    return {'by_id': by_id, 'markets': markets, 'events': events}
+
+
+def _snapshot_entry(games, source, **extra):
+    entry = {'ts': time.time(), 'games': games, 'source': source,
+             'index': _index_games(games)}
+    entry.update(extra)
+    return entry
+
+
+def _store_snapshot(sport_key, entry):
+    """Install a snapshot (caller holds _snap_lock) and note which game ids
+    differ from the one it replaces, for incremental scans and subscribers
+    (delivered by _notify_pending once the lock is released)."""
+    cur = _snapshots.get(sport_key)
+    _snapshots[sport_key] = entry
+    ids = None
+    if cur is not None:
+        old = cur['index']['by_id']
+        new = entry['index']['by_id']
+        ids = {gid for gid, g in new.items() if old.get(gid) != g}
+        ids.update(gid for gid in old if gid not in new)
+        if not ids:
+            return
+    if ids is None:
+        _changes[sport_key] = None
+    elif _changes.get(sport_key, ()) is not None:
+        _changes.setdefault(sport_key, set()).update(ids)
+    _pending.append((sport_key, ids))
+
+
+def subscribe(fn):
+    """Register fn(sport_key, changed_ids, index), called after a snapshot
+    changes; changed_ids is a set of game ids (added, changed or removed), or
+    None when the whole sport should be treated as new."""
+    _listeners.append(fn)
+
+
+def _notify_pending():
+    with _snap_lock:
+        todo = [(sk, ids, _snapshots[sk]['index']) for sk, ids in _pending
+                if sk in _snapshots]
+        _pending.clear()
+    for sk, ids, index in todo:
+        for fn in _listeners:
+            try:
+                fn(sk, ids, index)
+            except Exception as e:
+                print(f'  [direct feeds] snapshot listener failed: {str(e)[:80]}')
+
+
+def take_changes():
+    """{sport_key: set of changed game ids, or None for 'all'} since the
+    last call; clears the record."""
+    with _snap_lock:
+        out = dict(_changes)
+        _changes.clear()
     return out
 
 
+def _snapshot_index(sport, log):
+    build_sport(sport, log=log)
+    with _snap_lock:
+        cur = _snapshots.get(sport)
+    return cur['index'] if cur else None
+
+
 def fetch_odds(sport, market, log=print):
     """Drop-in for The Odds API GET /v4/sports/{sport}/odds."""
     if not ENABLED or sport not in SPORTS:
         return None
-    games = build_sport(sport, log=log)
-    return _filter_market(games, market) or None
+    idx = _snapshot_index(sport, log)
+    view = idx and idx['markets'].get(market)
+    return (view['games'] or None) if view else None
 
 
 def fetch_events(sport, log=print):
     """Drop-in for GET /v4/sports/{sport}/events."""
     if not ENABLED or sport not in SPORTS:
         return []
-    games = build_sport(sport, log=log)
-    return [{'id': g['id'], 'sport_key': sport,
-             'commence_time': g['commence_time'],
-             'home_team': g['home_team'], 'away_team': g['away_team']}
-            for g in games]
+    idx = _snapshot_index(sport, log)
+    return [dict(e, sport_key=sport) for e in idx['events']] if idx else []
 
 
 def fetch_event_odds(sport, event_id, market, log=print):
     """Drop-in for GET /v4/sports/{sport}/events/{id}/odds."""
     if not ENABLED or sport not in SPORTS:
         return None
-    games = build_sport(sport, log=log)
-    for g in games:
-        if g['id'] == event_id:
-            f = _filter_market([g], market)
-            return f[0] if f else None
-    return None
+    idx = _snapshot_index(sport, log)
+    view = idx and idx['markets'].get(market)
+    return view['by_id'].get(event_id) if view else None
 
 
 # ---- external snapshot ingestion (fetch_worker.py mode) ----
 
+# Full payloads carry a 'version'; after the app acknowledges one, the worker
+# sends snapshot_delta() patches against it instead of the whole slate. A
+# patch only applies on top of the exact version it was cut from — anything
+# else (app restarted, a direct build replaced the snapshot, a push was lost)
+# is refused and the worker falls back to a full payload.
+_ingest_version = [None]   # version of the last applied ingest payload
+
+
 def snapshot_payload(sport_keys, log=print):
     """Build a JSON-safe payload of fresh snapshots for the given sports."""
     return {'generated': _iso(time.time()),
+            'version': int(time.time() * 1000),
             'sports': {s: {'games': build_sport(s, log=log, force=True)}
                        for s in sport_keys if s in SPORTS}}
 
 
 def ingest_snapshot(payload):
     """Accept a payload from fetch_worker.py; returns sports loaded."""
-    sports = (payload or {}).get('sports') or {}
+    payload = payload or {}
+    sports = payload.get('sports') or {}
     n = 0
     with _snap_lock:
         for sk, blob in sports.items():
             games = blob.get('games')
             if sk in SPORTS and isinstance(games, list):
-                _snapshots[sk] = {'ts': time.time(), 'games': games,
-                                  'source': 'ingest'}
+                _store_snapshot(sk, _snapshot_entry(games, 'ingest',
+                                                    version=payload.get('version')))
                 n += 1
+        _ingest_version[0] = payload.get('version')
+    _notify_pending()
+    return n
+
+
+def ingest_version():
+    return _ingest_version[0]
+
+
+def _same_shape(a, b):
+    """Same header fields, books and per-book market keys, in the same order,
+    so a/b can be patched positionally."""
+    if {k: v for k, v in a.items() if k != 'bookmakers'} != \
+            {k: v for k, v in b.items() if k != 'bookmakers'}:
+        return False
+    sa = [(bk.get('key'), bk.get('title'), [m.get('key') for m in bk.get('markets', [])])
+          for bk in a.get('bookmakers', [])]
+    sb = [(bk.get('key'), bk.get('title'), [m.get('key') for m in bk.get('markets', [])])
+          for bk in b.get('bookmakers', [])]
+    return sa == sb
+
+
+def _diff_games(old, games):
+    """Per-sport patch from `old` to `games` (see snapshot_delta)."""
+    ids = [g.get('id') for g in games]
+    old_ids = [g.get('id') for g in old]
+    if None in ids or len(set(ids)) != len(ids) or len(set(old_ids)) != len(old_ids):
+        return {'games': games}          # ids can't address games: send whole
+    old_by = dict(zip(old_ids, old))
+    upsert, markets, outcomes = [], [], []
+    for g in games:
+        og = old_by.get(g['id'])
+        if og == g:
+            continue
+        if og is None or not _same_shape(og, g):
+            upsert.append(g)
+            continue
+        for bi, (ob, nb) in enumerate(zip(og['bookmakers'], g['bookmakers'])):
+            if ob == nb:
+                continue
+            for mi, (om, nm) in enumerate(zip(ob['markets'], nb['markets'])):
+                if om == nm:
+                    continue
+                oo, no = om.get('outcomes', []), nm.get('outcomes', [])
+                same_head = ({k: v for k, v in om.items() if k != 'outcomes'} ==
+                             {k: v for k, v in nm.items() if k != 'outcomes'})
+                moved = [i for i, (a, b) in enumerate(zip(oo, no)) if a != b]
+                if same_head and len(oo) == len(no) and 2 * len(moved) <= len(no):
+                    outcomes.extend([g['id'], bi, mi, i, no[i]] for i in moved)
+                else:
+                    markets.append([g['id'], bi, mi, nm])
+    d = {}
+    seen = set(ids)
+    removed = [i for i in old_ids if i not in seen]
+    if upsert:
+        d['upsert'] = upsert
+    if markets:
+        d['markets'] = markets
+    if outcomes:
+        d['outcomes'] = outcomes
+    if removed:
+        d['remove'] = removed
+    if ids != old_ids:
+        d['order'] = ids
+    return d
+
+
+def snapshot_delta(prev, cur):
+    """Patch turning payload `prev` (the version the app last acknowledged)
+    into payload `cur`. Per sport, games that are new or changed shape go
+    whole ('upsert'); games whose prices moved send only the changed markets
+    ('markets': [id, book_i, market_i, market]) or outcomes ('outcomes':
+    [id, book_i, market_i, outcome_i, outcome]); 'remove' lists gone ids and
+    'order' the id sequence when it changed. Unchanged sports send {}."""
+    old_sports = prev.get('sports') or {}
+    out = {'generated': cur.get('generated'), 'format': 'delta',
+           'base_version': prev.get('version'), 'version': cur.get('version'),
+           'sports': {}}
+    for sk, blob in (cur.get('sports') or {}).items():
+        old = (old_sports.get(sk) or {}).get('games')
+        out['sports'][sk] = ({'games': blob['games']} if old is None
+                             else _diff_games(old, blob['games']))
+    return out
+
+
+def _apply_delta(games, d):
+    """Apply one sport's patch copy-on-write: touched games/books/markets are
+    copied, everything else is shared with the previous snapshot (readers
+    may still be iterating it)."""
+    by_id = {g['id']: g for g in games}
+    for gid in d.get('remove', []):
+        by_id.pop(gid, None)
+    for g in d.get('upsert', []):
+        by_id[g['id']] = g
+    copied = set()
+
+    def _market(gid, bi, mi):
+        if gid not in copied:
+            g = dict(by_id[gid])
+            g['bookmakers'] = list(g['bookmakers'])
+            by_id[gid] = g
+            copied.add(gid)
+        bks = by_id[gid]['bookmakers']
+        if (gid, bi) not in copied:
+            bks[bi] = dict(bks[bi])
+            bks[bi]['markets'] = list(bks[bi]['markets'])
+            copied.add((gid, bi))
+        return bks[bi]['markets']
+
+    for gid, bi, mi, m in d.get('markets', []):
+        _market(gid, bi, mi)[mi] = m
+        copied.add((gid, bi, mi))
+    for gid, bi, mi, oi, o in d.get('outcomes', []):
+        ms = _market(gid, bi, mi)
+        if (gid, bi, mi) not in copied:
+            ms[mi] = dict(ms[mi])
+            ms[mi]['outcomes'] = list(ms[mi].get('outcomes', []))
+            copied.add((gid, bi, mi))
+        ms[mi]['outcomes'][oi] = o
+    if 'order' in d:
+        return [by_id[i] for i in d['order'] if i in by_id]
+    return list(by_id.values())
+
+
+def ingest_delta(payload):
+    """Apply a snapshot_delta patch. Returns sports changed, or None if the
+    patch wasn't cut from the version we hold (caller must resync)."""
+    base = payload.get('base_version')
+    sports = {sk: d for sk, d in (payload.get('sports') or {}).items() if sk in SPORTS}
+    n = 0
+    with _snap_lock:
+        if base is None or _ingest_version[0] != base:
+            return None
+        for sk, d in sports.items():
+            cur = _snapshots.get(sk)
+            if 'games' not in d and (not cur or cur.get('version') != base):
+                return None
+        for sk, d in sports.items():
+            if 'games' in d:
+                games = d['games']
+            elif d:
+                games = _apply_delta(_snapshots[sk]['games'], d)
+            else:
+                # nothing moved: same games, now confirmed as of this push
+                _snapshots[sk] = dict(_snapshots[sk], ts=time.time(),
+                                      version=payload.get('version'))
+                continue
+            _store_snapshot(sk, _snapshot_entry(games, 'ingest',
+                                                version=payload.get('version')))
+            n += 1
+        _ingest_version[0] = payload.get('version')
+    _notify_pending()
     return n
 
 
+# ---- ingest wire format ----
+# Content-Type picks the encoding, Content-Encoding the compression:
+#   application/json                  plain payload (what old workers send)
+#   application/x-v4-columnar+json    encode_columnar() of the payload
+#   Content-Encoding: gzip | zstd     (zstd only if `zstandard` is installed)
+COLUMNAR_TYPE = 'application/x-v4-columnar+json'
+
+_GAME_FIELDS = ('id', 'sport_key', 'commence_time', 'home_team', 'away_team')
+
+
+def _encode_games(games, intern):
+    """v4 games -> flat columns. Strings become indexes into the payload's
+    string table; counts (nb/nm/no) say how many rows of the next level
+    belong to each row of this one."""
+    G = {f: [] for f in _GAME_FIELDS}
+    G['nb'] = []
+    B = {'key': [], 'title': [], 'nm': []}
+    M = {'key': [], 'no': []}
+    O = {'name': [], 'desc': [], 'point': [], 'price': []}
+    for g in games:
+        for f in _GAME_FIELDS:
+            G[f].append(intern(g.get(f)))
+        bks = g.get('bookmakers', [])
+        G['nb'].append(len(bks))
+        for bk in bks:
+            B['key'].append(intern(bk.get('key')))
+            B['title'].append(intern(bk.get('title')))
+            ms = bk.get('markets', [])
+            B['nm'].append(len(ms))
+            for m in ms:
+                M['key'].append(intern(m.get('key')))
+                outs = m.get('outcomes', [])
+                M['no'].append(len(outs))
+                for o in outs:
+                    O['name'].append(intern(o.get('name')))
+                    O['desc'].append(intern(o.get('description')))
+                    O['point'].append(o.get('point'))
+                    O['price'].append(o.get('price'))
+    return {'g': G, 'b': B, 'm': M, 'o': O}
+
+
+def _decode_games(cols, strings):
+    G, B, M, O = cols['g'], cols['b'], cols['m'], cols['o']
+    S = lambda i: None if i < 0 else strings[i]
+    games = []
+    bi = mi = oi = 0
+    for gi in range(len(G['nb'])):
+        g = {}
+        for f in _GAME_FIELDS:
+            if G[f][gi] >= 0:
+                g[f] = strings[G[f][gi]]
+        bks = []
+        for _ in range(G['nb'][gi]):
+            markets = []
+            for _ in range(B['nm'][bi]):
+                outs = []
+                for _ in range(M['no'][mi]):
+                    o = {'name': S(O['name'][oi])}
+                    if O['desc'][oi] >= 0:
+                        o['description'] = strings[O['desc'][oi]]
+                    if O['point'][oi] is not None:
+                        o['point'] = O['point'][oi]
+                    o['price'] = O['price'][oi]
+                    outs.append(o)
+                    oi += 1
+                markets.append({'key': S(M['key'][mi]), 'outcomes': outs})
+                mi += 1
+            bks.append({'key': S(B['key'][bi]), 'title': S(B['title'][bi]),
+                        'markets': markets})
+            bi += 1
+        g['bookmakers'] = bks
+        games.append(g)
+    return games
+
+
+def encode_columnar(payload):
+    """Full or delta payload -> columnar document: every games list
+    (sports.*.games / sports.*.upsert) becomes column arrays over one shared
+    string table. Market/outcome patches of a delta stay as they are."""
+    strings, ids = [], {}
+
+    def intern(v):
+        if v is None:
+            return -1
+        i = ids.get(v)
+        if i is None:
+            i = ids[v] = len(strings)
+            strings.append(v)
+        return i
+
+    doc = {k: v for k, v in payload.items() if k != 'sports'}
+    doc['sports'] = {}
+    for sk, blob in (payload.get('sports') or {}).items():
+        out = dict(blob)
+        for f in ('games', 'upsert'):
+            if f in blob:
+                out[f] = {'_cols': _encode_games(blob[f], intern)}
+        doc['sports'][sk] = out
+    doc['strings'] = strings
+    return doc
+
+
+def decode_columnar(doc):
+    strings = doc.get('strings') or []
+    payload = {k: v for k, v in doc.items() if k not in ('sports', 'strings')}
+    payload['sports'] = {}
+    for sk, blob in (doc.get('sports') or {}).items():
+        out = dict(blob)
+        for f in ('games', 'upsert'):
+            if isinstance(blob.get(f), dict) and '_cols' in blob[f]:
+                out[f] = _decode_games(blob[f]['_cols'], strings)
+        payload['sports'][sk] = out
+    return payload
+
+
+def encode_ingest_body(payload, columnar=True, compression='gzip'):
+    """-> (body bytes, request headers) for POST /api/ingest."""
+    if columnar:
+        ctype = COLUMNAR_TYPE
+        raw = json.dumps(encode_columnar(payload), separators=(',', ':')).encode()
+    else:
+        ctype = 'application/json'
+        raw = json.dumps(payload).encode()
+    headers = {'Content-Type': ctype}
+    if compression == 'zstd' and _zstd is not None:
+        raw = _zstd.ZstdCompressor(level=10).compress(raw)
+        headers['Content-Encoding'] = 'zstd'
+    elif compression in ('gzip', 'zstd'):
+        raw = gzip.compress(raw, compresslevel=6)
+        headers['Content-Encoding'] = 'gzip'
+    return raw, headers
+
+
+def decode_ingest_body(raw, content_type='application/json', content_encoding=None):
+    """Inverse of encode_ingest_body. Decompression is capped at
+    INGEST_MAX_BYTES; a corrupt or oversized body raises ValueError."""
+    enc = (content_encoding or '').strip().lower()
+    if enc == 'gzip':
+        d = zlib.decompressobj(wbits=31)
+        try:
+            raw = d.decompress(raw, INGEST_MAX_BYTES)
+        except zlib.error as e:
+            raise ValueError(f'bad gzip body: {e}')
+        if d.unconsumed_tail:
+            raise ValueError('ingest body too large')
+    elif enc == 'zstd':
+        if _zstd is None:
+            raise ValueError('zstd body but zstandard is not installed')
+        try:
+            raw = _zstd.ZstdDecompressor().stream_reader(raw).read(INGEST_MAX_BYTES + 1)
+        except _zstd.ZstdError as e:
+            raise ValueError(f'bad zstd body: {e}')
+        if len(raw) > INGEST_MAX_BYTES:
+            raise ValueError('ingest body too large')
+    elif enc not in ('', 'identity'):
+        raise ValueError(f'unsupported Content-Encoding: {enc}')
+    if (content_type or '').split(';')[0].strip().lower() == COLUMNAR_TYPE:
+        return decode_columnar(json.loads(raw))
+    try:
+        return json.loads(raw) or {}
+    except ValueError:
+        return {}
+
+
 def status():
     with _snap_lock:
         return {sk: {'age_sec': int(time.time() - v['ts']),
-                     'games': len(v['games']), 'source': v['source']}
+                     'games': len(v['games']), 'source': v['source'],
+                     'books': dict(v.get('books') or {})}
                 for sk, v in _snapshots.items()}
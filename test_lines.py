@@ -487,6 +487,1006 @@ try:
 finally:
     wa._implied_team_totals = _ritt
 
+# ---------- 26. Per-host pacing: one slow host never gates another ----------
+import time as _time
+providers._pace('https://a.example/x', delay=0.0)
+t0 = _time.time()
+providers._pace('https://a.example/y', delay=0.2)    # same host -> waits
+t_same = _time.time() - t0
+t0 = _time.time()
+providers._pace('https://b.example/y', delay=0.2)    # fresh host -> immediate
+t_other = _time.time() - t0
+check('pace: same host spaced', t_same >= 0.15, f'{t_same:.3f}s')
+check('pace: other host not blocked', t_other < 0.1, f'{t_other:.3f}s')
+
+# ---------- 27. Parallel fan-out: a hanging book is merged without ----------
+def _fast_book(sport_key, log=print):
+    g = providers._mk_game('Denver Nuggets', 'LA Lakers', _time.time() + 3600)
+    g['h2h'] = [('Denver Nuggets', -150), ('LA Lakers', +130)]
+    return [g]
+
+def _slow_book(sport_key, log=print):
+    _time.sleep(0.6)
+    return _fast_book(sport_key)
+
+def _broken_book(sport_key, log=print):
+    raise RuntimeError('boom')
+
+_rp, _rd = providers.PROVIDERS, providers.FEED_DEADLINE
+try:
+    providers.PROVIDERS = [('pinnacle', _fast_book), ('betmgm', _slow_book),
+                           ('fanduel', _broken_book)]
+    providers.FEED_DEADLINE = 0.2
+    t0 = _time.time()
+    gs = providers.build_sport('basketball_nba', log=lambda *a: None, force=True)
+    took = _time.time() - t0
+    books = providers.status()['basketball_nba']['books']
+    check('fan-out: merge does not wait for the slow book', took < 0.5, f'{took:.2f}s')
+    check('fan-out: on-time book merged', len(gs) == 1 and
+          [b['key'] for b in gs[0]['bookmakers']] == ['pinnacle'], str(gs))
+    check('fan-out: late/failed books marked in status()',
+          books == {'pinnacle': 'ok', 'betmgm': 'late', 'fanduel': 'error'}, str(books))
+finally:
+    providers.PROVIDERS, providers.FEED_DEADLINE = _rp, _rd
+    providers._snapshots.pop('basketball_nba', None)
+
+# ---------- 28. Single-flight builds + stale-while-revalidate ----------
+import threading as _threading
+_calls = []
+
+def _counting_book(sport_key, log=print):
+    _calls.append(sport_key)
+    _time.sleep(0.2)
+    return _fast_book(sport_key)
+
+_rp = providers.PROVIDERS
+try:
+    providers.PROVIDERS = [('pinnacle', _counting_book)]
+    providers._snapshots.pop('basketball_nba', None)
+    res = []
+    ths = [_threading.Thread(target=lambda: res.append(
+        providers.build_sport('basketball_nba', log=lambda *a: None))) for _ in range(4)]
+    for t in ths: t.start()
+    for t in ths: t.join()
+    check('single-flight: one fetch for concurrent callers', len(_calls) == 1, str(len(_calls)))
+    check('single-flight: every caller gets the games', all(len(r) == 1 for r in res), str(res))
+
+    # stale snapshot -> served at once, refreshed behind the caller
+    _calls.clear()
+    providers._snapshots['basketball_nba']['ts'] -= providers.SNAPSHOT_TTL + 1
+    old = providers._snapshots['basketball_nba']['games']
+    t0 = _time.time()
+    got = providers.build_sport('basketball_nba', log=lambda *a: None)
+    check('swr: stale snapshot returned immediately', got is old and _time.time() - t0 < 0.1)
+    _time.sleep(0.4)
+    check('swr: background refresh replaced it', len(_calls) == 1 and
+          providers._snapshots['basketball_nba']['games'] is not old)
+finally:
+    providers.PROVIDERS = _rp
+    providers._snapshots.pop('basketball_nba', None)
+
+# ---------- 29. Indexed fuzzy merge keeps the single-candidate rule ----------
+def _g(home, away, ts):
+    g = providers._mk_game(home, away, ts)
+    g['h2h'] = [(home, -110), (away, -110)]
+    return g
+
+_t = _time.time() + 3600
+per_book = {
+    'pinnacle': [_g('Oklahoma City Thunder', 'Indiana Pacers', _t),
+                 _g('Los Angeles Lakers', 'Boston Celtics', _t),
+                 _g('Los Angeles Clippers', 'Boston Celtics', _t + 30 * 3600)],
+    'draftkings': [_g('Oklahoma City', 'Indiana', _t + 600),         # unique -> merge
+                   _g('Los Angeles', 'Boston', _t + 60)],            # only one in window -> merge
+    'fanduel': [_g('Los Angeles', 'Boston Celtics', None)],          # both in play -> new bucket
+}
+mg = providers._merge_to_v4('basketball_nba', per_book, log=lambda *a: None)
+books_by_home = {(g['home_team'], len(g['bookmakers'])) for g in mg}
+check('fuzzy index: city-only names merge into the unique bucket',
+      ('Oklahoma City Thunder', 2) in books_by_home and ('Los Angeles Lakers', 2) in books_by_home,
+      str(books_by_home))
+check('fuzzy index: ambiguous match opens its own bucket',
+      ('Los Angeles', 1) in books_by_home and len(mg) == 4, str(books_by_home))
+
+# ---------- 30. Memoized name normalizers ----------
+before = providers.norm_cache_stats()['team_key']
+k1 = providers._team_key('Atlético Madrid FC', soccer=True)
+k2 = providers._team_key('Atlético Madrid FC', soccer=True)
+after = providers.norm_cache_stats()['team_key']
+check('norm cache: same key, second call is a hit',
+      k1 == k2 == 'atletico madrid' and after['hits'] == before['hits'] + 1, str((k1, after)))
+check('norm cache: soccer flag is part of the key',
+      providers._team_key('Atlético Madrid FC') == 'fc')
+check('norm cache: players still normalized', providers._norm_player("A'ja  Wilson") == 'aja wilson')
+
+# ---------- 31. Market-indexed snapshots ----------
+_snap_games = mk_v4({'pinnacle': [tot_mkt(8.5, -110, 8.5, -110)],
+                     'draftkings': [sp_mkt('Yankees', -1.5, +140, 'Red Sox', +1.5, -160),
+                                    tot_mkt(8.5, -105, 8.5, -115)]})
+_snap_games[0]['id'] = 'ev1'
+with providers._snap_lock:
+    providers._snapshots['basketball_nba'] = providers._snapshot_entry(_snap_games, 'ingest')
+try:
+    tv = providers.fetch_odds('basketball_nba', 'totals', log=lambda *a: None)
+    check('index: market view keeps only that market per book',
+          tv and [(b['key'], [m['key'] for m in b['markets']]) for b in tv[0]['bookmakers']]
+          == [('pinnacle', ['totals']), ('draftkings', ['totals'])], str(tv))
+    ev = providers.fetch_event_odds('basketball_nba', 'ev1', 'spreads', log=lambda *a: None)
+    check('index: event lookup by id', ev is not None and
+          [b['key'] for b in ev['bookmakers']] == ['draftkings'], str(ev))
+    check('index: missing market/event -> None',
+          providers.fetch_odds('basketball_nba', 'h2h', log=lambda *a: None) is None and
+          providers.fetch_event_odds('basketball_nba', 'nope', 'totals', log=lambda *a: None) is None)
+    check('index: events listing', [e['id'] for e in
+          providers.fetch_events('basketball_nba', log=lambda *a: None)] == ['ev1'])
+finally:
+    providers._snapshots.pop('basketball_nba', None)
+
+# ---------- 32. Delta snapshot protocol ----------
+import copy as _copy, json as _json
+def _slate(n):
+    out = []
+    for i in range(n):
+        g = mk_v4({'pinnacle': [tot_mkt(8.5, -110, 8.5, -110)],
+                   'draftkings': [sp_mkt('Yankees', -1.5, +140, 'Red Sox', +1.5, -160),
+                                  tot_mkt(8.5, -105, 8.5, -115)]})[0]
+        g['id'] = f'g{i}'
+        out.append(g)
+    return out
+
+_p1 = {'version': 1, 'sports': {'baseball_mlb': {'games': _slate(4)}}}
+_p2 = {'version': 2, 'sports': {'baseball_mlb': {'games': _copy.deepcopy(_slate(4))}}}
+_g2 = _p2['sports']['baseball_mlb']['games']
+_g2[0]['bookmakers'][0]['markets'][0]['outcomes'][0]['price'] = -120   # one outcome
+_g2[1]['bookmakers'][1]['markets'][0]['outcomes'] = [                  # whole market
+    {'name': 'Yankees', 'point': -2.5, 'price': +170},
+    {'name': 'Red Sox', 'point': 2.5, 'price': -200}]
+_g2[2]['bookmakers'].pop()                                             # shape change
+_g2.pop(3)                                                             # removed
+_g2.append(dict(_copy.deepcopy(_g2[0]), id='g9'))                      # new
+try:
+    providers.ingest_snapshot(_copy.deepcopy(_p1))
+    before = providers._snapshots['baseball_mlb']['games']
+    before_json = _json.dumps(before)
+    delta = providers.snapshot_delta(_p1, _p2)
+    d = delta['sports']['baseball_mlb']
+    check('delta: only changed pieces are sent',
+          len(d.get('outcomes', [])) == 1 and len(d.get('markets', [])) == 1 and
+          [g['id'] for g in d.get('upsert', [])] == ['g2', 'g9'] and d.get('remove') == ['g3'],
+          str({k: len(v) for k, v in d.items()}))
+    n = providers.ingest_delta(_json.loads(_json.dumps(delta)))
+    after = providers._snapshots['baseball_mlb']['games']
+    check('delta: patched snapshot equals the new slate', n == 1 and after == _g2)
+    check('delta: previous snapshot left untouched', _json.dumps(before) == before_json)
+    check('delta: event index rebuilt',
+          providers._snapshots['baseball_mlb']['index']['by_id']['g9'] is after[-1])
+    check('delta: stale base refused -> resync', providers.ingest_delta(delta) is None)
+finally:
+    providers._snapshots.pop('baseball_mlb', None)
+    providers._ingest_version[0] = None
+
+# ---------- 33. Compressed / columnar ingest bodies ----------
+_full = {'version': 7, 'sports': {'baseball_mlb': {'games': _slate(30)}}}
+_plain = _json.dumps(_full).encode()
+_body, _hdrs = providers.encode_ingest_body(_full, columnar=True, compression='gzip')
+check('ingest codec: columnar+gzip round-trips',
+      providers.decode_ingest_body(_body, _hdrs['Content-Type'],
+                                   _hdrs['Content-Encoding']) == _full)
+check('ingest codec: >=10x smaller than plain JSON', len(_body) * 10 <= len(_plain),
+      f'{len(_plain)} -> {len(_body)} bytes')
+_dl = providers.snapshot_delta(_p1, _p2)
+_db, _dh = providers.encode_ingest_body(_dl, columnar=True, compression=None)
+check('ingest codec: delta payloads round-trip',
+      providers.decode_ingest_body(_db, _dh['Content-Type']) == _dl)
+try:
+    _bad = False
+    providers.decode_ingest_body(b'not gzip', 'application/json', 'gzip')
+except ValueError:
+    _bad = True
+check('ingest codec: corrupt body -> ValueError', _bad)
+try:
+    with wa.app.test_client() as c:
+        r1 = c.post('/api/ingest', data=_plain, content_type='application/json')
+        r2 = c.post('/api/ingest', data=_body, headers=_hdrs)
+    check('ingest route: plain JSON and columnar+gzip both load',
+          r1.status_code == 200 and r2.status_code == 200 and
+          r2.get_json()['sports_loaded'] == 1 and
+          providers._snapshots['baseball_mlb']['games'] == _full['sports']['baseball_mlb']['games'],
+          f'{r1.status_code} {r2.status_code}')
+finally:
+    providers._snapshots.pop('baseball_mlb', None)
+    providers._ingest_version[0] = None
+
+# ---------- 34. Ingest-triggered incremental scan ----------
+def _mlb_game(gid, over_px):
+    g = mk_v4({'fanduel': [tot_mkt(8.5, over_px, 8.5, -125)],
+               'draftkings': [tot_mkt(8.5, -125, 8.5, +105)]})[0]
+    g.update(id=gid, sport_key='baseball_mlb')
+    return g
+
+_saved = {n: getattr(wa, n) for n in (
+    'GAME_MARKETS', 'PROP_MARKETS', 'fetch_polymarket_sports', 'fetch_kalshi_sports',
+    'fetch_cross_exchange_opps', 'fetch_weather_opps', 'fetch_econ_opps',
+    'fetch_econ_nowcast_opps', 'log_opportunity', 'log_opportunities')}
+_slow_calls = []
+try:
+    wa.GAME_MARKETS = [('baseball_mlb', 'totals', 'MLB Total')]
+    wa.PROP_MARKETS = []
+    wa.fetch_polymarket_sports = wa.fetch_kalshi_sports = lambda log_fn=None: {}
+    wa.fetch_cross_exchange_opps = lambda: _slow_calls.append(1) or []
+    wa.fetch_weather_opps = wa.fetch_econ_opps = wa.fetch_econ_nowcast_opps = lambda: []
+    wa.log_opportunity = lambda opp, scan_id: None
+    wa.log_opportunities = lambda opps, scan_id: 0
+    _q = {'version': 1, 'sports': {'baseball_mlb': {'games': [
+        _mlb_game('m1', +105), _mlb_game('m2', -125)]}}}
+    providers.ingest_snapshot(_q)
+    wa._cache_drop_sport('baseball_mlb')
+    wa.scan_markets()
+    first = [o for o in wa.state['opportunities'] if o['type'] == 'arbitrage']
+    check('incremental: full scan finds the one arb', [o['event_id'] for o in first] == ['m1'],
+          str([(o['type'], o.get('event_id')) for o in wa.state['opportunities']]))
+
+    _q2 = {'version': 2, 'sports': {'baseball_mlb': {'games': [
+        _mlb_game('m1', +105), _mlb_game('m2', +110)]}}}
+    providers.ingest_delta(providers.snapshot_delta(_q, _q2))
+    wa._cache_drop_sport('baseball_mlb')
+    wa.scan_sports_incremental()
+    arbs2 = {o['event_id']: o for o in wa.state['opportunities'] if o['type'] == 'arbitrage'}
+    check('incremental: changed game re-analyzed', set(arbs2) == {'m1', 'm2'}, str(list(arbs2)))
+    check('incremental: unchanged game reused, not recomputed', arbs2.get('m1') is first[0])
+    check('incremental: slow stages not re-run', len(_slow_calls) == 1, str(len(_slow_calls)))
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+    providers._snapshots.pop('baseball_mlb', None)
+    providers._ingest_version[0] = None
+    providers.take_changes()
+
+# ---------- 35. Best-price index: snapshot changes re-evaluate arbs live ----------
+_saved = {n: getattr(wa, n) for n in (
+    'GAME_MARKETS', 'PROP_MARKETS', 'fetch_polymarket_sports', 'fetch_kalshi_sports',
+    'fetch_cross_exchange_opps', 'fetch_weather_opps', 'fetch_econ_opps',
+    'fetch_econ_nowcast_opps', 'log_opportunity', 'log_opportunities')}
+try:
+    wa.GAME_MARKETS = [('baseball_mlb', 'totals', 'MLB Total')]
+    wa.PROP_MARKETS = []
+    wa.fetch_polymarket_sports = wa.fetch_kalshi_sports = lambda log_fn=None: {}
+    wa.fetch_cross_exchange_opps = wa.fetch_weather_opps = lambda: []
+    wa.fetch_econ_opps = wa.fetch_econ_nowcast_opps = lambda: []
+    wa.log_opportunity = lambda opp, scan_id: None
+    wa.log_opportunities = lambda opps, scan_id: 0
+    _q = {'version': 1, 'sports': {'baseball_mlb': {'games': [
+        _mlb_game('m1', +105), _mlb_game('m2', -125)]}}}
+    providers.ingest_snapshot(_q)
+    wa._cache_drop_sport('baseball_mlb')
+    wa.scan_markets()
+    _e1 = wa._best_index.get(('m1', 'totals'))
+    check('best index: built on ingest', _e1 is not None
+          and _e1['best'][('Over', 8.5)] == (105, 'fanduel'), str(_e1 and _e1['best']))
+
+    _q2 = {'version': 2, 'sports': {'baseball_mlb': {'games': [
+        _mlb_game('m1', +105), _mlb_game('m2', +110)]}}}
+    providers.ingest_delta(providers.snapshot_delta(_q, _q2))
+    live = {o['event_id'] for o in wa.state['opportunities'] if o['type'] == 'arbitrage'}
+    check('best index: new arb surfaces without a scan', live == {'m1', 'm2'}, str(live))
+    _e1b = wa._best_index[('m1', 'totals')]
+    check('best index: unchanged event keeps its prices', _e1b['book_odds'] is _e1['book_odds'])
+    _views = providers.fetch_odds('baseball_mlb', 'totals')
+    check('best index: entries follow the current views',
+          all(wa._best_index[(g['id'], 'totals')]['game'] is g for g in _views))
+    _fresh = [dict(g) for g in _views]          # not indexed -> computed on the spot
+    check('best index: lookup matches a full rescan',
+          wa.find_game_arbs(_views, 'MLB Total') == wa.find_game_arbs(_fresh, 'MLB Total'))
+
+    _q3 = {'version': 3, 'sports': {'baseball_mlb': {'games': [_mlb_game('m1', -125)]}}}
+    providers.ingest_delta(providers.snapshot_delta(_q2, _q3))
+    live = [o for o in wa.state['opportunities'] if o['type'] == 'arbitrage']
+    check('best index: vanished arbs and events dropped',
+          not live and ('m2', 'totals') not in wa._best_index, str(live))
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+    providers._snapshots.pop('baseball_mlb', None)
+    providers._ingest_version[0] = None
+    providers.take_changes()
+
+# ---------- 36. Shared odds matrix: one parse per game for both analyzers ----------
+_g36 = [_mlb_game('x1', +105), _mlb_game('x2', -125)]
+_parses = []
+_orig_parse = wa._game_book_odds
+wa._game_book_odds = lambda g: _parses.append(g.get('id')) or _orig_parse(g)
+try:
+    _ex = {'poly_games': None, 'kalshi_games': None}
+    _saved_fetch = wa.fetch_odds
+    wa.fetch_odds = lambda sport, market: _g36
+    try:
+        _both = wa._scan_game_lines('baseball_mlb', 'totals', 'MLB Total', _ex)
+    finally:
+        wa.fetch_odds = _saved_fetch
+    check('odds matrix: each game parsed once per market', sorted(_parses) == ['x1', 'x2'], str(_parses))
+finally:
+    wa._game_book_odds = _orig_parse
+check('odds matrix: same opps as separate analyzer calls',
+      _both == wa.analyze_game_markets(_g36, 'MLB Total') + wa.find_game_arbs(_g36, 'MLB Total'))
+
+# ---------- 37. Vectorized consensus engine matches the Python path ----------
+_g37 = [_mlb_game('v1', +105), _mlb_game('v2', -125),
+        mk_v4({'fanduel': [sp_mkt('A', -1.5, +120, 'B', 1.5, -140)],
+               'pinnacle': [sp_mkt('A', -1.5, +105, 'B', 1.5, -125)],
+               'betmgm': [sp_mkt('A', -1.5, +110, 'B', 1.5, -135)]})[0]]
+_g37[0]['bookmakers'].append({'key': 'pinnacle', 'markets': [tot_mkt(8.5, -118, 8.5, -102)]})
+_saved_ve = wa.VECTOR_ENGINE
+try:
+    wa.VECTOR_ENGINE = False
+    _py37 = wa.analyze_game_markets(_g37, 'MLB Total')
+    check('vector engine: python path finds edges', len(_py37) > 0, str(len(_py37)))
+    if wa._np is not None:
+        wa.VECTOR_ENGINE = True
+        check('vector engine: numpy path identical', wa.analyze_game_markets(_g37, 'MLB Total') == _py37)
+    else:
+        print('  (numpy not installed — vectorized path skipped)')
+finally:
+    wa.VECTOR_ENGINE = _saved_ve
+
+# ---------- 38. Batched prop engine: one parse per event across the slate ----------
+_ev38 = []
+for _i, _fd in enumerate((+150, +105)):
+    _e = prop_game(24.5, _fd, -190, 25.5, -125, -105, 25.5, -128, -102)[0]
+    _e.update(id=f'evb{_i}')
+    _ev38.append(_e)
+_saved = {n: getattr(wa, n) for n in ('fetch_events', 'fetch_event_odds', '_prop_table')}
+_tables = []
+try:
+    wa.fetch_events = lambda sport: [{'id': e['id'], 'home_team': e['home_team'],
+                                      'away_team': e['away_team']} for e in _ev38]
+    wa.fetch_event_odds = lambda sport, eid, market: next(e for e in _ev38 if e['id'] == eid)
+    wa._prop_table = lambda g: _tables.append(g['id']) or _saved['_prop_table'](g)
+    _bo, _ba = wa.fetch_event_props('icehockey_nhl', [('player_points', 'NBA Points')],
+                                    max_events=8)
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+check('prop batch: each event parsed once for +EV and arbs', sorted(_tables) == ['evb0', 'evb1'],
+      str(_tables))
+_each = [o for e in _ev38 for o in wa.analyze_player_props([e], 'NBA Points',
+                                                            market_key='player_points')]
+check('prop batch: same opps as per-event analysis', _bo == _each,
+      f"{len(_bo)} vs {len(_each)}")
+
+# ---------- 39. Fast translation kernel ----------
+def _bisect_phi_inv(p):
+    lo, hi = -8.0, 8.0
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        lo, hi = (mid, hi) if wa._phi(mid) < p else (lo, mid)
+    return (lo + hi) / 2
+_grid = [i / 200 for i in range(2, 199)]
+check('phi_inv: rational approx matches bisection',
+      max(abs(wa._phi_inv(p) - _bisect_phi_inv(p)) for p in _grid) < 1e-12)
+_lam_err = max(abs(wa._pois_sf(wa._pois_lam(k, p), k) - p)
+               for k in range(1, 15) for p in (0.06, 0.3, 0.5, 0.7, 0.94))
+check('poisson lambda solver hits the target', _lam_err < 1e-12, str(_lam_err))
+_tab_err = max(abs(tr('player_strikeouts', k - 0.5, p, k + dk - 0.5)
+                   - wa._pois_sf(wa._pois_lam(k, p), k + dk))
+               for k, dk in ((4, 1), (5, -1), (5, 1), (9, 2), (14, -2))
+               for p in (0.0501, 0.137, 0.5003, 0.77777, 0.9499))
+check('poisson table matches the exact lambda solve', _tab_err < 1e-12, str(_tab_err))
+wa.translate_prop_prob.cache_clear()
+_a = tr('player_strikeouts', 6.5, 0.6, 7.5)
+_b = tr('player_strikeouts', 6.5, 0.6, 7.5)
+check('translate memoized', _a == _b and wa.translate_prop_prob.cache_info().hits == 1)
+
+# ---------- 40. Persistent box-score form store ----------
+import tempfile as _tempfile, types as _types
+def _box(team, pts_by_player):
+    return {'boxscore': {'players': [{'team': {'displayName': team}, 'statistics': [{
+        'labels': ['MIN', 'PTS'],
+        'athletes': [{'athlete': {'displayName': n}, 'stats': ['30', str(p)]}
+                     for n, p in pts_by_player.items()]}]}]}}
+_boxes = {'f1': _box('Las Vegas Aces', {"A'ja Wilson": 24, 'Kelsey Plum': 18}),
+          'f2': _box('Las Vegas Aces', {"A'ja Wilson": 30})}
+_calls = {'board': 0, 'summary': 0}
+_day1 = (wa.datetime.now() - wa.timedelta(days=1)).strftime('%Y%m%d')
+def _fake_board(league, ds):
+    _calls['board'] += 1
+    return (['f1', 'f2'], True) if ds == _day1 else ([], True)
+def _fake_get(path, params=None, timeout=None):
+    _calls['summary'] += 1
+    return _boxes[params['event']]
+_saved = {n: getattr(wa, n) for n in ('DB_PATH', 'USE_PG', '_espn_scoreboard_day', '_espn_get')}
+try:
+    wa.DB_PATH = _tempfile.mktemp(suffix='.db')
+    wa.USE_PG = False
+    wa.init_db()
+    wa._espn_scoreboard_day = _fake_board
+    wa._espn_get = _fake_get
+    wa._FORM_CACHE.pop('basketball_wnba', None)
+    f1 = wa._load_recent_form('basketball_wnba', days=2)
+    _w = f1['players'].get(wa.normalize_player_name("A'ja Wilson"), {})
+    check('form store: cold load aggregates box scores',
+          _w.get('g') == 2 and _w.get('pts_pg') == 27.0
+          and f1['teams'].get('las vegas aces') == 36.0, str(f1))
+    check('form store: cold load fetched each box once', _calls == {'board': 2, 'summary': 2},
+          str(_calls))
+    wa._FORM_CACHE.pop('basketball_wnba', None)        # simulate a restart
+    f2 = wa._load_recent_form('basketball_wnba', days=2)
+    check('form store: warm start needs no ESPN calls', _calls == {'board': 2, 'summary': 2},
+          str(_calls))
+    check('form store: warm start same aggregates',
+          f2['players'] == f1['players'] and f2['teams'] == f1['teams'])
+    with wa.get_db() as _c:
+        _n_agg = _c.execute("SELECT COUNT(*) FROM form_agg WHERE sport_key = ?",
+                            ('basketball_wnba',)).fetchone()[0]
+        _c.execute("UPDATE form_agg SET computed_at = 0")       # stale aggregates
+    check('form store: rolling aggregates persisted', _n_agg == 3, str(_n_agg))
+    wa._FORM_CACHE.pop('basketball_wnba', None)
+    f3 = wa._load_recent_form('basketball_wnba', days=2)
+    check('form store: stale aggregates recomputed from stored box rows',
+          f3['players'] == f1['players'] and _calls == {'board': 2, 'summary': 2}, str(_calls))
+    _rows = wa._parse_box_points(_box('Las Vegas Aces', {'Kelsey Plum': 18, '.': 4}))
+    check('form store: empty normalized name skipped, still in team total',
+          ('las vegas aces', '', 22.0) in _rows and len(_rows) == 2, str(_rows))
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+    wa._FORM_CACHE.pop('basketball_wnba', None)
+
+# ---------- 41. Shared ESPN client ----------
+_seq = [429, 503, 200]
+def _fake_sget(url, params=None, timeout=None):
+    code = _seq.pop(0)
+    return _types.SimpleNamespace(status_code=code, headers={'Retry-After': '0'},
+                                  json=lambda: {'ok': url})
+_saved = {n: getattr(wa, n) for n in ('_espn_session', 'ESPN_RATE_DELAY', '_espn_get',
+                                      '_espn_scoreboard_day', 'DB_PATH', 'USE_PG')}
+_real_sleep = wa.time.sleep
+try:
+    wa._espn_session = _types.SimpleNamespace(get=_fake_sget)
+    wa.ESPN_RATE_DELAY = 0.0
+    wa.time.sleep = lambda s: None
+    check('espn client: retries 429/5xx then returns JSON',
+          wa._espn_get('basketball/nba/scoreboard') == {'ok': wa.ESPN_BASE + '/basketball/nba/scoreboard'}
+          and _seq == [], str(_seq))
+    _seq[:] = [404, 200]
+    check('espn client: 4xx is not retried', wa._espn_get('x') is None and _seq == [200])
+    wa.time.sleep = _real_sleep
+
+    _live = {'now': 0, 'peak': 0}
+    _lk = _threading.Lock()
+    def _slow_get(path, params=None, timeout=None):
+        with _lk:
+            _live['now'] += 1
+            _live['peak'] = max(_live['peak'], _live['now'])
+        _real_sleep(0.05)
+        with _lk:
+            _live['now'] -= 1
+        return _box('Las Vegas Aces', {'Player %s' % params['event']: 10})
+    wa.DB_PATH = _tempfile.mktemp(suffix='.db')
+    wa.USE_PG = False
+    wa.init_db()
+    wa._espn_scoreboard_day = lambda lg, ds: (['g%s%d' % (ds, i) for i in range(4)], True)
+    wa._espn_get = _slow_get
+    wa._FORM_CACHE.pop('basketball_wnba', None)
+    f3 = wa._load_recent_form('basketball_wnba', days=3)
+    check('espn client: cold form load fetches summaries concurrently',
+          len(f3['players']) == 12 and _live['peak'] > 1, str(_live))
+finally:
+    wa.time.sleep = _real_sleep
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+    wa._FORM_CACHE.pop('basketball_wnba', None)
+
+# ---------- 42. Cross-exchange title matcher ----------
+_km = {t: {'ticker': 'K%d' % i} for i, t in enumerate([
+    'will the fed cut rates in december 2025', 'bitcoin above $100k by end of 2025',
+    'will openai release gpt-6 in 2025', 'nyc mayor race winner zohran mamdani'])}
+_pm = {t: {'slug': 'p%d' % i} for i, t in enumerate([
+    'fed rate cut in december 2025?', 'will bitcoin reach $100k by december 31 2025?',
+    'us recession in 2025?', 'will zohran mamdani win the nyc mayoral race?',
+    'ethereum above $5k in 2025?'])}
+from difflib import SequenceMatcher as _SM
+def _brute(k):
+    bs, bp = 0, None
+    for p in _pm:
+        sc = _SM(None, k, p).ratio()
+        if sc > bs:
+            bs, bp = sc, p
+    return bp if bs >= 0.65 else None
+wa._xmatch_pairs = {}
+_pairs, _hits = wa._match_exchange_titles(_km, _pm)
+check('xmatch: same pairs as the full scan',
+      dict(_pairs) == {k: _brute(k) for k in _km if _brute(k)} and _hits == 0, str(_pairs))
+_pairs2, _hits2 = wa._match_exchange_titles(_km, _pm)
+check('xmatch: confirmed pairs reused next scan', _pairs2 == _pairs and _hits2 == len(_pairs),
+      f"{_hits2}")
+_k0 = _pairs[0][1]
+_pm2 = {(k + ' (revised)' if k == _k0 else k): v for k, v in _pm.items()}
+_pairs3, _hits3 = wa._match_exchange_titles(_km, _pm2)
+check('xmatch: changed title is re-matched', _hits3 == len(_pairs) - 1)
+_snap = wa._xmatch_pairs
+_snap_items = dict(_snap)
+wa._match_exchange_titles({}, _pm)
+check('xmatch: pairs for delisted tickers dropped', not wa._xmatch_pairs)
+check('xmatch: a scan swaps in a new dict, earlier readers unaffected',
+      _snap is not wa._xmatch_pairs and _snap == _snap_items and _snap)
+
+# ---------- 43. Scan-scoped exchange cache ----------
+_up = []
+def _fake_rget(url, params=None, headers=None, timeout=None):
+    _up.append((url, dict(params or {})))
+    code = 429 if (params or {}).get('series_ticker') == 'BUSY' else 200
+    return _types.SimpleNamespace(status_code=code, json=lambda: {'markets': [{'ticker': 'X'}]})
+_saved = wa.requests
+try:
+    wa.requests = _types.SimpleNamespace(get=_fake_rget)
+    _lst = wa.KALSHI_API + '/markets'
+    with wa._exchange_scope() as _sc:
+        a = wa.kalshi_get(_lst, params={'series_ticker': 'KXFED', 'limit': 50}).json()
+        a['markets'][0]['yes_bid'] = 99                 # consumer mutates its copy
+        b = wa.kalshi_get(_lst, params={'limit': 50, 'series_ticker': 'KXFED'}).json()
+        with wa._exchange_scope():                      # nested scan joins the outer scope
+            wa.poly_get(wa.POLYMARKET_API + '/markets', params={'limit': 500})
+            wa.poly_get(wa.POLYMARKET_API + '/markets', params={'limit': 500})
+        wa.poly_get(wa.POLYMARKET_API + '/markets', params={'series_ticker': 'BUSY'})
+        wa.poly_get(wa.POLYMARKET_API + '/markets', params={'series_ticker': 'BUSY'})
+        wa.kalshi_get(_lst + '/KXFED-1')
+        wa.kalshi_get(_lst + '/KXFED-1')
+        _counts = (_sc['calls'], _sc['saved'])
+    check('exchange cache: identical listing fetched once per scan',
+          len([u for u in _up if u[1].get('series_ticker') == 'KXFED']) == 1
+          and len([u for u in _up if u[1].get('limit') == 500]) == 1, str(_up))
+    check('exchange cache: consumers get independent copies', 'yes_bid' not in b['markets'][0])
+    check('exchange cache: errors and per-ticker calls not cached',
+          len([u for u in _up if u[1].get('series_ticker') == 'BUSY']) == 2
+          and len([u for u in _up if u[0].endswith('KXFED-1')]) == 2)
+    check('exchange cache: saved calls counted', _counts == (4, 2), str(_counts))
+    n = len(_up)
+    wa.kalshi_get(_lst, params={'series_ticker': 'KXFED', 'limit': 50})
+    check('exchange cache: no caching outside a scan',
+          len(_up) == n + 1 and getattr(wa._xscope_tls, 'scope', None) is None)
+    check('exchange cache: last scope counts kept for feed-status',
+          (wa._xscope_last['calls'], wa._xscope_last['saved']) == (4, 2)
+          and wa.app.test_client().get('/api/feed-status').get_json()['exchange_cache']['saved'] == 2)
+    _q = {'series_ticker': 'KXCPI', 'limit': 50}
+    _seen = {}
+    with wa._exchange_scope() as _sc:
+        wa.kalshi_get(_lst, params=_q)
+        _th = _threading.Thread(target=lambda: _seen.update(
+            other=getattr(wa._xscope_tls, 'scope', None)))
+        _th.start(); _th.join()
+        with wa._exchange_scope() as _sc_in:
+            pass
+        _res, _tm = wa._run_stages([('a', (), lambda: wa.kalshi_get(_lst, params=_q)),
+                                    ('b', (), lambda: getattr(wa._xscope_tls, 'scope', None))])
+        _refs_in = _sc['refs']
+    check('exchange cache: unrelated threads see no scope', _seen == {'other': None})
+    check('exchange cache: stage threads join the scan scope',
+          _res['b'] is _sc and _sc['saved'] == 1 and _sc_in is _sc and _refs_in == 1,
+          f"{_sc['saved']} {_refs_in}")
+    _go, _out = _threading.Event(), {}
+    def _other_scan():
+        with wa._exchange_scope() as sc2:
+            _go.wait(2)
+            wa.kalshi_get(_lst, params=_q)
+            _out['sc'] = sc2
+    _th = _threading.Thread(target=_other_scan)
+    _th.start()
+    with wa._exchange_scope() as _sc:
+        wa.kalshi_get(_lst, params=_q)
+    _go.set(); _th.join()
+    check('exchange cache: overlapping scans keep separate scopes',
+          _out['sc'] is not _sc and _out['sc']['calls'] == 1 and _out['sc']['refs'] == 0)
+finally:
+    wa.requests = _saved
+
+# ---------- 44. Kalshi token bucket ----------
+_seq = [429, 429, 200]
+_up = []
+def _fake_kget(url, params=None, headers=None, timeout=None):
+    _up.append(url)
+    return _types.SimpleNamespace(status_code=_seq.pop(0), headers={'Retry-After': '0.05'},
+                                  json=lambda: {'markets': []})
+_saved = {n: getattr(wa, n) for n in ('requests', 'KALSHI_RATE', 'KALSHI_BURST',
+                                      '_kalshi_series_markets')}
+try:
+    wa.requests = _types.SimpleNamespace(get=_fake_kget)
+    wa.KALSHI_RATE, wa.KALSHI_BURST = 1000.0, 10
+    _t0 = wa.time.monotonic()
+    r = wa.kalshi_get(wa.KALSHI_API + '/markets/KXFED-1')
+    _dt = wa.time.monotonic() - _t0
+    check('kalshi: 429 retried after Retry-After', r.status_code == 200 and len(_up) == 3
+          and _dt >= 0.09, f"{len(_up)} calls, {_dt:.3f}s")
+    wa.KALSHI_RATE, wa.KALSHI_BURST = 50.0, 1
+    wa._kalshi_bucket.update(tokens=0.0, ts=wa.time.monotonic(), hold=0.0)
+    _t0 = wa.time.monotonic()
+    for _ in range(6):
+        wa._kalshi_take()
+    _dt = wa.time.monotonic() - _t0
+    check('kalshi: bucket paces calls to KALSHI_RATE', _dt >= 0.1, f"{_dt:.3f}s")
+
+    _live = {'now': 0, 'peak': 0}
+    def _slow_series(series, log, max_pages=2):
+        with _lk:
+            _live['now'] += 1
+            _live['peak'] = max(_live['peak'], _live['now'])
+        _real_sleep(0.03)
+        with _lk:
+            _live['now'] -= 1
+        return []
+    wa._kalshi_series_markets = _slow_series
+    wa.fetch_kalshi_sports()
+    check('kalshi: sports series fetched concurrently', _live['peak'] > 1, str(_live))
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+
+# ---------- 45. Scan stage graph ----------
+_order = []
+def _stage(name, sec=0.0, out=None, boom=False):
+    def run(*inputs):
+        _order.append((name, inputs))
+        _real_sleep(sec)
+        if boom:
+            raise RuntimeError('feed down')
+        return out if out is not None else [name]
+    return run
+_t0 = wa.time.time()
+_res, _tm = wa._run_stages([
+    ('exchange', (), _stage('exchange', 0.05, out={'ex': 1})),
+    ('props', ('exchange',), _stage('props')),
+    ('weather', (), _stage('weather', 0.2)),
+    ('econ', (), _stage('econ', 0.2)),
+    ('bad', (), _stage('bad', boom=True)),
+    ('after_bad', ('bad',), _stage('after_bad')),
+])
+_wall = wa.time.time() - _t0
+check('stages: dependents get their inputs', ('props', ({'ex': 1},)) in _order
+      and _res['props'] == ['props'], str(_order))
+check('stages: independent stages overlap', _wall < 0.38, f"{_wall:.2f}s")
+check('stages: failures recorded and dependents skipped',
+      _res['bad'] is None and 'feed down' in _tm['bad']['error']
+      and _res['after_bad'] is None and 'skipped' in _tm['after_bad']['error']
+      and not any(n == 'after_bad' for n, _i in _order), str(_tm))
+check('stages: timings recorded', _tm['weather']['sec'] >= 0.15 and _tm['props']['error'] is None)
+_order.clear()
+_res, _tm = wa._run_stages([
+    ('exchange', (), _stage('exchange', boom=True)),
+    ('props', ('exchange',), _stage('props')),
+], fallbacks={'exchange': {'empty': True}})
+check('stages: failed stage with a fallback still feeds its dependents',
+      ('props', ({'empty': True},)) in _order and _res['props'] == ['props']
+      and 'feed down' in _tm['exchange']['error'], str(_order))
+try:
+    wa._run_stages([('a', ('b',), _stage('a')), ('b', ('a',), _stage('b'))])
+    check('stages: cycle rejected', False)
+except ValueError:
+    check('stages: cycle rejected', True)
+
+# ---------- 46. Bulk opportunity logging ----------
+def _opp(player, book='fanduel', edge=3.0):
+    return {'player': player, 'game': 'A @ B', 'market': 'NBA Points', 'book': book,
+            'type': 'player_prop', 'edge': edge, 'odds': -110, 'sport_key': 'basketball_nba'}
+_saved = {n: getattr(wa, n) for n in ('DB_PATH', 'USE_PG', '_opp_seen', '_opp_synced')}
+try:
+    wa.DB_PATH = _tempfile.mktemp(suffix='.db')
+    wa.USE_PG = False
+    wa.init_db()
+    wa._opp_seen = None
+    def _nrows():
+        with wa.get_db() as c:
+            return c.execute("SELECT COUNT(*) FROM opportunities").fetchone()[0]
+    n1 = wa.log_opportunities([_opp('Jokic'), _opp('Murray'), _opp('Jokic', edge=4.0)], 's1')
+    check('bulk log: one row per bet, in-batch dupes dropped', n1 == 2 and _nrows() == 2)
+    n2 = wa.log_opportunities([_opp('Jokic'), _opp('Jokic', book='draftkings')], 's2')
+    check('bulk log: 12h window deduped in memory', n2 == 1 and _nrows() == 3)
+    wa._opp_seen = None                                  # restart: primed from the DB
+    check('bulk log: restart primes the window from the DB',
+          wa.log_opportunities([_opp('Murray')], 's3') == 0 and _nrows() == 3)
+    wa._opp_seen = {}                                    # race: row landed after our last pull
+    wa._opp_synced = (wa.datetime.now() + wa.timedelta(days=1)).isoformat()
+    check('bulk log: unique dedup index rejects the duplicate, count excludes it',
+          wa.log_opportunities([_opp('Murray'), _opp('Embiid')], 's4') == 1 and _nrows() == 4)
+    _prev = wa.datetime.fromtimestamp((wa.time.time() // 43200) * 43200 - 60)
+    with wa.get_db() as c:                               # other process, previous 12h bucket
+        c.execute("INSERT INTO opportunities (scan_id, scan_time, player, game, market, book, "
+                  "dedup_key) VALUES ('x', ?, 'Tatum', 'A @ B', 'NBA Points', 'fanduel', 'old')",
+                  (_prev.isoformat(),))
+        c.commit()
+    wa._opp_seen, wa._opp_synced = {}, ''
+    _in_window = wa.time.time() - _prev.timestamp() < 43200
+    check('bulk log: sliding window spans the bucket boundary across processes',
+          wa.log_opportunities([_opp('Tatum')], 's5') == (0 if _in_window else 1))
+    with wa.get_db() as c:
+        _k = c.execute("SELECT dedup_key FROM opportunities WHERE player='Murray'").fetchone()[0]
+    check('bulk log: dedup key = 12h bucket + bet',
+          _k == f"{int(wa.time.time() // 43200)}|Murray|A @ B|NBA Points|fanduel", _k)
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+
+# ---------- 47. Postgres connection pool ----------
+class _FakePg:
+    made = []
+    def __init__(self, dsn):
+        self.raw = _types.SimpleNamespace(closed=0)
+        self.bad = False
+        self.sql = []
+        _FakePg.made.append(self)
+    def execute(self, sql, params=()):
+        if self.bad:
+            raise RuntimeError('server closed the connection')
+        self.sql.append(sql)
+        return _types.SimpleNamespace(fetchone=lambda: (1,), fetchall=lambda: [])
+    def commit(self): pass
+    def rollback(self): pass
+    def close(self):
+        self.raw.closed = 1
+    closed = property(lambda self: bool(self.raw.closed))
+_saved = {n: getattr(wa, n) for n in ('_PgConn', 'USE_PG', 'DATABASE_URL', 'PG_POOL_MAX',
+                                      'PG_POOL_WAIT_SEC', 'PG_POOL_CHECK_SEC', '_pg_pool')}
+try:
+    wa._PgConn, wa.USE_PG, wa.DATABASE_URL = _FakePg, True, 'postgres://test'
+    wa.PG_POOL_MAX, wa.PG_POOL_WAIT_SEC, wa.PG_POOL_CHECK_SEC = 2, 0.2, 3600
+    wa._pg_pool = wa._pg_pool_new()
+    for _ in range(3):
+        with wa.get_db() as c:
+            c.execute("SELECT 1")
+    _st = wa.pg_pool_stats()
+    check('pg pool: sequential requests share one connection',
+          len(_FakePg.made) == 1 and _st['connects'] == 1 and _st['reused'] == 2, str(_st))
+    with wa.get_db() as c1, wa.get_db() as c2:
+        try:
+            with wa.get_db():
+                _third = 'no wait'
+        except RuntimeError:
+            _third = 'timeout'
+    _st = wa.pg_pool_stats()
+    check('pg pool: max size enforced with a checkout timeout',
+          c1 is not c2 and _third == 'timeout' and _st['timeouts'] == 1
+          and _st['open'] == 2 and _st['in_use'] == 0, str(_st))
+    wa.PG_POOL_CHECK_SEC = 0
+    _FakePg.made[0].bad = True
+    with wa.get_db() as c:
+        _healthy = not c.bad
+    check('pg pool: failed health check replaces the connection',
+          _healthy and wa.pg_pool_stats()['health_failures'] == 1 and _FakePg.made[0].closed)
+    _inherited = [cn for cn, _ts in wa._pg_pool['idle']]
+    wa._pg_pool['pid'] = -1                              # as if we were a forked child
+    with wa.get_db() as c:
+        _fresh = c not in _inherited
+    check('pg pool: fork starts a fresh pool, inherited conns left open',
+          _fresh and all(cn in wa._pg_orphans and not cn.closed for cn in _inherited)
+          and wa._pg_pool['pid'] == wa.os.getpid())
+    _r = wa.app.test_client().get('/api/db-pool?key=' + wa.SCAN_KEY)
+    check('pg pool: stats endpoint', _r.status_code == 200
+          and _r.get_json().get('max_size') == 2 and 'avg_wait_ms' in _r.get_json(), _r.data[:200])
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+    wa._pg_orphans.clear()
+
+# ---------- 48. Postgres dialect translation + prepared statements ----------
+_q = "SELECT id FROM opportunities WHERE edge > ? AND scan_time > datetime('now', '-30 days') AND recommendation LIKE '6%+' LIMIT ?"
+_tr = wa._pg_sql(_q)
+check('pg sql: translated once per source string', wa._pg_sql(_q) is _tr)
+check('pg sql: datetime(now) bound, text stable',
+      _tr['fmt'] == "SELECT id FROM opportunities WHERE edge > %s AND scan_time > %s "
+                    "AND recommendation LIKE '6%%+' LIMIT %s"
+      and _tr['native'].endswith("edge > $1 AND scan_time > $2 AND recommendation LIKE '6%+' LIMIT $3"),
+      _tr['fmt'])
+_a = wa._pg_args(_tr, (4.0, 50))
+_dt = wa.datetime.fromisoformat(_a[1])
+check('pg sql: args in placeholder order with the cutoff filled in',
+      _a[0] == 4.0 and _a[2] == 50
+      and abs((wa.datetime.now() - _dt).total_seconds() - 30 * 86400) < 60, str(_a))
+class _PgLost(Exception):
+    pgcode = '26000'
+class _FakeCur:
+    def __init__(self, conn, fail_prepare):
+        self.conn, self.log, self.fail_prepare = conn, conn.log, fail_prepare
+    def execute(self, sql, args=None):
+        if sql.startswith('PREPARE') and self.fail_prepare:
+            raise RuntimeError('could not determine data type of parameter $1')
+        if sql.startswith('EXECUTE') and self.conn.lost:
+            self.log.append(('EXECUTE!', args))
+            raise _PgLost(f"prepared statement \"{sql.split()[1]}\" does not exist")
+        self.log.append((sql.split(' ')[0], args))
+def _fake_conn(fail_prepare=False):
+    c = object.__new__(wa._PgConn)
+    c.prepared, c.can_prepare, c.log, c.lost, c.txn = set(), True, [], False, 0
+    c.raw = _types.SimpleNamespace(cursor=lambda: _FakeCur(c, fail_prepare),
+                                   get_transaction_status=lambda: c.txn,
+                                   rollback=lambda: c.log.append(('ROLLBACK!', None)))
+    return c
+_saved = {n: getattr(wa, n) for n in ('PG_PREPARE', 'PG_PREPARE_AFTER')}
+try:
+    wa.PG_PREPARE, wa.PG_PREPARE_AFTER = True, 2
+    _c = _fake_conn()
+    _upd = "UPDATE opportunities SET clv = ? WHERE id = ? /* t48 */"
+    for i in range(4):
+        _c.execute(_upd, (1.5, i))
+    _ops = [op for op, _a in _c.log]
+    check('pg sql: hot statement prepared once, then EXECUTEd',
+          _ops == ['UPDATE', 'UPDATE', 'SAVEPOINT', 'PREPARE', 'RELEASE', 'EXECUTE', 'EXECUTE']
+          and _c.log[-1][1] == (1.5, 3), str(_c.log))
+    _c2 = _fake_conn()
+    _c2.execute(_upd, (2.0, 9))
+    check('pg sql: each session prepares for itself', [op for op, _a in _c2.log][:2] == ['SAVEPOINT', 'PREPARE'])
+    _c3 = _fake_conn(fail_prepare=True)
+    _sel = "SELECT ? /* t48 untyped */"
+    for _ in range(4):
+        _c3.execute(_sel, ('x',))
+    _ops = [op for op, _a in _c3.log]
+    check('pg sql: failed PREPARE rolls back to the savepoint and stays plain',
+          _ops == ['SELECT', 'SELECT', 'SAVEPOINT', 'ROLLBACK', 'SELECT', 'SELECT'], str(_ops))
+    _c4 = _fake_conn()
+    for _ in range(4):
+        _c4.execute("CREATE INDEX IF NOT EXISTS t48 ON opportunities(id)")
+    check('pg sql: DDL never prepared', {op for op, _a in _c4.log} == {'CREATE'})
+    _c5 = _fake_conn()
+    _c5.execute(_upd, (1.0, 1))
+    _c5.lost = True                                      # pooler moved us to another session
+    _c5.log.clear()
+    _c5.execute(_upd, (2.0, 2))
+    _c5.execute(_upd, (3.0, 3))
+    _ops = [op for op, _a in _c5.log]
+    check('pg sql: failed EXECUTE rolls back, replays plain SQL, stops preparing',
+          _ops == ['EXECUTE!', 'ROLLBACK!', 'UPDATE', 'UPDATE'] and _c5.log[2][1] == (2.0, 2)
+          and not _c5.can_prepare and not _c5.prepared, str(_c5.log))
+    _c6 = _fake_conn()
+    _c6.txn = 2                                          # INTRANS: earlier statements at stake
+    _c6.execute(_upd, (1.0, 1))
+    check('pg sql: never EXECUTEs mid-transaction', [op for op, _a in _c6.log] == ['UPDATE'])
+    _multi = "INSERT INTO t48 (a, b) VALUES (?, ?), (?, ?)"
+    _in = "SELECT a FROM t48 WHERE b IN (?, ?, ?)"
+    _n0 = wa._pg_sql_cached.cache_info().currsize
+    check('pg sql: variable-arity SQL neither cached nor prepared',
+          wa._pg_sql(_multi) is not wa._pg_sql(_multi) and not wa._pg_sql(_multi)['prepare']
+          and not wa._pg_sql(_in)['prepare'] and wa._pg_sql("SELECT a FROM t48 WHERE b IN (?)")['prepare']
+          and wa._pg_sql_cached.cache_info().currsize == _n0 + 1)
+    _name = wa._pg_sql(_upd)['name']
+    wa._pg_sql_cached.cache_clear()
+    check('pg sql: statement name survives cache eviction', wa._pg_sql(_upd)['name'] == _name)
+    _hot = wa._pg_sql("SELECT ? /* t48 threads */")
+    _ths = [_threading.Thread(target=lambda: [wa._pg_hot(_hot) for _ in range(500)])
+            for _ in range(8)]
+    for _th in _ths: _th.start()
+    for _th in _ths: _th.join()
+    check('pg sql: use counts exact under concurrency', wa._pg_uses[_hot['name']] == 4000,
+          str(wa._pg_uses[_hot['name']]))
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+
+# ---------- 49. Batched CLV write-back ----------
+_saved = {n: getattr(wa, n) for n in ('DB_PATH', 'USE_PG', 'fetch_odds', 'get_db', '_opp_seen')}
+try:
+    wa.DB_PATH = _tempfile.mktemp(suffix='.db')
+    wa.USE_PG = False
+    wa.init_db()
+    wa._opp_seen = None
+    _ct = (wa.datetime.now() + wa.timedelta(hours=1)).isoformat()
+    wa.log_opportunities([{'player': '', 'game': f'Team{i} @ Home{i}', 'market': 'MLB Moneyline',
+                           'book': 'FanDuel', 'type': 'game_market', 'odds': +120,
+                           'recommendation': f'BET Team{i} ML', 'commence': _ct,
+                           'sport_key': 'baseball_mlb', 'event_id': 'e1'} for i in range(5)], 's1')
+    wa.fetch_odds = lambda sport, market: [{'id': 'e1', 'bookmakers': [{'key': 'fanduel', 'markets': [
+        {'key': 'h2h', 'outcomes': [{'name': f'Team{i}', 'price': +100} for i in range(4)]}]}]}]
+    _opens = []
+    _real_get_db = _saved['get_db']
+    def _counting_db():
+        _opens.append(1)
+        return _real_get_db()
+    wa.get_db = _counting_db
+    n = wa.update_clv()
+    with _real_get_db() as c:
+        _clv = [r[0] for r in c.execute("SELECT clv FROM opportunities WHERE clv IS NOT NULL")]
+    check('clv batch: every matched row written', n['updated'] == 4 and len(_clv) == 4
+          and all(v == round((0.5 - 100 / 220) * 100, 2) for v in _clv), f"{n} {_clv}")
+    check('clv batch: one read + one write connection per run', len(_opens) == 2, str(len(_opens)))
+    check('clv batch: fetch and write timed separately, returned with the run',
+          n['scanned'] == 5 and n['write_sec'] is not None and n['fetch_sec'] is not None
+          and wa._clv_last_run.get('write_sec') == n['write_sec'], str(n))
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+
+# ---------- 50. Kickoff-aware CLV scheduler ----------
+def _iso_in(sec):
+    return (wa.datetime.now(wa.timezone.utc) + wa.timedelta(seconds=sec)).isoformat().replace('+00:00', 'Z')
+_saved = {n: getattr(wa, n) for n in ('CLV_LEAD_SEC', 'CLV_COALESCE_SEC', 'CLV_RETRY_SEC',
+                                      'DB_PATH', 'USE_PG', 'fetch_odds', '_opp_seen')}
+_sc = wa._clv_sched
+try:
+    wa.CLV_LEAD_SEC, wa.CLV_COALESCE_SEC = 300, 120
+    _sc['heap'].clear(); _sc['queued'].clear(); _sc['wake'].clear()
+    _a, _b, _c = _iso_in(600), _iso_in(660), _iso_in(3 * 3600)
+    wa._clv_schedule([('baseball_mlb', 'a', _a), ('baseball_mlb', 'b', _b),
+                      ('baseball_mlb', 'c', _c), ('baseball_mlb', 'old', _iso_in(-60)),
+                      ('baseball_mlb', 'a', _a)])
+    check('clv sched: one entry per upcoming event', len(_sc['heap']) == 3 and _sc['wake'].is_set(),
+          str(_sc['heap']))
+    _now = wa.time.time()
+    check('clv sched: nothing due until the lead time', wa._clv_due(_now) == set())
+    check('clv sched: events starting together coalesce',
+          wa._clv_due(_now + 300) == {('baseball_mlb', 'a'), ('baseball_mlb', 'b')}
+          and len(_sc['heap']) == 1)
+    wa._clv_schedule([('baseball_mlb', 'a', _a)])
+    check('clv sched: fired event not re-queued', len(_sc['heap']) == 1)
+
+    wa.DB_PATH = _tempfile.mktemp(suffix='.db')
+    wa.USE_PG = False
+    wa.init_db()
+    wa._opp_seen = None
+    _sc['heap'].clear(); _sc['queued'].clear()
+    wa.log_opportunities([{'player': '', 'game': f'T{e} @ H{e}', 'market': 'MLB Moneyline',
+                           'book': 'FanDuel', 'type': 'game_market', 'odds': +120,
+                           'recommendation': f'BET T{e} ML', 'commence': _iso_in(900),
+                           'sport_key': 'baseball_mlb', 'event_id': e} for e in ('e1', 'e2')], 's1')
+    check('clv sched: logged bets schedule their events',
+          sorted(x[2] for x in _sc['heap']) == ['e1', 'e2'], str(_sc['heap']))
+    _fetched = []
+    def _fo(sport, market):
+        _fetched.append(sport)
+        return [{'id': 'e1', 'bookmakers': [{'key': 'fanduel', 'markets': [
+            {'key': 'h2h', 'outcomes': [{'name': 'Te1', 'price': +100}]}]}]}]
+    wa.fetch_odds = _fo
+    _sc['heap'].clear(); _sc['queued'].clear()
+    wa._clv_refresh()                                    # restart: schedule rebuilt from the DB
+    check('clv sched: refresh re-queues tracked events from the DB',
+          sorted(x[2] for x in _sc['heap']) == ['e1', 'e2'], str(_sc['heap']))
+    n = wa.update_clv(event_keys={('baseball_mlb', 'e1')})
+    check('clv sched: capture restricted to the due events',
+          n['updated'] == 1 and n['scanned'] == 1 and len(_fetched) == 1,
+          f"{n} {wa._clv_last_run} {_fetched}")
+    _sc['heap'].clear()
+    _t_rq = wa.time.time()
+    wa._clv_requeue({('baseball_mlb', 'e1'), ('baseball_mlb', 'e2')})
+    check('clv sched: uncaptured event retried shortly, captured one not',
+          [x[2] for x in _sc['heap']] == ['e2']
+          and abs(_sc['heap'][0][0] - (_t_rq + wa.CLV_RETRY_SEC)) < 5, str(_sc['heap']))
+    _sc['heap'].clear()
+    wa.CLV_RETRY_SEC = 3600
+    wa._clv_requeue({('baseball_mlb', 'e2')})
+    check('clv sched: no retry past kickoff', not _sc['heap'], str(_sc['heap']))
+finally:
+    for n, v in _saved.items():
+        setattr(wa, n, v)
+    _sc['heap'].clear(); _sc['queued'].clear(); _sc['wake'].clear()
+
+# ---------- 51. Feed deadline starts when the book starts ----------
+from concurrent.futures import ThreadPoolExecutor as _TPE
+def _book_after(sec):
+    def book(sport_key, log=print):
+        _real_sleep(sec)
+        return _fast_book(sport_key)
+    return book
+_saved = {n: getattr(providers, n) for n in ('PROVIDERS', 'FEED_DEADLINE', '_feed_pool',
+                                             'FEED_QUEUE_WAIT')}
+try:
+    providers._feed_pool = _TPE(max_workers=1)           # a pool busy with another sport
+    providers.PROVIDERS = [('pinnacle', _book_after(0.15)), ('draftkings', _book_after(0.15))]
+    providers.FEED_DEADLINE = 0.3
+    _pb, _bk = providers._fetch_parallel('basketball_nba', lambda *a: None)
+    check('feed deadline: queued time not charged to the book', _bk == {
+        'pinnacle': 'ok', 'draftkings': 'ok'}, str(_bk))
+    providers._feed_pool.submit(_real_sleep, 0.4)         # slot held by a hung book
+    providers.FEED_DEADLINE, providers.FEED_QUEUE_WAIT = 1.0, 0.1
+    _pb, _bk = providers._fetch_parallel('basketball_nba', lambda *a: None)
+    check('feed deadline: book stuck in the queue is cancelled as late',
+          _bk == {'pinnacle': 'late', 'draftkings': 'late'}, str(_bk))
+    providers._feed_pool.submit(_real_sleep, 0.6)
+    providers.FEED_DEADLINE, providers.FEED_QUEUE_WAIT = 0.1, 60.0
+    _t0 = _time.time()
+    _pb, _bk = providers._fetch_parallel('basketball_nba', lambda *a: None)
+    check('feed deadline: queue wait is capped by the deadline',
+          _bk == {'pinnacle': 'late', 'draftkings': 'late'} and _time.time() - _t0 < 0.4,
+          f'{_bk} {_time.time() - _t0:.2f}s')
+finally:
+    providers._feed_pool.shutdown(wait=True)
+    for n, v in _saved.items():
+        setattr(providers, n, v)
+
 print()
 if FAIL:
     print(f"❌ {len(FAIL)} failures: {FAIL}")
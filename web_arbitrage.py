@@ -17,15 +17,25 @@ import re
 import unicodedata
 import time
 import sqlite3
+import functools
+import hashlib
 import math
+import statistics
+import heapq
 import json
 import csv
 import io
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait as futures_wait
+from urllib.parse import urlsplit
 try:
     from zoneinfo import ZoneInfo
 except Exception:                       # pragma: no cover
     ZoneInfo = None
+try:
+    import numpy as _np                 # optional: vectorized game-line consensus
+except ImportError:
+    _np = None
 from contextlib import contextmanager
 import threading
 import os
@@ -76,9 +86,29 @@ except ImportError:
     _anthropic_available = False
 LLM_PARSER_ENABLED = bool(ANTHROPIC_API_KEY and _anthropic_available)
 
-# CLV worker knobs
+# CLV worker knobs. Closing odds are captured per event CLV_LEAD_SEC before
+# its start (events firing within CLV_COALESCE_SEC share one capture); the
+# interval now only paces grading.
 CLV_WORKER_INTERVAL_SEC = int(os.environ.get('CLV_WORKER_INTERVAL_SEC', '1800'))  # 30 min
 CLV_WINDOW_HOURS_AHEAD = int(os.environ.get('CLV_WINDOW_HOURS_AHEAD', '2'))
+CLV_LEAD_SEC = int(os.environ.get('CLV_LEAD_SEC', '300'))
+CLV_COALESCE_SEC = int(os.environ.get('CLV_COALESCE_SEC', '120'))
+CLV_RETRY_SEC = int(os.environ.get('CLV_RETRY_SEC', '60'))  # re-try an event's uncaptured rows until start
+CLV_REFRESH_SEC = int(os.environ.get('CLV_REFRESH_SEC', '900'))  # re-read tracked events from the DB
+
+# Ingest-triggered incremental scans re-analyze only the games whose snapshot
+# changed; exchange consensus and the non-sports stages (cross-exchange,
+# weather, econ) refresh on their own, slower cadence.
+EXCHANGE_REFRESH_SEC = int(os.environ.get('EXCHANGE_REFRESH_SEC', '900'))
+SLOW_STAGE_REFRESH_SEC = int(os.environ.get('SLOW_STAGE_REFRESH_SEC', '1800'))
+# Scan stages (exchange load, each sport's props/lines, cross-exchange,
+# weather, econ) run as a dependency graph on this many threads.
+SCAN_WORKERS = int(os.environ.get('SCAN_WORKERS', '4'))
+
+# Game-line consensus/edges run as array ops over the whole slate when NumPy
+# is installed (same numbers as the pure-Python path); VECTOR_ENGINE=0 forces
+# the Python path.
+VECTOR_ENGINE = os.environ.get('VECTOR_ENGINE', '1') != '0'
 
 # Default bankroll
 DEFAULT_BANKROLL = 3000
@@ -245,19 +275,79 @@ if USE_PG:
     import psycopg2
     import psycopg2.extras
 
-_DT_NOW_RE = re.compile(r"datetime\('now',\s*'(-?\d+)\s*days?'\)")
+# Translation of the app's SQLite dialect to Postgres. Only two things vary:
+# ? placeholders and datetime('now', ...) — timestamps are stored as ISO
+# TEXT in both backends, so string comparison behaves identically. The
+# datetime forms become bound parameters, so a statement's text never
+# changes and each source string is translated once. Statements run
+# PG_PREPARE_AFTER times become server-side prepared statements on each
+# connection that runs them (PG_PREPARE=0 turns that off). Variable-arity
+# SQL (multi-row VALUES, IN lists) is neither cached nor prepared. A
+# statement is only EXECUTEd as the first of its transaction, so when the
+# server has lost it (PgBouncer transaction mode hands out another
+# session) the transaction is rolled back, the plain SQL is replayed, and
+# that connection stops preparing.
+PG_PREPARE = os.environ.get('PG_PREPARE', '1') != '0'
+PG_PREPARE_AFTER = int(os.environ.get('PG_PREPARE_AFTER', '3'))
+_PG_TOKEN_RE = re.compile(r"\?|datetime\('now'(?:,\s*'(-?\d+)\s*days?')?\)")
+_PG_VARIADIC_RE = re.compile(r"\)\s*,\s*\(\s*\?|\bIN\s*\(\s*\?\s*,", re.I)
+_PG_PREPARABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH')
+_PG_TXN_IDLE = 0   # psycopg2.extensions.TRANSACTION_STATUS_IDLE
+_pg_stmt_lock = threading.Lock()
+_pg_uses = {}              # statement name -> executions so far, all sessions
+_pg_unpreparable = set()   # statement names the server refused to PREPARE
 
 def _pg_sql(sql):
-    """Translate the app's SQLite dialect to Postgres. Only two things vary:
-    ? placeholders and datetime('now', ...) — timestamps are stored as ISO
-    TEXT in both backends, so string comparison behaves identically."""
-    def _now_repl(m):
-        dt = datetime.now() + timedelta(days=int(m.group(1)))
-        return "'" + dt.isoformat() + "'"
-    sql = sql.replace('%', '%%')          # literal % (e.g. '6%+') before %s below
-    sql = _DT_NOW_RE.sub(_now_repl, sql)
-    sql = sql.replace("datetime('now')", "'" + datetime.now().isoformat() + "'")
-    return sql.replace('?', '%s')
+    """Translation of `sql`, cached per source string unless its arity varies."""
+    if _PG_VARIADIC_RE.search(sql):
+        return _pg_translate(sql, variadic=True)
+    return _pg_sql_cached(sql)
+
+@functools.lru_cache(maxsize=1024)
+def _pg_sql_cached(sql):
+    return _pg_translate(sql)
+
+def _pg_translate(sql, variadic=False):
+    """{'fmt': psycopg2 text (%s, %%), 'native': PREPARE text ($n), 'slots':
+    per placeholder, the caller's param index or ('now', day offset),
+    'name': derived from the text, so stable across cache evictions,
+    'prepare'}. Never mutated once built."""
+    slots, fmt, native, pos, n_args = [], [], [], 0, 0
+    for m in _PG_TOKEN_RE.finditer(sql):
+        fmt.append(sql[pos:m.start()].replace('%', '%%'))
+        native.append(sql[pos:m.start()])
+        if m.group(0) == '?':
+            slots.append(n_args)
+            n_args += 1
+        else:
+            slots.append(('now', int(m.group(1) or 0)))
+        fmt.append('%s')
+        native.append(f'${len(slots)}')
+        pos = m.end()
+    fmt.append(sql[pos:].replace('%', '%%'))
+    native.append(sql[pos:])
+    head = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    return {'fmt': ''.join(fmt), 'native': ''.join(native), 'slots': slots,
+            'bound_now': n_args != len(slots),
+            'name': 'wa_' + hashlib.sha1(sql.encode()).hexdigest()[:16],
+            'prepare': head in _PG_PREPARABLE and not variadic}
+
+def _pg_hot(tr):
+    """Count one execution of tr; True once it should run prepared."""
+    if not (PG_PREPARE and tr['prepare']):
+        return False
+    with _pg_stmt_lock:
+        if tr['name'] in _pg_unpreparable:
+            return False
+        n = _pg_uses[tr['name']] = _pg_uses.get(tr['name'], 0) + 1
+    return n > PG_PREPARE_AFTER
+
+def _pg_args(tr, params):
+    if not tr['bound_now']:
+        return tuple(params)
+    now = datetime.now()
+    return tuple(params[s] if isinstance(s, int)
+                 else (now + timedelta(days=s[1])).isoformat() for s in tr['slots'])
 
 class _PgConn:
     """Duck-types the sqlite3.Connection surface this app uses.
@@ -265,10 +355,59 @@ class _PgConn:
     def __init__(self, dsn):
         self.raw = psycopg2.connect(dsn, cursor_factory=psycopg2.extras.DictCursor,
                                     connect_timeout=10)
+        self.prepared = set()          # statement names PREPAREd on this session
+        self.can_prepare = True        # False once the server lost a prepared statement
     def execute(self, sql, params=()):
+        tr = _pg_sql(sql)
+        args = _pg_args(tr, params)
         cur = self.raw.cursor()
-        cur.execute(_pg_sql(sql), params)
+        if (self.can_prepare and _pg_hot(tr)
+                and self.raw.get_transaction_status() == _PG_TXN_IDLE
+                and self._prepare(cur, tr)):
+            try:
+                cur.execute(f"EXECUTE {tr['name']}"
+                            + (' (' + ', '.join(['%s'] * len(args)) + ')' if args else ''), args)
+                return cur
+            except Exception as e:
+                # first statement of the transaction: nothing else to lose
+                self.rollback()
+                self.prepared.discard(tr['name'])
+                if getattr(e, 'pgcode', None) == '26000':      # invalid_sql_statement_name
+                    self.can_prepare = False
+                    self.prepared.clear()
+                    log_debug(f"  prepared statements lost on this session, disabled: "
+                              f"{str(e)[:80]}")
+                cur = self.raw.cursor()
+        cur.execute(tr['fmt'], args)
+        return cur
+    def executemany(self, sql, seq_of_params):
+        """sqlite3-style executemany, sent in pages via execute_batch."""
+        tr = _pg_sql(sql)
+        cur = self.raw.cursor()
+        psycopg2.extras.execute_batch(cur, tr['fmt'], [_pg_args(tr, p) for p in seq_of_params],
+                                      page_size=500)
         return cur
+    def _prepare(self, cur, tr):
+        """PREPARE tr on this session once; inside a savepoint so a statement
+        the server can't prepare (untyped parameter, ...) doesn't abort the
+        transaction — it just stays unprepared everywhere."""
+        if tr['name'] in self.prepared:
+            return True
+        try:
+            cur.execute("SAVEPOINT wa_prep")
+            cur.execute(f"PREPARE {tr['name']} AS {tr['native']}")
+            cur.execute("RELEASE SAVEPOINT wa_prep")
+        except Exception as e:
+            try:
+                cur.execute("ROLLBACK TO SAVEPOINT wa_prep")
+            except Exception:
+                pass
+            with _pg_stmt_lock:
+                _pg_unpreparable.add(tr['name'])
+            log_debug(f"  PREPARE skipped for {tr['name']}: {str(e)[:80]}")
+            return False
+        self.prepared.add(tr['name'])
+        return True
     def commit(self):
         self.raw.commit()
     def rollback(self):
@@ -277,6 +416,117 @@ class _PgConn:
     def close(self):
         try: self.raw.close()
         except Exception: pass
+    @property
+    def closed(self):
+        return bool(self.raw.closed)
+
+# Postgres connection pool behind get_db(). A fresh psycopg2.connect to a
+# hosted Postgres costs 100-300ms, so connections are checked out of a
+# bounded pool instead. Idle connections older than PG_POOL_CHECK_SEC get a
+# SELECT 1 before reuse. Fork-aware: gunicorn forks after import, and a
+# child that closed an inherited connection would terminate the parent's
+# session, so a new pid starts an empty pool and parks the inherited
+# connections unclosed.
+PG_POOL_MAX = int(os.environ.get('PG_POOL_MAX', '8'))
+PG_POOL_WAIT_SEC = float(os.environ.get('PG_POOL_WAIT_SEC', '30'))   # checkout timeout
+PG_POOL_CHECK_SEC = float(os.environ.get('PG_POOL_CHECK_SEC', '30'))  # idle age that triggers a ping
+
+def _pg_pool_new():
+    return {'pid': os.getpid(), 'cond': threading.Condition(), 'idle': [], 'size': 0,
+            'stats': {'checkouts': 0, 'connects': 0, 'reused': 0, 'health_failures': 0,
+                      'discarded': 0, 'timeouts': 0, 'wait_sec': 0.0, 'wait_max_sec': 0.0,
+                      'use_sec': 0.0, 'use_max_sec': 0.0}}
+
+_pg_pool = _pg_pool_new()
+_pg_orphans = []   # connections inherited across fork: kept referenced, never closed
+
+def _pg_pool_after_fork():
+    global _pg_pool
+    _pg_orphans.extend(conn for conn, _ts in _pg_pool['idle'])
+    _pg_pool = _pg_pool_new()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_pg_pool_after_fork)
+
+def _pg_checkout():
+    if _pg_pool['pid'] != os.getpid():
+        _pg_pool_after_fork()
+    pool = _pg_pool
+    st = pool['stats']
+    t0 = time.time()
+    with pool['cond']:
+        while True:
+            if pool['idle']:
+                conn, idle_since = pool['idle'].pop()
+                break
+            if pool['size'] < max(1, PG_POOL_MAX):
+                pool['size'] += 1
+                conn = idle_since = None
+                break
+            left = PG_POOL_WAIT_SEC - (time.time() - t0)
+            if left <= 0:
+                st['timeouts'] += 1
+                raise RuntimeError(f"Postgres pool exhausted ({PG_POOL_MAX} in use)")
+            pool['cond'].wait(left)
+        waited = time.time() - t0
+        st['checkouts'] += 1
+        st['wait_sec'] += waited
+        st['wait_max_sec'] = max(st['wait_max_sec'], waited)
+    if conn is not None and (conn.closed or time.time() - idle_since >= PG_POOL_CHECK_SEC):
+        try:
+            if conn.closed:
+                raise RuntimeError('closed')
+            conn.execute("SELECT 1").fetchone()
+            conn.rollback()
+        except Exception:
+            conn.close()
+            conn = None
+            with pool['cond']:
+                st['health_failures'] += 1
+    if conn is not None:
+        with pool['cond']:
+            st['reused'] += 1
+        return conn
+    try:
+        conn = _PgConn(DATABASE_URL)
+    except Exception:
+        with pool['cond']:
+            pool['size'] -= 1
+            pool['cond'].notify()
+        raise
+    with pool['cond']:
+        st['connects'] += 1
+    return conn
+
+def _pg_checkin(conn, used_sec):
+    pool = _pg_pool
+    if pool['pid'] != os.getpid():
+        _pg_orphans.append(conn)
+        return
+    conn.rollback()                        # never hand out an open transaction
+    with pool['cond']:
+        st = pool['stats']
+        st['use_sec'] += used_sec
+        st['use_max_sec'] = max(st['use_max_sec'], used_sec)
+        if conn.closed:
+            pool['size'] -= 1
+            st['discarded'] += 1
+        else:
+            pool['idle'].append((conn, time.time()))
+        pool['cond'].notify()
+
+def pg_pool_stats():
+    pool = _pg_pool
+    with pool['cond']:
+        st = dict(pool['stats'])
+        idle, size = len(pool['idle']), pool['size']
+    n = st['checkouts'] or 1
+    st.update(max_size=PG_POOL_MAX, open=size, idle=idle, in_use=size - idle,
+              avg_wait_ms=round(st['wait_sec'] / n * 1000, 2),
+              avg_use_ms=round(st['use_sec'] / n * 1000, 2),
+              wait_sec=round(st['wait_sec'], 3), use_sec=round(st['use_sec'], 3),
+              wait_max_sec=round(st['wait_max_sec'], 3), use_max_sec=round(st['use_max_sec'], 3))
+    return st
 
 _PG_SCHEMA = """
     CREATE TABLE IF NOT EXISTS opportunities (
@@ -290,10 +540,25 @@ _PG_SCHEMA = """
         kelly_fraction REAL, consensus_books INTEGER,
         closing_odds INTEGER, clv REAL, result TEXT,
         sport_key TEXT, event_id TEXT, settled_at TEXT, pnl REAL,
-        clv_captured_at TEXT
+        clv_captured_at TEXT, dedup_key TEXT
     )
 """
 
+# Box-score store behind _load_recent_form (same DDL on both backends)
+_FORM_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS form_days (sport_key TEXT NOT NULL, day TEXT NOT NULL, "
+    "final INTEGER, checked_at TEXT, PRIMARY KEY (sport_key, day))",
+    "CREATE TABLE IF NOT EXISTS form_events (sport_key TEXT NOT NULL, event_id TEXT NOT NULL, "
+    "day TEXT, fetched_at TEXT, PRIMARY KEY (sport_key, event_id))",
+    "CREATE TABLE IF NOT EXISTS form_box (sport_key TEXT NOT NULL, event_id TEXT NOT NULL, "
+    "team TEXT NOT NULL, player TEXT NOT NULL, pts REAL, "
+    "PRIMARY KEY (sport_key, event_id, team, player))",
+    "CREATE INDEX IF NOT EXISTS idx_form_events_day ON form_events(sport_key, day)",
+    "CREATE TABLE IF NOT EXISTS form_agg (sport_key TEXT NOT NULL, win TEXT NOT NULL, "
+    "kind TEXT NOT NULL, name TEXT NOT NULL, team TEXT, g INTEGER, pts_pg REAL, "
+    "computed_at REAL, PRIMARY KEY (sport_key, win, kind, name))",
+]
+
 def init_db():
     if USE_PG:
         try:
@@ -306,9 +571,12 @@ def init_db():
                 "ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS settled_at TEXT",
                 "ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS pnl REAL",
                 "ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS clv_captured_at TEXT",
+                "ALTER TABLE opportunities ADD COLUMN IF NOT EXISTS dedup_key TEXT",
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_dedup_key ON opportunities(dedup_key)",
                 "CREATE INDEX IF NOT EXISTS idx_scan_time ON opportunities(scan_time)",
                 "CREATE INDEX IF NOT EXISTS idx_commence ON opportunities(commence_time)",
                 "CREATE INDEX IF NOT EXISTS idx_scan_id ON opportunities(scan_id)",
+                *_FORM_SCHEMA,
             ]:
                 try:
                     conn.execute(mig)
@@ -350,6 +618,8 @@ def init_db():
             conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_time ON opportunities(scan_time)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_commence ON opportunities(commence_time)")
             conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_id ON opportunities(scan_id)")
+            for ddl in _FORM_SCHEMA:
+                conn.execute(ddl)
             # Migrations — safe to re-run, "duplicate column" errors ignored
             for col_sql in [
                 "ALTER TABLE opportunities ADD COLUMN sport_key TEXT",
@@ -357,11 +627,14 @@ def init_db():
                 "ALTER TABLE opportunities ADD COLUMN settled_at TEXT",
                 "ALTER TABLE opportunities ADD COLUMN pnl REAL",
                 "ALTER TABLE opportunities ADD COLUMN clv_captured_at TEXT",
+                "ALTER TABLE opportunities ADD COLUMN dedup_key TEXT",
             ]:
                 try:
                     conn.execute(col_sql)
                 except sqlite3.OperationalError:
                     pass
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_dedup_key "
+                         "ON opportunities(dedup_key)")
         if not DATABASE_URL:
             print("DB: SQLite at " + DB_PATH + " — WARNING: on Render this is "
                   "wiped every deploy/restart. Set DATABASE_URL for persistence.",
@@ -372,7 +645,8 @@ def init_db():
 @contextmanager
 def get_db():
     if USE_PG:
-        conn = _PgConn(DATABASE_URL)
+        conn = _pg_checkout()
+        t0 = time.time()
         try:
             yield conn
             conn.commit()
@@ -380,7 +654,7 @@ def get_db():
             conn.rollback()
             raise
         finally:
-            conn.close()
+            _pg_checkin(conn, time.time() - t0)
         return
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
@@ -390,50 +664,123 @@ def get_db():
     finally:
         conn.close()
 
-def log_opportunity(opp, scan_id):
+# Forward-test hygiene: scans repeat every few minutes, so the same live
+# edge would get logged dozens of times and overweight persistent (often
+# stale) quotes in every downstream statistic. One row per unique bet per
+# 12h = "the bet you'd actually place." The sliding 12h window is checked in
+# memory against the keys logged recently; each call first pulls the rows
+# logged since the last pull (by any process), so another process's rows
+# count too. The unique dedup_key index (bet + fixed 12h bucket) catches
+# the races that slip between two pulls, so a whole scan is one multi-row
+# INSERT ... ON CONFLICT.
+_OPP_DEDUP_SEC = 12 * 3600
+_OPP_SYNC_LAG_SEC = 60   # re-read this much before the last pull: late commits
+_OPP_COLS = ('scan_id', 'scan_time', 'commence_time', 'sport', 'market', 'player', 'game',
+             'book', 'bet_type', 'recommendation', 'line', 'odds', 'edge', 'fair_prob',
+             'target_prob', 'kelly_fraction', 'consensus_books', 'sport_key', 'event_id',
+             'dedup_key')
+_opp_seen = None   # (player, game, market, book) -> epoch last logged; None = not primed
+_opp_synced = ''   # scan_time (ISO) the DB has been pulled up to
+_opp_seen_lock = threading.Lock()
+
+def _opp_dedup_bet(opp):
+    return (opp.get('player', ''), opp.get('game', ''),
+            opp.get('market', ''), opp.get('book', ''))
+
+def _opp_row(opp, scan_id, now):
+    bet = _opp_dedup_bet(opp)
+    return (
+        scan_id,
+        now.isoformat(),
+        opp.get('commence', ''),
+        opp.get('sport', ''),
+        opp.get('market', ''),
+        opp.get('player', ''),
+        opp.get('game', ''),
+        opp.get('book', ''),
+        opp.get('type', ''),
+        opp.get('recommendation', ''),
+        float(opp.get('line', 0) or 0),
+        int(opp.get('odds', 0) or 0),
+        float(opp.get('edge', 0) or 0),
+        float(opp.get('fair_prob', 0) or 0),
+        float(opp.get('target_prob', 0) or 0),
+        float(opp.get('kelly_fraction', 0) or 0),
+        int(opp.get('consensus_books', 0) or 0),
+        opp.get('sport_key', ''),
+        opp.get('event_id', ''),
+        '|'.join([str(int(now.timestamp() // _OPP_DEDUP_SEC)), *bet]),
+    )
+
+def _opp_seen_pull(conn, since, seen):
+    """Merge into `seen` the bets logged with scan_time > `since`."""
+    for r in conn.execute(
+            "SELECT player, game, market, book, MAX(scan_time) FROM opportunities "
+            "WHERE scan_time > ? GROUP BY player, game, market, book", (since,)).fetchall():
+        try:
+            ts = datetime.fromisoformat(r[4]).timestamp()
+        except (TypeError, ValueError):
+            continue
+        bet = (r[0] or '', r[1] or '', r[2] or '', r[3] or '')
+        seen[bet] = max(ts, seen.get(bet, 0.0))
+    return seen
+
+def log_opportunities(opps, scan_id):
+    """Log a scan's opportunities in one statement, skipping any bet already
+    logged in the last 12h. Returns the number of rows inserted."""
+    global _opp_seen, _opp_synced
+    if not opps:
+        return 0
+    now = datetime.now()
+    claimed = []
     try:
         with get_db() as conn:
-            # Forward-test hygiene: scans repeat every few minutes, so the same
-            # live edge would get logged dozens of times and overweight
-            # persistent (often stale) quotes in every downstream statistic.
-            # One row per unique bet per 12h = "the bet you'd actually place."
-            cutoff = (datetime.now() - timedelta(hours=12)).isoformat()
-            dup = conn.execute(
-                "SELECT 1 FROM opportunities WHERE player = ? AND game = ? "
-                "AND market = ? AND book = ? AND scan_time > ? LIMIT 1",
-                (opp.get('player', ''), opp.get('game', ''),
-                 opp.get('market', ''), opp.get('book', ''), cutoff)).fetchone()
-            if dup:
-                return
-            conn.execute("""
-                INSERT INTO opportunities (scan_id, scan_time, commence_time, sport, market,
-                    player, game, book, bet_type, recommendation, line, odds, edge,
-                    fair_prob, target_prob, kelly_fraction, consensus_books,
-                    sport_key, event_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                scan_id,
-                datetime.now().isoformat(),
-                opp.get('commence', ''),
-                opp.get('sport', ''),
-                opp.get('market', ''),
-                opp.get('player', ''),
-                opp.get('game', ''),
-                opp.get('book', ''),
-                opp.get('type', ''),
-                opp.get('recommendation', ''),
-                float(opp.get('line', 0) or 0),
-                int(opp.get('odds', 0) or 0),
-                float(opp.get('edge', 0) or 0),
-                float(opp.get('fair_prob', 0) or 0),
-                float(opp.get('target_prob', 0) or 0),
-                float(opp.get('kelly_fraction', 0) or 0),
-                int(opp.get('consensus_books', 0) or 0),
-                opp.get('sport_key', ''),
-                opp.get('event_id', ''),
-            ))
+            with _opp_seen_lock:
+                cutoff = (now - timedelta(seconds=_OPP_DEDUP_SEC)).isoformat()
+                if _opp_seen is None:
+                    _opp_seen, _opp_synced = {}, ''
+                since = (datetime.fromisoformat(_opp_synced)
+                         - timedelta(seconds=_OPP_SYNC_LAG_SEC)).isoformat() if _opp_synced else ''
+                _opp_seen_pull(conn, max(since, cutoff), _opp_seen)
+                _opp_synced = now.isoformat()
+                horizon = now.timestamp() - _OPP_DEDUP_SEC
+                for k in [k for k, ts in _opp_seen.items() if ts <= horizon]:
+                    del _opp_seen[k]
+                rows = []
+                for opp in opps:
+                    bet = _opp_dedup_bet(opp)
+                    if bet in _opp_seen:
+                        continue
+                    _opp_seen[bet] = now.timestamp()
+                    claimed.append(bet)
+                    rows.append(_opp_row(opp, scan_id, now))
+            if not rows:
+                return 0
+            ph = '(' + ', '.join('?' * len(_OPP_COLS)) + ')'
+            per = 2000 if USE_PG else 999 // len(_OPP_COLS)   # bound-parameter limits
+            inserted = 0
+            for i in range(0, len(rows), per):
+                chunk = rows[i:i + per]
+                cur = conn.execute(
+                    f"INSERT INTO opportunities ({', '.join(_OPP_COLS)}) VALUES "
+                    + ', '.join([ph] * len(chunk))
+                    + " ON CONFLICT (dedup_key) DO NOTHING",
+                    tuple(v for row in chunk for v in row))
+                inserted += cur.rowcount if cur.rowcount >= 0 else len(chunk)
+            conn.commit()
+        _clv_schedule((o.get('sport_key', ''), o.get('event_id', ''), o.get('commence', ''))
+                      for o in opps if o.get('type') in ('player_prop', 'game_market'))
+        return inserted
     except Exception as e:
+        with _opp_seen_lock:                     # not written: let the next scan retry
+            for bet in claimed:
+                if _opp_seen is not None:
+                    _opp_seen.pop(bet, None)
         log_debug(f"DB log error: {e}")
+        return 0
+
+def log_opportunity(opp, scan_id):
+    log_opportunities([opp], scan_id)
 
 init_db()
 
@@ -473,8 +820,142 @@ def kalshi_headers():
         return {'Authorization': f'Bearer {KALSHI_API_KEY}', 'Content-Type': 'application/json'}
     return {'Content-Type': 'application/json'}
 
+# Every Kalshi call spends a token from one process-wide bucket refilled at
+# KALSHI_RATE/s (Basic tier allows 20 reads/s), so the series crawls can
+# run on a pool without tripping the limit. A 429 pauses the whole bucket
+# for its Retry-After and the call is retried.
+KALSHI_RATE = float(os.environ.get('KALSHI_RATE', '15'))   # requests/sec
+KALSHI_BURST = int(os.environ.get('KALSHI_BURST', '10'))
+KALSHI_WORKERS = int(os.environ.get('KALSHI_WORKERS', '6'))
+KALSHI_RETRIES = int(os.environ.get('KALSHI_RETRIES', '4'))
+_kalshi_bucket = {'tokens': float(KALSHI_BURST), 'ts': 0.0, 'hold': 0.0}
+_kalshi_bucket_lock = threading.Lock()
+_kalshi_pool = ThreadPoolExecutor(max_workers=max(1, KALSHI_WORKERS),
+                                  thread_name_prefix='kalshi')
+
+def _kalshi_take():
+    """Block until the bucket has a request to spend, then spend it."""
+    b = _kalshi_bucket
+    while True:
+        with _kalshi_bucket_lock:
+            now = time.monotonic()
+            b['tokens'] = min(float(KALSHI_BURST), b['tokens'] + (now - b['ts']) * KALSHI_RATE)
+            b['ts'] = now
+            if now >= b['hold'] and b['tokens'] >= 1:
+                b['tokens'] -= 1
+                return
+            wait = max(b['hold'] - now, (1 - b['tokens']) / max(KALSHI_RATE, 0.1))
+        time.sleep(wait)
+
+def _kalshi_fetch(url, params=None, headers=None, timeout=15):
+    for attempt in range(max(1, KALSHI_RETRIES)):
+        _kalshi_take()
+        resp = requests.get(url, params=params, headers=headers, timeout=timeout)
+        if resp.status_code != 429 or attempt == KALSHI_RETRIES - 1:
+            return resp
+        try:
+            wait = float((getattr(resp, 'headers', None) or {}).get('Retry-After'))
+        except (TypeError, ValueError):
+            wait = 2 ** attempt
+        with _kalshi_bucket_lock:
+            _kalshi_bucket['hold'] = max(_kalshi_bucket['hold'],
+                                         time.monotonic() + min(30.0, wait))
+            _kalshi_bucket['tokens'] = 0.0
+    return resp
+
 def kalshi_get(url, params=None, timeout=15):
-    return requests.get(url, params=params, headers=kalshi_headers(), timeout=timeout)
+    return _exchange_get(url, params, kalshi_headers(), timeout, fetch=_kalshi_fetch)
+
+def _kalshi_map(fn, items):
+    """[fn(x) for x in items] on the Kalshi pool, order preserved. Callers
+    must not already be running on _kalshi_pool."""
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(x) for x in items]
+    return list(_kalshi_pool.map(_in_xscope(fn), items))
+
+def _kalshi_series_pages(series_list, limit=50, timeout=10):
+    """{series: first open-markets response, or the exception raised},
+    fetched concurrently."""
+    def one(series):
+        try:
+            return kalshi_get(f"{KALSHI_API}/markets", params={
+                'series_ticker': series, 'status': 'open', 'limit': limit}, timeout=timeout)
+        except Exception as e:
+            return e
+    return dict(zip(series_list, _kalshi_map(one, series_list)))
+
+# Scan-scoped exchange cache. Sports consensus, cross-exchange, weather and
+# econ each list Kalshi/Polymarket markets on their own, often with the
+# same query. Inside _exchange_scope (one per scan) every listing GET is
+# made once and later identical calls get the stored response; its .json()
+# re-parses, so callers that mutate markets never see each other's edits.
+# Only 200s are kept, so a 429 retry still goes upstream.
+# The scope is per thread: the scan's own thread opens it and _in_xscope
+# carries it into the stage / Kalshi pool tasks the scan submits, so request
+# threads and overlapping scans each see only their own (or no) scope. Each
+# thread inside holds a reference; the last one out closes it.
+# scope: {'resp': {key: Response}, 'locks': {key: Lock}, 'calls': n, 'saved': n, 'refs': n}
+_xscope_tls = threading.local()
+_xscope_lock = threading.Lock()
+_xscope_last = {}   # calls/saved of the most recently closed scope, for /api/feed-status
+
+def _exchange_listing(url):
+    return url in (f"{KALSHI_API}/markets", f"{POLYMARKET_API}/markets")
+
+def _exchange_get(url, params=None, headers=None, timeout=15, fetch=None):
+    fetch = fetch or requests.get
+    sc = getattr(_xscope_tls, 'scope', None)
+    if sc is None or not _exchange_listing(url):
+        return fetch(url, params=params, headers=headers, timeout=timeout)
+    key = (url, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+    with _xscope_lock:
+        lock = sc['locks'].setdefault(key, threading.Lock())
+    with lock:                                  # concurrent twins wait for one fetch
+        resp = sc['resp'].get(key)
+        if resp is not None:
+            with _xscope_lock:
+                sc['saved'] += 1
+            return resp
+        resp = fetch(url, params=params, headers=headers, timeout=timeout)
+        with _xscope_lock:
+            sc['calls'] += 1
+        if resp.status_code == 200:
+            sc['resp'][key] = resp
+        return resp
+
+@contextmanager
+def _exchange_scope(sc=None):
+    """Enter the exchange cache on this thread: join `sc` if given, else the
+    thread's current scope, else open a new one for this scan."""
+    prev = getattr(_xscope_tls, 'scope', None)
+    sc = sc or prev or {'resp': {}, 'locks': {}, 'calls': 0, 'saved': 0, 'refs': 0}
+    with _xscope_lock:
+        sc['refs'] += 1
+    _xscope_tls.scope = sc
+    try:
+        yield sc
+    finally:
+        _xscope_tls.scope = prev
+        with _xscope_lock:
+            sc['refs'] -= 1
+            closed = sc['refs'] == 0
+            if closed:
+                _xscope_last.update(calls=sc['calls'], saved=sc['saved'], ts=time.time())
+        if closed and (sc['calls'] or sc['saved']):
+            log_debug(f"Exchange cache: {sc['calls']} upstream calls, "
+                      f"{sc['saved']} saved")
+
+def _in_xscope(fn):
+    """`fn` bound to the calling thread's exchange scope, for handing to a
+    pool: the worker joins that scope for the duration of the call."""
+    sc = getattr(_xscope_tls, 'scope', None)
+    if sc is None:
+        return fn
+    def run(*a, **kw):
+        with _exchange_scope(sc):
+            return fn(*a, **kw)
+    return run
 
 def kalshi_prices(m):
     """Extract yes_bid, yes_ask, last_price from a Kalshi market dict in cents (int).
@@ -739,6 +1220,9 @@ def kalshi_fee_pct(price_prob):
 
 
 POLYMARKET_API = "https://gamma-api.polymarket.com"
+
+def poly_get(url, params=None, timeout=15):
+    return _exchange_get(url, params, None, timeout)
 OPEN_METEO_API = "https://api.open-meteo.com/v1/forecast"
 
 # ============================================================
@@ -937,6 +1421,12 @@ def _cache_set(key, data):
     with _cache_lock:
         _odds_cache[key] = (data, time.time())
 
+def _cache_drop_sport(sport):
+    """Forget cached odds/events for a sport (its snapshot was just replaced)."""
+    with _cache_lock:
+        for k in [k for k in _odds_cache if k.split(':')[1:2] == [sport]]:
+            del _odds_cache[k]
+
 def _slice_market(data, market):
     """Cut a multi-market Odds API response down to one market key."""
     out = []
@@ -1111,9 +1601,6 @@ def _kalshi_series_markets(series, log, max_pages=2):
         except Exception as e:
             log(f"  Kalshi {series}: {str(e)[:60]}")
             return out
-        if resp.status_code == 429:
-            time.sleep(3)
-            resp = kalshi_get(f"{KALSHI_API}/markets", params=params, timeout=20)
         if resp.status_code != 200:
             log(f"  Kalshi {series}: HTTP {resp.status_code}")
             return out
@@ -1122,7 +1609,6 @@ def _kalshi_series_markets(series, log, max_pages=2):
         cursor = data.get('cursor', '')
         if not cursor:
             break
-        time.sleep(0.35)
     return out
 
 
@@ -1146,9 +1632,14 @@ def fetch_kalshi_sports(log_fn=None):
     horizon = now + timedelta(days=7)
     games_matched, games_close = 0, {}
 
+    # every series at once; pages within a series follow the cursor
+    jobs = ([(series, 2) for series, _c in KALSHI_GAME_SERIES] +
+            [(series, 3) for series, _t in KALSHI_PROP_SERIES])
+    listed = _kalshi_map(lambda j: _kalshi_series_markets(j[0], log, max_pages=j[1]), jobs)
+    game_lists, prop_lists = listed[:len(KALSHI_GAME_SERIES)], listed[len(KALSHI_GAME_SERIES):]
+
     # ---- single-game moneylines ----
-    for series, codes in KALSHI_GAME_SERIES:
-        mkts = _kalshi_series_markets(series, log)
+    for (series, codes), mkts in zip(KALSHI_GAME_SERIES, game_lists):
         hit = 0
         skip = {'code': 0, 'opp': 0, 'window': 0, 'unpriced': 0}
         sample = ''
@@ -1210,14 +1701,12 @@ def fetch_kalshi_sports(log_fn=None):
                 log(f"    skips: {skip['code']} unknown-code, {skip['opp']} opp-parse, "
                     f"{skip['window']} close-window, {skip['unpriced']} unpriced"
                     + (f" | e.g. {sample}" if sample else ''))
-        time.sleep(0.35)
 
     games_matched = len(result['games'])
 
     # ---- player props ("Name: 20+" sub-titles) ----
     total_parsed = 0
-    for series, market_type in KALSHI_PROP_SERIES:
-        mkts = _kalshi_series_markets(series, log, max_pages=3)
+    for (series, market_type), mkts in zip(KALSHI_PROP_SERIES, prop_lists):
         hit = 0
         for mkt in mkts:
             sub = (mkt.get('yes_sub_title') or mkt.get('subtitle') or
@@ -1237,7 +1726,6 @@ def fetch_kalshi_sports(log_fn=None):
             total_parsed += 1
         if mkts or hit:
             log(f"  Kalshi {series}: {len(mkts)} singles, {hit} prop lines")
-        time.sleep(0.35)
 
     log(f"  Kalshi: {total_parsed} player prop lines for {len(result['props'])} players")
     log(f"  Kalshi: {games_matched} game moneylines priced")
@@ -1269,7 +1757,7 @@ def fetch_polymarket_sports(log_fn=None):
     markets, samples = [], []
     try:
         for offset in (0, 100, 200):
-            resp = requests.get(f"{POLYMARKET_API}/markets",
+            resp = poly_get(f"{POLYMARKET_API}/markets",
                 params={'closed': 'false', 'active': 'true', 'limit': 100,
                         'offset': offset, 'order': 'volume24hr',
                         'ascending': 'false'},
@@ -1369,46 +1857,202 @@ def fetch_polymarket_sports(log_fn=None):
         log(f"  Polymarket error: {e}")
     return result
 
-def analyze_game_markets(games_data, market_name="", poly_games=None, kalshi_games=None):
+# ---- per-game odds matrix ----
+# One parse of bookmakers -> markets -> outcomes per game, shared by the +EV
+# analyzer and the arb/middle finder. Direct-feed views are kept current in
+# _best_index by _on_snapshot as snapshots change, so a scan just looks them up.
+_best_index = {}          # (event_id, market_key) -> odds matrix + 'sport', 'game'
+_best_lock = threading.Lock()
+
+
+def _game_book_odds(game):
+    """book -> {(outcome name, point): american odds} for one game view."""
+    book_odds = {}
+    for bookmaker in game.get('bookmakers', []):
+        bk = bookmaker['key']
+        book_odds[bk] = {}
+        for market in bookmaker.get('markets', []):
+            for outcome in market.get('outcomes', []):
+                name = outcome.get('name', '')
+                odds = outcome.get('price')
+                point = outcome.get('point')
+                if not name or odds is None:
+                    continue
+                key = (name, float(point) if point is not None else None)
+                book_odds[bk][key] = odds
+    return book_odds
+
+
+def _odds_matrix(game):
+    """Normalize one game into
+      book_odds: book -> {(outcome, point): american odds}
+      implied:   book -> {(outcome, point): implied prob}
+      juice:     book -> overround % (books quoting >= 2 outcomes)
+      devig:     book -> {(outcome, point): n-way multiplicative fair prob}
+      best:      (outcome, point) -> (odds, book) at the lowest implied prob
+                 across CO_BETTABLE books; ties keep the earlier book.
+    Treat it as read-only: it is shared across analyzers and scans."""
+    book_odds = _game_book_odds(game)
+    implied, juice, devig, best = {}, {}, {}, {}
+    for bk, pairs in book_odds.items():
+        imps = {k: american_to_implied(o) for k, o in pairs.items()}
+        implied[bk] = imps
+        if bk in CO_BETTABLE:
+            for k, o in pairs.items():
+                cur = best.get(k)
+                if cur is None or imps[k] < implied[cur[1]][k]:
+                    best[k] = (o, bk)
+        if len(imps) < 2:
+            continue
+        # n-way multiplicative devig: identical to devig_pair for 2 outcomes,
+        # correct for 3-way soccer moneylines (home/draw/away)
+        total_imp = sum(imps.values())
+        if total_imp <= 0:
+            continue
+        juice[bk] = round((total_imp - 1.0) * 100, 1)
+        devig[bk] = {k: clamp_prob(v / total_imp) for k, v in imps.items()}
+    return {'book_odds': book_odds, 'implied': implied, 'juice': juice,
+            'devig': devig, 'best': best}
+
+
+def _view_market(game):
+    for bk in game.get('bookmakers', []):
+        for m in bk.get('markets', []):
+            return m.get('key')
+    return None
+
+
+def _game_matrix(game):
+    """The odds matrix for a game — from _best_index when the entry was
+    built from this very view, else computed on the spot."""
+    entry = _best_index.get((game.get('id'), _view_market(game)))
+    if entry is not None and entry['game'] is game:
+        return entry
+    return _odds_matrix(game)
+
+
+def _matrices(games_data, matrices):
+    if matrices is None:
+        return [_game_matrix(g) for g in games_data]
+    return matrices
+
+
+def _edge_ok(net_edge, key):
+    # Point markets (spreads/totals) cluster near 50/50 — a big
+    # "edge" there is a stale line, not free money.
+    edge_cap = MAX_EDGE_POINT if key[1] is not None else MAX_EDGE_NET
+    return not (net_edge < MIN_EDGE_NET or net_edge > edge_cap)
+
+
+def _game_edges_py(rows):
+    """Per game, the (eval_book, key, consensus_fair, n_others, net_edge)
+    candidates that clear the edge band, in book then key order. Each row
+    is (book_odds, book_devigged, implied, keys) for one game; consensus is
+    the BOOK_WEIGHT-weighted mean of every OTHER book's fair prob."""
+    out = []
+    for book_pairs, book_devigged, implied, keys in rows:
+        cands = []
+        for eval_book in book_devigged:
+            if eval_book not in book_pairs or eval_book not in CO_BETTABLE:
+                continue
+            for key in keys:
+                if key not in book_pairs[eval_book] or key not in book_devigged[eval_book]:
+                    continue
+                num, den, n = 0, 0, 0
+                for other_bk in book_devigged:
+                    if other_bk != eval_book and key in book_devigged[other_bk]:
+                        w = get_weight(other_bk)
+                        num += book_devigged[other_bk][key] * w
+                        den += w
+                        n += 1
+                if n < 1:   # was 2; 1 sharp counterparty (Pinnacle) is a valid +EV ref
+                    continue
+                consensus_fair = clamp_prob(num / den)
+                net_edge = (consensus_fair - implied[eval_book][key]) * 100
+                if _edge_ok(net_edge, key):
+                    cands.append((eval_book, key, consensus_fair, n, net_edge))
+        out.append(cands)
+    return out
+
+
+def _game_edges_np(rows):
+    """_game_edges_py as array ops over a games x books x keys cube. Sums run
+    book by book in each game's own order (masked terms add 0.0), so every
+    float matches the Python path bit for bit."""
+    if not rows:
+        return []
+    G = len(rows)
+    B = max(len(r[1]) for r in rows) or 1
+    K = max(len(r[3]) for r in rows) or 1
+    # gather flat cube offsets in Python, scatter them in one shot each
+    fi, fv, ei, ev = [], [], [], []
+    wt = [[0] * B for _ in rows]
+    cap = [[MAX_EDGE_NET] * K for _ in rows]
+    books = []
+    for g, (book_pairs, book_devigged, implied, keys) in enumerate(rows):
+        bl = list(book_devigged)
+        books.append(bl)
+        kpos = {key: k for k, key in enumerate(keys)}
+        for k, key in enumerate(keys):
+            if key[1] is not None:
+                cap[g][k] = MAX_EDGE_POINT
+        for b, bk in enumerate(bl):
+            wt[g][b] = get_weight(bk)
+            base = (g * B + b) * K
+            dv = book_devigged[bk]
+            fi.extend([base + kpos[key] for key in dv])
+            fv.extend(dv.values())
+            if bk in book_pairs and bk in CO_BETTABLE:
+                ks = [key for key in book_pairs[bk] if key in dv]
+                ei.extend([base + kpos[key] for key in ks])
+                ev.extend([implied[bk][key] for key in ks])
+    fair = _np.zeros(G * B * K)
+    has = _np.zeros(G * B * K, dtype=bool)
+    imp = _np.zeros(G * B * K)
+    elig = _np.zeros(G * B * K, dtype=bool)
+    fair[fi] = fv
+    has[fi] = True
+    imp[ei] = ev
+    elig[ei] = True
+    fair, has, imp, elig = (a.reshape(G, B, K) for a in (fair, has, imp, elig))
+    wt = _np.array(wt, dtype=float)
+    cap = _np.array(cap)
+    contrib = fair * wt[:, :, None]
+    num = _np.zeros((G, B, K))
+    den = _np.zeros((G, B, K))
+    cnt = _np.zeros((G, B, K), dtype=int)
+    others = ~_np.eye(B, dtype=bool)          # [eval, other]
+    for b in range(B):
+        m = has[:, b, :][:, None, :] & others[:, b][None, :, None]
+        num += _np.where(m, contrib[:, b, :][:, None, :], 0.0)
+        den += _np.where(m, wt[:, b][:, None, None], 0.0)
+        cnt += m
+    cons = _np.clip(num / _np.where(cnt > 0, den, 1.0), 0.01, 0.99)
+    net = (cons - imp) * 100
+    ok = elig & (cnt >= 1) & ~(net < MIN_EDGE_NET) & ~(net > cap[:, None, :])
+    out = [[] for _ in rows]
+    for (g, b, k), c, n, e in zip(_np.argwhere(ok).tolist(), cons[ok].tolist(),
+                                  cnt[ok].tolist(), net[ok].tolist()):
+        out[g].append((books[g][b], rows[g][3][k], c, n, e))
+    return out
+
+
+def analyze_game_markets(games_data, market_name="", poly_games=None, kalshi_games=None,
+                         matrices=None):
+    """+EV game-line bets: each CO book's price vs the weighted devigged
+    consensus of every other book (exchanges overlaid on moneylines).
+    `matrices` (parallel to games_data, see _odds_matrix) skips re-parsing
+    when the caller already has them."""
     if not games_data:
         return []
     opportunities = []
 
-    for game in games_data:
-        game_info = f"{game.get('away_team', '?')} @ {game.get('home_team', '?')}"
-        commence = game.get('commence_time', '')
-        sport_key_val = game.get('sport_key', '') or ''
-        event_id_val = game.get('id', '') or ''
-
-        book_pairs = {}
-        for bookmaker in game.get('bookmakers', []):
-            bk = bookmaker['key']
-            book_pairs[bk] = {}
-            for market in bookmaker.get('markets', []):
-                for outcome in market.get('outcomes', []):
-                    name = outcome.get('name', '')
-                    odds = outcome.get('price')
-                    point = outcome.get('point')
-                    if not name or odds is None:
-                        continue
-                    key = (name, float(point) if point is not None else None)
-                    book_pairs[bk][key] = odds
-
-        book_devigged = {}
-        book_juice = {}
-        for bk, pairs in book_pairs.items():
-            keys = list(pairs.keys())
-            if len(keys) < 2:
-                continue
-            # n-way multiplicative devig: identical to devig_pair for 2 outcomes,
-            # correct for 3-way soccer moneylines (home/draw/away)
-            imps = {k: american_to_implied(pairs[k]) for k in keys}
-            total_imp = sum(imps.values())
-            if total_imp <= 0:
-                continue
-            book_juice[bk] = round((total_imp - 1.0) * 100, 1)
-            book_devigged[bk] = {k: clamp_prob(v / total_imp)
-                                 for k, v in imps.items()}
+    # Pass 1: per-game fair probs (books + exchange overlays). Pass 2: the
+    # consensus/edge math for the whole slate at once (_game_edges_*).
+    # Pass 3: cards for the survivors.
+    prepared = []     # (game, matrix, book_devigged, outcome keys)
+    for game, mx in zip(games_data, _matrices(games_data, matrices)):
+        book_devigged = dict(mx['devig'])    # exchange overlays added below
 
         if len(book_devigged) < 2:   # was 3; direct feeds yield 2-3 books in-season
             continue
@@ -1491,89 +2135,72 @@ def analyze_game_markets(games_data, market_name="", poly_games=None, kalshi_gam
         all_keys = set()
         for bk in book_devigged:
             all_keys.update(book_devigged[bk].keys())
+        prepared.append((game, mx, book_devigged, list(all_keys)))
 
-        for eval_book in book_devigged:
-            if eval_book not in book_pairs:
-                continue
-            if eval_book not in CO_BETTABLE:
-                continue
-
-            for key in all_keys:
-                if key not in book_pairs[eval_book]:
-                    continue
-                if key not in book_devigged.get(eval_book, {}):
-                    continue
+    rows = [(mx['book_odds'], bd, mx['implied'], keys) for _g, mx, bd, keys in prepared]
+    edges = (_game_edges_np if _np is not None and VECTOR_ENGINE else _game_edges_py)(rows)
 
-                other_fairs = []
-                other_weights = []
-                other_detail = []
-                for other_bk in book_devigged:
-                    if other_bk == eval_book:
-                        continue
-                    if key in book_devigged[other_bk]:
-                        w = get_weight(other_bk)
-                        fair = book_devigged[other_bk][key]
-                        other_fairs.append(fair)
-                        other_weights.append(w)
-                        raw_odds = book_pairs.get(other_bk, {}).get(key)
-                        other_detail.append({
-                            'book': BOOK_DISPLAY.get(other_bk, other_bk),
-                            'fair_prob': round(fair * 100, 1),
-                            'fair_odds': format_american(implied_to_american(fair)),
-                            'raw_odds': format_american(raw_odds) if raw_odds else '—',
-                            'weight': w,
-                        })
+    for (game, mx, book_devigged, _keys), cands in zip(prepared, edges):
+        game_info = f"{game.get('away_team', '?')} @ {game.get('home_team', '?')}"
+        commence = game.get('commence_time', '')
+        sport_key_val = game.get('sport_key', '') or ''
+        event_id_val = game.get('id', '') or ''
+        book_pairs = mx['book_odds']
+        book_juice = mx['juice']
 
-                if len(other_fairs) < 1:   # was 2; 1 sharp counterparty (Pinnacle) is a valid +EV ref
+        for eval_book, key, consensus_fair, n_others, net_edge in cands:
+            other_detail = []
+            for other_bk in book_devigged:
+                if other_bk == eval_book:
                     continue
+                if key in book_devigged[other_bk]:
+                    w = get_weight(other_bk)
+                    fair = book_devigged[other_bk][key]
+                    raw_odds = book_pairs.get(other_bk, {}).get(key)
+                    other_detail.append({
+                        'book': BOOK_DISPLAY.get(other_bk, other_bk),
+                        'fair_prob': round(fair * 100, 1),
+                        'fair_odds': format_american(implied_to_american(fair)),
+                        'raw_odds': format_american(raw_odds) if raw_odds else '—',
+                        'weight': w,
+                    })
 
-                total_weight = sum(other_weights)
-                consensus_fair = clamp_prob(
-                    sum(f * w for f, w in zip(other_fairs, other_weights)) / total_weight)
-                eval_implied = american_to_implied(book_pairs[eval_book][key])
-                eval_fair = book_devigged[eval_book][key]
-
-                net_edge = (consensus_fair - eval_implied) * 100
-                gross_edge = (consensus_fair - eval_fair) * 100
-                juice_pct = book_juice.get(eval_book, 0)
-
-                # Point markets (spreads/totals) cluster near 50/50 — a big
-                # "edge" there is a stale line, not free money.
-                edge_cap = MAX_EDGE_POINT if key[1] is not None else MAX_EDGE_NET
-                if net_edge < MIN_EDGE_NET or net_edge > edge_cap:
-                    continue
+            eval_implied = mx['implied'][eval_book][key]
+            eval_fair = book_devigged[eval_book][key]
+            gross_edge = (consensus_fair - eval_fair) * 100
+            juice_pct = book_juice.get(eval_book, 0)
 
-                name, point = key
-                if point is not None:
-                    display_name = f"{name} {point}" if 'Total' in market_name else f"{name} {point:+.1f}"
-                else:
-                    display_name = f"{name} ML"
+            name, point = key
+            if point is not None:
+                display_name = f"{name} {point}" if 'Total' in market_name else f"{name} {point:+.1f}"
+            else:
+                display_name = f"{name} ML"
 
-                fair_american = implied_to_american(consensus_fair)
-                odds = book_pairs[eval_book][key]
-                kf = quarter_kelly(consensus_fair, odds)
+            fair_american = implied_to_american(consensus_fair)
+            odds = book_pairs[eval_book][key]
+            kf = quarter_kelly(consensus_fair, odds)
 
-                opportunities.append({
-                    'player': display_name, 'game': game_info, 'commence': commence,
-                    'line': point if point is not None else 0,
-                    'sport_key': sport_key_val, 'event_id': event_id_val,
-                    'market': market_name, 'book': BOOK_DISPLAY.get(eval_book, eval_book),
-                    'book_key': eval_book, 'type': 'game_market',
-                    'edge': round(net_edge, 1), 'gross_edge': round(gross_edge, 1),
-                    'recommendation': f"BET {display_name}", 'odds': odds,
-                    'label1_name': f'{BOOK_DISPLAY.get(eval_book, eval_book)} Odds',
-                    'label1_value': format_american(odds),
-                    'label2_name': f'Fair Odds ({len(other_fairs)} books)',
-                    'label2_value': format_american(fair_american),
-                    'label3_name': 'Net Edge', 'label3_value': f"+{net_edge:.1f}%",
-                    'target_prob': round(eval_implied * 100, 1),
-                    'fair_prob': round(consensus_fair * 100, 1),
-                    'juice_display': f"{juice_pct}%",
-                    'consensus_books': len(other_fairs),
-                    'consensus_detail': other_detail,
-                    'kelly_fraction': round(kf * 100, 2),
-                    'affiliate_url': affiliate_url(eval_book),
-                })
+            opportunities.append({
+                'player': display_name, 'game': game_info, 'commence': commence,
+                'line': point if point is not None else 0,
+                'sport_key': sport_key_val, 'event_id': event_id_val,
+                'market': market_name, 'book': BOOK_DISPLAY.get(eval_book, eval_book),
+                'book_key': eval_book, 'type': 'game_market',
+                'edge': round(net_edge, 1), 'gross_edge': round(gross_edge, 1),
+                'recommendation': f"BET {display_name}", 'odds': odds,
+                'label1_name': f'{BOOK_DISPLAY.get(eval_book, eval_book)} Odds',
+                'label1_value': format_american(odds),
+                'label2_name': f'Fair Odds ({n_others} books)',
+                'label2_value': format_american(fair_american),
+                'label3_name': 'Net Edge', 'label3_value': f"+{net_edge:.1f}%",
+                'target_prob': round(eval_implied * 100, 1),
+                'fair_prob': round(consensus_fair * 100, 1),
+                'juice_display': f"{juice_pct}%",
+                'consensus_books': n_others,
+                'consensus_detail': other_detail,
+                'kelly_fraction': round(kf * 100, 2),
+                'affiliate_url': affiliate_url(eval_book),
+            })
     return opportunities
 
 
@@ -1599,21 +2226,17 @@ DERIVED_SHRINK = float(os.environ.get('DERIVED_SHRINK', '0.75'))
 MIN_EDGE_DERIVED = float(os.environ.get('MIN_EDGE_DERIVED', '2.0'))
 MODEL_MIN_EDGE = float(os.environ.get('MODEL_MIN_EDGE', '4.0'))
 
+PROP_XLATE_CACHE = int(os.environ.get('PROP_XLATE_CACHE', '65536'))  # translate_prop_prob LRU size
+
 def _phi(z):
     return 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
 
+_STD_NORMAL = statistics.NormalDist()
+
 def _phi_inv(p):
-    """Inverse standard normal CDF via bisection — slow but exact enough
-    and dependency-free at this volume."""
-    p = min(max(p, 1e-9), 1 - 1e-9)
-    lo, hi = -8.0, 8.0
-    for _ in range(60):
-        mid = (lo + hi) / 2
-        if _phi(mid) < p:
-            lo = mid
-        else:
-            hi = mid
-    return (lo + hi) / 2
+    """Inverse standard normal CDF. NormalDist.inv_cdf is Wichura's AS241
+    rational approximation (~1e-16), evaluated in C."""
+    return _STD_NORMAL.inv_cdf(min(max(p, 1e-9), 1 - 1e-9))
 
 def _pois_sf(lam, k):
     """P(X >= k) for Poisson(lam)."""
@@ -1627,43 +2250,140 @@ def _pois_sf(lam, k):
             break
     return max(0.0, min(1.0, 1.0 - cdf))
 
+def _pois_lam(k, p, lo=0.01, hi=80.0):
+    """lam in [lo, hi] with P(X >= k) = p (k >= 1). Halley's method on
+    d/dlam P(X >= k) = pmf(k-1; lam) from a normal-approximation start,
+    falling back to bisection whenever a step leaves the bracket. The sum
+    below is _pois_sf's, term for term, with pmf(k-1) as its last term."""
+    z = _phi_inv(1.0 - p)
+    r = (-z + math.sqrt(z * z + 4.0 * max(k - 0.5, 0.0))) / 2.0
+    lam = min(max(r * r, lo), hi)
+    lg = math.lgamma(k)
+    for _ in range(50):
+        term = cdf = math.exp(-lam)
+        for i in range(1, k):
+            term *= lam / i
+            cdf += term
+            if term < 1e-15 and i > lam:
+                term = math.exp(-lam + (k - 1) * math.log(lam) - lg)
+                break
+        f = max(0.0, min(1.0, 1.0 - cdf)) - p
+        if f < 0:
+            lo = lam
+        else:
+            hi = lam
+        if term > 0 and abs(f) <= 1e-12 * lam * term:
+            return lam - f / term
+        if term > 0:        # Halley: f''/f' = (k-1)/lam - 1
+            step = f / term
+            nxt = lam - step / (1.0 - 0.5 * step * ((k - 1) / lam - 1.0))
+        else:
+            nxt = lo - 1.0
+        if not lo < nxt < hi:
+            nxt = (lo + hi) / 2
+        if hi - lo <= 1e-12 * hi:
+            return nxt
+        lam = nxt
+    return lam
+
+# Poisson translation tables. For a line pair (k1, k2) the translated prob
+# q = P(X >= k2) is a smooth function of the quoted p = P(X >= k1) through
+# lam. Each table holds, at _XT_NODES+1 evenly spaced p in the quotable
+# range, q and its first four p-derivatives (series reversion of p(lam),
+# composed with q(lam)); a lookup is one quartic Taylor step from the
+# nearest node, within ~3e-13 of solving for lam. Node lams are solved once
+# per k1, each pair's table once per process.
+_XT_LO, _XT_HI, _XT_NODES = 0.05, 0.95, 1200
+_XT_INV_H = _XT_NODES / (_XT_HI - _XT_LO)
+_pois_node_lams = {}   # k -> [lam at each node]
+_pois_tables = {}      # (k1, k2) -> [(p, q, dq, d2q/2, d3q/6, d4q/24)]
+
+def _pois_taylor(lam, k):
+    """First four Taylor coefficients of P(X >= k) in lam."""
+    pmf = [math.exp(-lam + j * math.log(lam) - math.lgamma(j + 1)) if j >= 0 else 0.0
+           for j in (k - 1, k - 2, k - 3, k - 4)]
+    a, b, c, d = pmf
+    return a, (b - a) / 2, (c - 2 * b + a) / 6, (d - 3 * c + 3 * b - a) / 24
+
+def _pois_table(k1, k2):
+    tab = _pois_tables.get((k1, k2))
+    if tab is not None:
+        return tab
+    lams = _pois_node_lams.get(k1)
+    if lams is None:
+        lams = _pois_node_lams[k1] = [_pois_lam(k1, _XT_LO + j / _XT_INV_H)
+                                      for j in range(_XT_NODES + 1)]
+    tab = []
+    for j, lam in enumerate(lams):
+        P1, P2, P3, P4 = _pois_taylor(lam, k1)
+        Q1, Q2, Q3, Q4 = _pois_taylor(lam, k2)
+        e1 = 1.0 / P1                          # lam - lam_j as a series in p - p_j
+        e2 = -P2 * e1 ** 3
+        e3 = (2 * P2 * P2 - P1 * P3) * e1 ** 5
+        e4 = (5 * P1 * P2 * P3 - P1 * P1 * P4 - 5 * P2 ** 3) * e1 ** 7
+        tab.append((_XT_LO + j / _XT_INV_H, _pois_sf(lam, k2), Q1 * e1,
+                    Q1 * e2 + Q2 * e1 * e1,
+                    Q1 * e3 + 2 * Q2 * e1 * e2 + Q3 * e1 ** 3,
+                    Q1 * e4 + Q2 * (e2 * e2 + 2 * e1 * e3) + 3 * Q3 * e1 * e1 * e2
+                    + Q4 * e1 ** 4))
+    _pois_tables[(k1, k2)] = tab
+    return tab
+
+_xlate_plans = {}   # (market_key, from_line, to_line) -> _xlate_plan result
+
+def _xlate_plan(market_key, from_line, to_line):
+    """Everything about a translation that doesn't depend on the quoted
+    prob: (table, cv, a, b) where the Poisson table is None for normal stats,
+    or None when the hop is refused (unknown stat, too far, integer Poisson
+    line, non-positive line). Memoized per line pair."""
+    key = (market_key, from_line, to_line)
+    plan = _xlate_plans.get(key, _xlate_plans)
+    if plan is not _xlate_plans:
+        return plan
+    plan, spec = None, PROP_DIST.get(market_key)
+    ref = max(abs(from_line), abs(to_line), 3.0)
+    if spec and abs(from_line - to_line) <= MAX_TRANSLATE_FRAC * ref:
+        shape, cv = spec
+        if shape == 'normal':
+            # mu = L1 / (1 + z*cv), sigma = cv*mu  ->  (L2 - mu)/sigma = a*(1 + z*cv) - b
+            if from_line > 0:
+                plan = (None, cv, to_line / (from_line * cv), 1.0 / cv)
+        # Poisson: half-lines only (integer lines can push; don't translate them)
+        elif abs(from_line % 1 - 0.5) <= 0.01 and abs(to_line % 1 - 0.5) <= 0.01:
+            plan = (_pois_table(int(from_line) + 1, int(to_line) + 1), None, 0.0, 0.0)
+    _xlate_plans[key] = plan
+    return plan
+
+def _xlate_eval(plan, over_prob):
+    """The numeric kernel: P(over to_line) for a quote with
+    0.05 < over_prob < 0.95 under a non-None plan, or None if the normal
+    fit is unstable."""
+    tab, cv, a, b = plan
+    if tab is None:
+        denom = 1.0 - _STD_NORMAL.inv_cdf(over_prob) * cv     # 1 + z*cv, z = Phi^-1(1 - p)
+        if denom < 0.25:
+            return None
+        return 0.5 * math.erfc((a * denom - b) * 0.7071067811865476)
+    p0, c0, c1, c2, c3, c4 = tab[int((over_prob - _XT_LO) * _XT_INV_H + 0.5)]
+    d = over_prob - p0
+    return c0 + d * (c1 + d * (c2 + d * (c3 + d * c4)))
+
+@functools.lru_cache(maxsize=PROP_XLATE_CACHE)
 def translate_prop_prob(market_key, from_line, over_prob, to_line):
     """Implied P(over to_line) given the market says P(over from_line)=over_prob.
     Returns None when the stat type is unknown, the hop is too far to trust,
-    or the quote is too extreme to invert stably."""
+    or the quote is too extreme to invert stably. Memoized: every scan
+    re-translates the same quotes until they move."""
     if from_line == to_line:
         return over_prob
-    spec = PROP_DIST.get(market_key)
-    if not spec:
-        return None
     if not (0.05 < over_prob < 0.95):
         return None
-    ref = max(abs(from_line), abs(to_line), 3.0)
-    if abs(from_line - to_line) > MAX_TRANSLATE_FRAC * ref:
-        return None
-    shape, cv = spec
-    if shape == 'normal':
-        z = _phi_inv(1.0 - over_prob)          # (L1 - mu)/sigma
-        denom = 1.0 + z * cv
-        if denom < 0.25:
-            return None
-        mu = from_line / denom
-        if mu <= 0:
-            return None
-        sigma = cv * mu
-        return max(0.0, min(1.0, 1.0 - _phi((to_line - mu) / sigma)))
-    # Poisson: half-lines only (integer lines can push; don't translate them)
-    if abs(from_line % 1 - 0.5) > 0.01 or abs(to_line % 1 - 0.5) > 0.01:
+    plan = _xlate_plans.get((market_key, from_line, to_line), _xlate_plans)
+    if plan is _xlate_plans:
+        plan = _xlate_plan(market_key, from_line, to_line)
+    if plan is None:
         return None
-    k1, k2 = int(from_line) + 1, int(to_line) + 1
-    lo, hi = 0.01, 80.0
-    for _ in range(60):
-        lam = (lo + hi) / 2
-        if _pois_sf(lam, k1) < over_prob:
-            lo = lam
-        else:
-            hi = lam
-    return _pois_sf((lo + hi) / 2, k2)
+    return _xlate_eval(plan, over_prob)
 
 
 # ============================================================
@@ -1680,88 +2400,309 @@ def translate_prop_prob(market_key, from_line, over_prob, to_line):
 _FORM_CACHE = {}
 _FORM_TTL = 6 * 3600
 
-def _espn_event_ids(league_path, date_str):
-    out = []
-    try:
-        r = requests.get(
-            f"https://site.api.espn.com/apis/site/v2/sports/{league_path}/scoreboard",
-            params={'dates': date_str}, timeout=12)
+# ESPN client: one keep-alive session shared by the form loader and the
+# grader, a small pool for fan-out, per-host spacing and retry on 429/5xx.
+# Callers of _espn_map must not already be running on _espn_pool.
+ESPN_WORKERS = int(os.environ.get('ESPN_WORKERS', '8'))
+ESPN_RATE_DELAY = float(os.environ.get('ESPN_RATE_DELAY', '0.03'))  # sec between calls per host
+ESPN_RETRIES = int(os.environ.get('ESPN_RETRIES', '3'))
+ESPN_BASE = "https://site.api.espn.com/apis/site/v2/sports"
+_espn_session = requests.Session()
+_espn_session.mount('https://', requests.adapters.HTTPAdapter(
+    pool_connections=4, pool_maxsize=max(1, ESPN_WORKERS)))
+_espn_gates = {}   # netloc -> {'lock': Lock, 'last': epoch of last call}
+_espn_gates_lock = threading.Lock()
+_espn_pool = ThreadPoolExecutor(max_workers=max(1, ESPN_WORKERS),
+                                thread_name_prefix='espn')
+
+def _espn_pace(url):
+    host = urlsplit(url).netloc
+    with _espn_gates_lock:
+        gate = _espn_gates.setdefault(host, {'lock': threading.Lock(), 'last': 0.0})
+    with gate['lock']:
+        wait = ESPN_RATE_DELAY - (time.time() - gate['last'])
+        if wait > 0:
+            time.sleep(wait)
+        gate['last'] = time.time()
+
+def _espn_get(path, params=None, timeout=12):
+    """GET {ESPN_BASE}/{path} -> parsed JSON, or None. 429/5xx and network
+    errors back off (honouring Retry-After) and retry; other statuses don't."""
+    url = f"{ESPN_BASE}/{path}"
+    backoff = 0.5
+    for attempt in range(max(1, ESPN_RETRIES)):
+        if attempt:
+            time.sleep(backoff)
+            backoff = 0.5 * 2 ** attempt
+        _espn_pace(url)
+        try:
+            r = _espn_session.get(url, params=params, timeout=timeout)
+        except Exception as e:
+            log_debug(f"    espn {path}: {str(e)[:80]}")
+            continue
         if r.status_code == 200:
-            for ev in (r.json().get('events') or []):
+            try:
+                return r.json()
+            except Exception:
+                return None
+        if r.status_code != 429 and r.status_code < 500:
+            return None
+        try:
+            backoff = max(backoff, min(30.0, float(r.headers.get('Retry-After'))))
+        except (TypeError, ValueError):
+            pass
+    return None
+
+def _espn_map(fn, items):
+    """[fn(x) for x in items], run on the ESPN pool. Order is preserved."""
+    items = list(items)
+    if len(items) <= 1:
+        return [fn(x) for x in items]
+    return list(_espn_pool.map(fn, items))
+
+def _espn_scoreboard_day(league_path, date_str):
+    """(completed event ids, final) for one ESPN scoreboard date. final =
+    the board loaded and every event on it is over, so the day never needs
+    re-checking."""
+    out, final = [], False
+    try:
+        data = _espn_get(f"{league_path}/scoreboard", {'dates': date_str})
+        if data is not None:
+            final = True
+            for ev in (data.get('events') or []):
                 st = ((((ev.get('competitions') or [{}])[0].get('status') or {})
                        .get('type')) or {})
                 if st.get('completed'):
                     out.append(ev.get('id'))
+                else:
+                    final = False
     except Exception:
         pass
-    return [e for e in out if e]
+    return [e for e in out if e], final
+
+def _espn_event_ids(league_path, date_str):
+    return _espn_scoreboard_day(league_path, date_str)[0]
+
+def _parse_box_points(summary):
+    """[(team, player, pts)] from an ESPN summary payload's box score, plus
+    a (team, '', team_pts) row per team that scored."""
+    rows = []
+    for tb in ((summary.get('boxscore') or {}).get('players') or []):
+        tname = _norm_team(((tb.get('team') or {}).get('displayName')) or '')
+        if not tname:
+            continue
+        stat_blocks = tb.get('statistics') or []
+        if not stat_blocks:
+            continue
+        sb = stat_blocks[0]
+        labels = sb.get('labels') or sb.get('names') or []
+        try:
+            pts_i = labels.index('PTS')
+        except ValueError:
+            continue
+        team_pts = 0.0
+        for ath in (sb.get('athletes') or []):
+            nm = ((ath.get('athlete') or {}).get('displayName')) or ''
+            stv = ath.get('stats') or []
+            if not nm or pts_i >= len(stv):
+                continue
+            try:
+                pts = float(stv[pts_i])
+            except (TypeError, ValueError):
+                continue
+            team_pts += pts
+            player = normalize_player_name(nm)
+            if player:                       # '' is reserved for the team total
+                rows.append((tname, player, pts))
+        if team_pts > 0:
+            rows.append((tname, '', team_pts))
+    return rows
+
+# ---- persistent box-score store ----
+# form_days:   scoreboard dates already listed (final=1 -> never re-checked)
+# form_events: completed events per date; fetched_at set once its box is in
+# form_box:    one row per (event, team, player) — player '' is the team total
+# form_agg:    the rolled-up per-player / per-team averages for a window,
+#              so a restart inside _FORM_TTL is one query, no aggregation
+# Each box score is fetched once ever; a refresh only lists dates that
+# weren't final and pulls events it hasn't stored yet.
+
+def _form_store_read(sport_key, day_list):
+    """-> (final days, {day: [event ids]}, {event id: [(team, player, pts)]}
+    for fetched events). Empty on any DB error (the loader then refetches)."""
+    finals, day_events, boxes = set(), {}, {}
+    if not day_list:
+        return finals, day_events, boxes
+    marks = ','.join('?' * len(day_list))
+    try:
+        with get_db() as conn:
+            for r in conn.execute(
+                    f"SELECT day FROM form_days WHERE sport_key = ? AND final = 1 "
+                    f"AND day IN ({marks})", (sport_key, *day_list)).fetchall():
+                finals.add(r[0])
+            fetched = set()
+            for r in conn.execute(
+                    f"SELECT event_id, day, fetched_at FROM form_events "
+                    f"WHERE sport_key = ? AND day IN ({marks})",
+                    (sport_key, *day_list)).fetchall():
+                day_events.setdefault(r[1], []).append(r[0])
+                if r[2]:
+                    fetched.add(r[0])
+            if fetched:
+                for r in conn.execute(
+                        f"SELECT b.event_id, b.team, b.player, b.pts FROM form_box b "
+                        f"JOIN form_events e ON e.sport_key = b.sport_key AND e.event_id = b.event_id "
+                        f"WHERE b.sport_key = ? AND e.day IN ({marks})",
+                        (sport_key, *day_list)).fetchall():
+                    boxes.setdefault(r[0], []).append((r[1], r[2], r[3]))
+                for eid in fetched:
+                    boxes.setdefault(eid, [])
+    except Exception as e:
+        log_debug(f"    form store read error: {str(e)[:80]}")
+        return set(), {}, {}
+    return finals, day_events, boxes
+
+def _form_store_write(sport_key, days_seen, new_boxes):
+    """days_seen: {day: (event ids, final)}; new_boxes: {event id: rows}."""
+    if not days_seen and not new_boxes:
+        return
+    now = datetime.now().isoformat()
+    try:
+        with get_db() as conn:
+            if days_seen:
+                conn.executemany("DELETE FROM form_days WHERE sport_key = ? AND day = ?",
+                                 [(sport_key, day) for day in days_seen])
+                conn.executemany(
+                    "INSERT INTO form_days (sport_key, day, final, checked_at) VALUES (?, ?, ?, ?)",
+                    [(sport_key, day, 1 if final else 0, now)
+                     for day, (_e, final) in days_seen.items()])
+                conn.executemany(
+                    "INSERT INTO form_events (sport_key, event_id, day) "
+                    "VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+                    [(sport_key, eid, day) for day, (eids, _f) in days_seen.items()
+                     for eid in eids])
+            if new_boxes:
+                conn.executemany("DELETE FROM form_box WHERE sport_key = ? AND event_id = ?",
+                                 [(sport_key, eid) for eid in new_boxes])
+                conn.executemany(
+                    "INSERT INTO form_box (sport_key, event_id, player, team, pts) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT DO NOTHING",
+                    [(sport_key, eid, player, team, pts)
+                     for eid, rows in new_boxes.items() for team, player, pts in rows])
+                conn.executemany("UPDATE form_events SET fetched_at = ? "
+                                 "WHERE sport_key = ? AND event_id = ?",
+                                 [(now, sport_key, eid) for eid in new_boxes])
+    except Exception as e:
+        log_debug(f"    form store write error: {str(e)[:80]}")
+
+def _form_agg_read(sport_key, win):
+    """The stored aggregates for `win` if computed within _FORM_TTL, in
+    _load_recent_form's output shape; else None."""
+    try:
+        with get_db() as conn:
+            rows = conn.execute(
+                "SELECT kind, name, team, g, pts_pg, computed_at FROM form_agg "
+                "WHERE sport_key = ? AND win = ?", (sport_key, win)).fetchall()
+    except Exception as e:
+        log_debug(f"    form agg read error: {str(e)[:80]}")
+        return None
+    if not rows:
+        return None
+    ts = min(r[5] or 0 for r in rows)
+    if time.time() - ts >= _FORM_TTL:
+        return None
+    return {'ts': ts,
+            'players': {r[1]: {'g': r[3], 'pts_pg': r[4], 'team': r[2]}
+                        for r in rows if r[0] == 'player'},
+            'teams': {r[1]: r[4] for r in rows if r[0] == 'team'}}
+
+def _form_agg_write(sport_key, win, out):
+    rows = ([(sport_key, win, 'player', k, v['team'], v['g'], v['pts_pg'], out['ts'])
+             for k, v in out['players'].items()] +
+            [(sport_key, win, 'team', k, k, None, v, out['ts'])
+             for k, v in out['teams'].items()])
+    try:
+        with get_db() as conn:
+            conn.execute("DELETE FROM form_agg WHERE sport_key = ? AND win = ?", (sport_key, win))
+            if rows:
+                conn.executemany(
+                    "INSERT INTO form_agg (sport_key, win, kind, name, team, g, pts_pg, "
+                    "computed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    except Exception as e:
+        log_debug(f"    form agg write error: {str(e)[:80]}")
 
 def _load_recent_form(sport_key, days=10, max_events=50):
     """Per-player recent scoring averages + team scoring, from free ESPN
-    box scores. Cached 6h. Returns {'players': {norm: {...}}, 'teams': {...}}."""
+    box scores. Backed by the form_* tables: a restart reads the window from
+    the DB, and only dates not yet final / events not yet stored hit ESPN.
+    The rolled-up averages are stored too (form_agg), so within 6h of the
+    last computation a restart is one query. Cached 6h in memory.
+    Returns {'players': {norm: {...}}, 'teams': {...}}."""
     league = ESPN_SB.get(sport_key)
     if not league:
         return {'players': {}, 'teams': {}}
     cached = _FORM_CACHE.get(sport_key)
     if cached and time.time() - cached['ts'] < _FORM_TTL:
         return cached
-    players, teams = {}, {}
+    win = f"{days}d{max_events}e"
+    stored = _form_agg_read(sport_key, win)
+    if stored is not None:
+        _FORM_CACHE[sport_key] = stored
+        return stored
+    day_list = [(datetime.now() - timedelta(days=d)).strftime('%Y%m%d')
+                for d in range(1, days + 1)]
+    finals, day_events, boxes = _form_store_read(sport_key, day_list)
+    days_seen, new_boxes, eids = {}, {}, []
+    n_fetch = 0
     try:
-        eids = []
-        for d in range(1, days + 1):
-            ds = (datetime.now() - timedelta(days=d)).strftime('%Y%m%d')
-            eids.extend(_espn_event_ids(league, ds))
+        # every open day's board in one concurrent round; a day past the
+        # max_events cut-off costs one spare request, not a serial wait
+        open_days = [ds for ds in day_list if ds not in finals]
+        boards = dict(zip(open_days, _espn_map(
+            lambda ds: _espn_scoreboard_day(league, ds), open_days)))
+        for ds in day_list:
+            if ds in boards:
+                listed, final = boards[ds]
+                known = day_events.get(ds, [])
+                day_events[ds] = known + [e for e in listed if e not in known]
+                days_seen[ds] = (day_events[ds], final)
+            eids.extend(day_events.get(ds, []))
             if len(eids) >= max_events:
                 break
-        for eid in eids[:max_events]:
-            try:
-                r = requests.get(
-                    f"https://site.api.espn.com/apis/site/v2/sports/{league}/summary",
-                    params={'event': eid}, timeout=12)
-                if r.status_code != 200:
+        todo = [eid for eid in eids[:max_events] if eid not in boxes]
+        summaries = _espn_map(
+            lambda eid: _espn_get(f"{league}/summary", {'event': eid}), todo)
+        n_fetch = len(todo)
+        for eid, summ in zip(todo, summaries):
+            if summ is not None:
+                try:
+                    boxes[eid] = new_boxes[eid] = _parse_box_points(summ)
+                except Exception:
                     continue
-                for tb in ((r.json().get('boxscore') or {}).get('players') or []):
-                    tname = _norm_team(((tb.get('team') or {}).get('displayName')) or '')
-                    if not tname:
-                        continue
-                    stat_blocks = tb.get('statistics') or []
-                    if not stat_blocks:
-                        continue
-                    sb = stat_blocks[0]
-                    labels = sb.get('labels') or sb.get('names') or []
-                    try:
-                        pts_i = labels.index('PTS')
-                    except ValueError:
-                        continue
-                    team_pts = 0.0
-                    for ath in (sb.get('athletes') or []):
-                        nm = ((ath.get('athlete') or {}).get('displayName')) or ''
-                        stv = ath.get('stats') or []
-                        if not nm or pts_i >= len(stv):
-                            continue
-                        try:
-                            pts = float(stv[pts_i])
-                        except (TypeError, ValueError):
-                            continue
-                        team_pts += pts
-                        p = players.setdefault(normalize_player_name(nm),
-                                               {'g': 0, 'pts': 0.0, 'team': tname})
-                        p['g'] += 1
-                        p['pts'] += pts
-                        p['team'] = tname
-                    if team_pts > 0:
-                        t = teams.setdefault(tname, {'g': 0, 'pts': 0.0})
-                        t['g'] += 1
-                        t['pts'] += team_pts
-            except Exception:
-                continue
-            time.sleep(0.12)
     except Exception as e:
         log_debug(f"    form load error: {e}")
+    _form_store_write(sport_key, days_seen, new_boxes)
+
+    # eids run newest day first, so the first team seen is the current one
+    players, teams = {}, {}
+    for eid in eids[:max_events]:
+        for tname, player, pts in boxes.get(eid) or []:
+            if not player:
+                t = teams.setdefault(tname, {'g': 0, 'pts': 0.0})
+                t['g'] += 1
+                t['pts'] += pts
+                continue
+            p = players.setdefault(player, {'g': 0, 'pts': 0.0, 'team': tname})
+            p['g'] += 1
+            p['pts'] += pts
+    if n_fetch:
+        log_debug(f"    form store: {sport_key} fetched {n_fetch} new box scores, "
+                  f"{len(eids[:max_events]) - n_fetch} from DB")
     out = {'ts': time.time(),
            'players': {k: {'g': v['g'], 'pts_pg': v['pts'] / v['g'], 'team': v['team']}
                        for k, v in players.items() if v['g'] > 0},
            'teams': {k: v['pts'] / v['g'] for k, v in teams.items() if v['g'] > 0}}
+    _form_agg_write(sport_key, win, out)
     _FORM_CACHE[sport_key] = out
     return out
 
@@ -1908,61 +2849,111 @@ def model_prop_opportunities(edatas, sport_key, prop_name, market_key='player_po
               f"({len(form['players'])} players in form)")
     return out
 
-def analyze_player_props(games_data, market_name="", kalshi_props=None, poly_props=None, market_key=""):
+def _prop_market_key(market_name):
+    mn = market_name.lower()
+    if 'point' in mn: return 'player_points'
+    elif 'rebound' in mn: return 'player_rebounds'
+    elif 'assist' in mn: return 'player_assists'
+    elif 'shot' in mn: return 'player_shots_on_goal'
+    elif 'strikeout' in mn: return 'player_strikeouts'
+    elif 'total base' in mn or 'total bases' in mn: return 'player_total_bases'
+    return ''
+
+
+def _prop_table(game):
+    """One parse of an event's prop market into a player x book x line table,
+    shared by analyze_player_props and find_prop_arbs:
+      player -> {'quotes': {book: q}, 'groups': {line: {book: q}}}
+    Only two-sided quotes are kept; each q carries line, over_odds,
+    under_odds, implied (ov/un), the devig_pair fair probs (fo/fu) and juice.
+    Groups bucket books by line rounded to the quarter point."""
+    players = {}
+    for bookmaker in game.get('bookmakers', []):
+        bk = bookmaker['key']
+        for market in bookmaker.get('markets', []):
+            for outcome in market.get('outcomes', []):
+                player = outcome.get('description', '')
+                if not player:
+                    continue
+                line = outcome.get('point')
+                odds = outcome.get('price')
+                side = outcome.get('name', '').lower()
+                if line is None or odds is None:
+                    continue
+                books = players.setdefault(player, {})
+                if bk not in books:
+                    books[bk] = {'line': line}
+                if 'over' in side:
+                    books[bk]['over_odds'] = odds
+                elif 'under' in side:
+                    books[bk]['under_odds'] = odds
+                books[bk]['line'] = line
+
+    table = {}
+    for player, books in players.items():
+        quotes, groups = {}, {}
+        for bk, bdata in books.items():
+            if 'over_odds' not in bdata or 'under_odds' not in bdata:
+                continue
+            ov = american_to_implied(bdata['over_odds'])
+            un = american_to_implied(bdata['under_odds'])
+            fo, fu = devig_pair(ov, un)
+            q = dict(bdata, ov=ov, un=un, fo=fo, fu=fu,
+                     juice=round((ov + un - 1.0) * 100, 1))
+            quotes[bk] = q
+            rounded = round(bdata['line'] * 4) / 4
+            if rounded not in groups:
+                groups[rounded] = {}
+            groups[rounded][bk] = q
+        table[player] = {'quotes': quotes, 'groups': groups}
+    return table
+
+
+def _prop_tables(games_data, tables):
+    if tables is None:
+        return [_prop_table(g) for g in games_data]
+    return tables
+
+
+def analyze_player_props(games_data, market_name="", kalshi_props=None, poly_props=None, market_key="",
+                         tables=None):
+    """+EV player props for every event in games_data (one market). `tables`
+    (parallel to games_data, see _prop_table) skips re-parsing."""
     if not games_data:
         return []
+    per_game, stats = _prop_opps_batch(games_data, market_name, kalshi_props, poly_props,
+                                       market_key, _prop_tables(games_data, tables))
+    opportunities = [o for opps in per_game for o in opps]
+    _log_prop_stats(stats, len(opportunities))
+    return opportunities
+
+
+def _log_prop_stats(stats, n):
+    log_debug(f"    Players: {stats['players']} ({stats['exch']} w/ exchange), same-line: {stats['same_line']}, "
+              f"too few books: {stats['too_few_books']}, diff-line: {stats['diff_line']} "
+              f"→ {n} +EV")
+
+
+def _prop_opps_batch(games_data, market_name, kalshi_props, poly_props, market_key, tables):
+    """analyze_player_props over a batch of events -> ([opps per game], stats)."""
     if not market_key:
-        mn = market_name.lower()
-        if 'point' in mn: market_key = 'player_points'
-        elif 'rebound' in mn: market_key = 'player_rebounds'
-        elif 'assist' in mn: market_key = 'player_assists'
-        elif 'shot' in mn: market_key = 'player_shots_on_goal'
-        elif 'strikeout' in mn: market_key = 'player_strikeouts'
-        elif 'total base' in mn or 'total bases' in mn: market_key = 'player_total_bases'
+        market_key = _prop_market_key(market_name)
 
-    opportunities = []
+    out = []
     stats = {'players': 0, 'same_line': 0, 'diff_line': 0, 'too_few_books': 0,
              'exch': 0}
 
-    for game in games_data:
+    for game, table in zip(games_data, tables):
+        opportunities = []
+        out.append(opportunities)
         game_info = f"{game.get('away_team', '?')} @ {game.get('home_team', '?')}"
         commence = game.get('commence_time', '')
         sport_key_val = game.get('sport_key', '') or ''
         event_id_val = game.get('id', '') or ''
 
-        players = {}
-        for bookmaker in game.get('bookmakers', []):
-            bk = bookmaker['key']
-            for market in bookmaker.get('markets', []):
-                for outcome in market.get('outcomes', []):
-                    player = outcome.get('description', '')
-                    if not player:
-                        continue
-                    line = outcome.get('point')
-                    odds = outcome.get('price')
-                    side = outcome.get('name', '').lower()
-                    if line is None or odds is None:
-                        continue
-                    if player not in players:
-                        players[player] = {
-                            'game': game_info, 'commence': commence,
-                            'sport_key': sport_key_val, 'event_id': event_id_val,
-                            'books': {},
-                        }
-                    if bk not in players[player]['books']:
-                        players[player]['books'][bk] = {'line': line}
-                    if 'over' in side:
-                        players[player]['books'][bk]['over_odds'] = odds
-                    elif 'under' in side:
-                        players[player]['books'][bk]['under_odds'] = odds
-                    players[player]['books'][bk]['line'] = line
-
-        for player, data in players.items():
+        for player, entry in table.items():
             stats['players'] += 1
-            books = data['books']
-
-            books_with_both = {bk: bdata for bk, bdata in books.items()
-                               if 'over_odds' in bdata and 'under_odds' in bdata}
+            books_with_both = entry['quotes']
             _norm_p = normalize_player_name(player)
             _has_exchange = any(
                 _norm_p in (srcp or {}) and market_key in (srcp or {}).get(_norm_p, {})
@@ -1976,36 +2967,22 @@ def analyze_player_props(games_data, market_name="", kalshi_props=None, poly_pro
                 stats['too_few_books'] += 1
                 continue
 
-            line_groups = {}
-            for bk, bdata in books_with_both.items():
-                rounded = round(bdata['line'] * 4) / 4
-                if rounded not in line_groups:
-                    line_groups[rounded] = {}
-                line_groups[rounded][bk] = bdata
-
-            for line_val, group_books in line_groups.items():
+            for line_val, group_books in entry['groups'].items():
                 devigged = {}
                 juice_map = {}
                 translated = set()
-                for bk, bdata in group_books.items():
-                    ov = american_to_implied(bdata['over_odds'])
-                    un = american_to_implied(bdata['under_odds'])
-                    juice_map[bk] = round((ov + un - 1.0) * 100, 1)
-                    fo, fu = devig_pair(ov, un)
-                    devigged[bk] = {'over': clamp_prob(fo), 'under': clamp_prob(fu)}
+                for bk, q in group_books.items():
+                    juice_map[bk] = q['juice']
+                    devigged[bk] = {'over': clamp_prob(q['fo']), 'under': clamp_prob(q['fu'])}
 
                 # Derivative pricing: pull in books quoting OTHER lines by
                 # translating their devigged prob to this line, shrunk toward
                 # 50% to price in model risk. Their own posted odds are never
                 # evaluated here — translated quotes are consensus-only.
-                for bk, bdata in books_with_both.items():
+                for bk, q in books_with_both.items():
                     if bk in group_books:
                         continue
-                    t = translate_prop_prob(market_key, bdata['line'],
-                                            devig_pair(
-                                                american_to_implied(bdata['over_odds']),
-                                                american_to_implied(bdata['under_odds']))[0],
-                                            line_val)
+                    t = translate_prop_prob(market_key, q['line'], q['fo'], line_val)
                     if t is None:
                         continue
                     t = 0.5 + DERIVED_SHRINK * (clamp_prob(t) - 0.5)
@@ -2015,8 +2992,7 @@ def analyze_player_props(games_data, market_name="", kalshi_props=None, poly_pro
                 def _exchange_join(src_props, name):
                     if not src_props or not market_key:
                         return
-                    norm = normalize_player_name(player)
-                    lines_d = (src_props.get(norm) or {}).get(market_key) or {}
+                    lines_d = (src_props.get(_norm_p) or {}).get(market_key) or {}
                     if not lines_d:
                         return
                     if line_val in lines_d:
@@ -2050,41 +3026,21 @@ def analyze_player_props(games_data, market_name="", kalshi_props=None, poly_pro
                 for eval_book in eval_candidates:
                     if eval_book not in CO_BETTABLE and eval_book not in ('kalshi', 'polymarket'):
                         continue
-                    other_over_fairs = []
-                    other_weights = []
-                    other_detail = []
+                    num, total_weight, n_others, n_derived = 0, 0, 0, 0
                     for other_bk in devigged:
                         if other_bk == eval_book:
                             continue
                         w = get_weight(other_bk)
-                        other_over_fairs.append(devigged[other_bk]['over'])
-                        other_weights.append(w)
-                        if other_bk in group_books:
-                            raw_over = format_american(group_books[other_bk].get('over_odds', 0))
-                            raw_under = format_american(group_books[other_bk].get('under_odds', 0))
-                            vig = juice_map.get(other_bk, 0)
-                        elif other_bk in ('kalshi', 'polymarket'):
-                            raw_over = f"{devigged[other_bk]['over']*100:.0f}¢"
-                            raw_under = f"{devigged[other_bk]['under']*100:.0f}¢"
-                            vig = 0
-                        else:
-                            raw_over = raw_under = '—'
-                            vig = 0
-                        other_detail.append({
-                            'book': BOOK_DISPLAY.get(other_bk, other_bk),
-                            'over_prob': round(devigged[other_bk]['over'] * 100, 1),
-                            'over_odds': format_american(implied_to_american(devigged[other_bk]['over'])),
-                            'under_odds': format_american(implied_to_american(devigged[other_bk]['under'])),
-                            'raw_over': raw_over, 'raw_under': raw_under,
-                            'vig': vig, 'weight': w,
-                        })
+                        num += devigged[other_bk]['over'] * w
+                        total_weight += w
+                        n_others += 1
+                        if other_bk in translated:
+                            n_derived += 1
 
-                    if len(other_over_fairs) < 1:   # was 2
+                    if n_others < 1:   # was 2
                         continue
 
-                    total_weight = sum(other_weights)
-                    consensus_over = clamp_prob(
-                        sum(f * w for f, w in zip(other_over_fairs, other_weights)) / total_weight)
+                    consensus_over = clamp_prob(num / total_weight)
                     consensus_under = 1.0 - consensus_over
 
                     if eval_book in ('kalshi', 'polymarket'):
@@ -2097,37 +3053,39 @@ def analyze_player_props(games_data, market_name="", kalshi_props=None, poly_pro
                         under_odds = round(implied_to_american(eval_under_imp))
                     else:
                         eb = group_books[eval_book]
-                        eval_over_imp = american_to_implied(eb['over_odds'])
-                        eval_under_imp = american_to_implied(eb['under_odds'])
+                        eval_over_imp = eb['ov']
+                        eval_under_imp = eb['un']
                         eval_over_fair = devigged[eval_book]['over']
                         eval_under_fair = devigged[eval_book]['under']
                         juice_pct = juice_map.get(eval_book, 0)
                         over_odds = eb['over_odds']
                         under_odds = eb['under_odds']
 
+                    n_exact_others = n_others - n_derived
+                    edge_floor = MIN_EDGE_NET if n_exact_others >= 2 else \
+                        max(MIN_EDGE_NET, MIN_EDGE_DERIVED)
+                    if n_others < 2:
+                        edge_floor = max(edge_floor, MIN_EDGE_DERIVED)
+                    other_detail = None
                     for side, eval_imp, eval_fair, consensus_fair, odds in [
                         ('OVER', eval_over_imp, eval_over_fair, consensus_over, over_odds),
                         ('UNDER', eval_under_imp, eval_under_fair, consensus_under, under_odds),
                     ]:
                         net_edge = (consensus_fair - eval_imp) * 100
                         gross_edge = (consensus_fair - eval_fair) * 100
-                        n_exact_others = sum(1 for b in devigged
-                                             if b != eval_book and b not in translated)
-                        n_others = sum(1 for b in devigged if b != eval_book)
-                        edge_floor = MIN_EDGE_NET if n_exact_others >= 2 else \
-                            max(MIN_EDGE_NET, MIN_EDGE_DERIVED)
-                        if n_others < 2:
-                            edge_floor = max(edge_floor, MIN_EDGE_DERIVED)
                         if net_edge < edge_floor or net_edge > MAX_EDGE_NET:
                             continue
+                        if other_detail is None:     # only for cards we keep
+                            other_detail = _prop_consensus_detail(
+                                devigged, eval_book, group_books, juice_map)
 
                         fair_odds = implied_to_american(consensus_fair)
                         kf = quarter_kelly(consensus_fair, odds)
                         opportunities.append({
-                            'player': player, 'game': data['game'],
-                            'commence': data.get('commence', ''),
-                            'sport_key': data.get('sport_key', ''),
-                            'event_id': data.get('event_id', ''),
+                            'player': player, 'game': game_info,
+                            'commence': commence,
+                            'sport_key': sport_key_val,
+                            'event_id': event_id_val,
                             'market': market_name, 'book': BOOK_DISPLAY.get(eval_book, eval_book),
                             'book_key': eval_book, 'type': 'player_prop',
                             'edge': round(net_edge, 1), 'gross_edge': round(gross_edge, 1),
@@ -2135,25 +3093,47 @@ def analyze_player_props(games_data, market_name="", kalshi_props=None, poly_pro
                             'line': line_val,
                             'label1_name': f'{BOOK_DISPLAY.get(eval_book, eval_book)} Odds',
                             'label1_value': format_american(odds),
-                            'label2_name': (f'Fair Odds ({len(other_over_fairs)} books'
-                                            + (f', {sum(1 for b in devigged if b != eval_book and b in translated)} derived-line)'
-                                               if any(b in translated for b in devigged if b != eval_book)
+                            'label2_name': (f'Fair Odds ({n_others} books'
+                                            + (f', {n_derived} derived-line)' if n_derived
                                                else ')')),
                             'label2_value': format_american(fair_odds),
                             'label3_name': 'Net Edge', 'label3_value': f"+{net_edge:.1f}%",
                             'target_prob': round(eval_imp * 100, 1),
                             'fair_prob': round(consensus_fair * 100, 1),
                             'juice_display': f"{juice_pct}%",
-                            'consensus_books': len(other_over_fairs),
+                            'consensus_books': n_others,
                             'consensus_detail': other_detail,
                             'kelly_fraction': round(kf * 100, 2),
                             'affiliate_url': affiliate_url(eval_book),
                         })
+    return out, stats
 
-    log_debug(f"    Players: {stats['players']} ({stats['exch']} w/ exchange), same-line: {stats['same_line']}, "
-              f"too few books: {stats['too_few_books']}, diff-line: {stats['diff_line']} "
-              f"→ {len(opportunities)} +EV")
-    return opportunities
+
+def _prop_consensus_detail(devigged, eval_book, group_books, juice_map):
+    other_detail = []
+    for other_bk in devigged:
+        if other_bk == eval_book:
+            continue
+        if other_bk in group_books:
+            raw_over = format_american(group_books[other_bk].get('over_odds', 0))
+            raw_under = format_american(group_books[other_bk].get('under_odds', 0))
+            vig = juice_map.get(other_bk, 0)
+        elif other_bk in ('kalshi', 'polymarket'):
+            raw_over = f"{devigged[other_bk]['over']*100:.0f}¢"
+            raw_under = f"{devigged[other_bk]['under']*100:.0f}¢"
+            vig = 0
+        else:
+            raw_over = raw_under = '—'
+            vig = 0
+        other_detail.append({
+            'book': BOOK_DISPLAY.get(other_bk, other_bk),
+            'over_prob': round(devigged[other_bk]['over'] * 100, 1),
+            'over_odds': format_american(implied_to_american(devigged[other_bk]['over'])),
+            'under_odds': format_american(implied_to_american(devigged[other_bk]['under'])),
+            'raw_over': raw_over, 'raw_under': raw_under,
+            'vig': vig, 'weight': get_weight(other_bk),
+        })
+    return other_detail
 
 
 # ============================================================
@@ -2179,7 +3159,7 @@ def _middle_ints(lo, hi):
     return out
 
 
-def find_game_arbs(games_data, market_name=""):
+def find_game_arbs(games_data, market_name="", matrices=None):
     """Cross-book scalps on game markets.
 
     Emits two families:
@@ -2197,23 +3177,13 @@ def find_game_arbs(games_data, market_name=""):
     if not games_data:
         return []
     arbs = []
-    for game in games_data:
+    for game, mx in zip(games_data, _matrices(games_data, matrices)):
         game_info = f"{game.get('away_team', '?')} @ {game.get('home_team', '?')}"
         commence = game.get('commence_time', '')
+        sport_key_val = game.get('sport_key', '') or ''
+        event_id_val = game.get('id', '') or ''
 
-        book_odds = {}
-        for bookmaker in game.get('bookmakers', []):
-            bk = bookmaker['key']
-            book_odds[bk] = {}
-            for market in bookmaker.get('markets', []):
-                for outcome in market.get('outcomes', []):
-                    name = outcome.get('name', '')
-                    odds = outcome.get('price')
-                    point = outcome.get('point')
-                    if not name or odds is None:
-                        continue
-                    key = (name, float(point) if point is not None else None)
-                    book_odds[bk][key] = odds
+        book_odds, best_px = mx['book_odds'], mx['best']
 
         all_keys = set()
         for bk in book_odds:
@@ -2227,14 +3197,7 @@ def find_game_arbs(games_data, market_name=""):
                    if k[1] is not None and k[0] not in ('Over', 'Under')]
 
         def _best(key):
-            bo, bb = None, None
-            for bk in book_odds:
-                if bk not in CO_BETTABLE or key not in book_odds[bk]:
-                    continue
-                o = book_odds[bk][key]
-                if bo is None or american_to_implied(o) < american_to_implied(bo):
-                    bo, bb = o, bk
-            return bo, bb
+            return best_px.get(key, (None, None))
 
         def _dn(key):
             name, point = key
@@ -2260,6 +3223,7 @@ def find_game_arbs(games_data, market_name=""):
             arbs.append({
                 'player': f"ARB: {dn_a} + {dn_b}", 'game': game_info,
                 'commence': commence, 'market': market_name,
+                'sport_key': sport_key_val, 'event_id': event_id_val,
                 'book': f"{BOOK_DISPLAY.get(ba, ba)} / {BOOK_DISPLAY.get(bb, bb)}",
                 'type': 'arbitrage',
                 'edge': profit_pct, 'gross_edge': profit_pct,
@@ -2310,6 +3274,7 @@ def find_game_arbs(games_data, market_name=""):
             arbs.append({
                 'player': f"MIDDLE: {dn_a} + {dn_b}", 'game': game_info,
                 'commence': commence, 'market': market_name,
+                'sport_key': sport_key_val, 'event_id': event_id_val,
                 'book': f"{BOOK_DISPLAY.get(ba, ba)} / {BOOK_DISPLAY.get(bb, bb)}",
                 'type': 'middle', 'edge': 0.0, 'gross_edge': 0.0,
                 'be_pct': round(be_pct, 2), 'cost_pct': round(cost_pct, 2),
@@ -2352,6 +3317,7 @@ def find_game_arbs(games_data, market_name=""):
                         'player': f"ARB (3-way): {' / '.join(k[0] for k in ml_keys)}",
                         'game': game_info, 'commence': commence,
                         'market': market_name,
+                        'sport_key': sport_key_val, 'event_id': event_id_val,
                         'book': ' / '.join(sorted({BOOK_DISPLAY.get(v[1], v[1])
                                                    for v in best.values()})),
                         'type': 'arbitrage', 'edge': profit_pct,
@@ -2400,77 +3366,55 @@ def find_game_arbs(games_data, market_name=""):
     return arbs
 
 
-def find_prop_arbs(games_data, market_name=""):
+def find_prop_arbs(games_data, market_name="", tables=None):
     if not games_data:
         return []
-    arbs = []
-    for game in games_data:
+    return [a for arbs in _prop_arbs_batch(games_data, market_name,
+                                           _prop_tables(games_data, tables))
+            for a in arbs]
+
+
+def _prop_arbs_batch(games_data, market_name, tables):
+    out = []
+    for game, table in zip(games_data, tables):
+        arbs = []
+        out.append(arbs)
         game_info = f"{game.get('away_team', '?')} @ {game.get('home_team', '?')}"
         commence = game.get('commence_time', '')
+        sport_key_val = game.get('sport_key', '') or ''
+        event_id_val = game.get('id', '') or ''
 
-        players = {}
-        for bookmaker in game.get('bookmakers', []):
-            bk = bookmaker['key']
-            for market in bookmaker.get('markets', []):
-                for outcome in market.get('outcomes', []):
-                    player = outcome.get('description', '')
-                    if not player:
-                        continue
-                    line = outcome.get('point')
-                    odds = outcome.get('price')
-                    side = outcome.get('name', '').lower()
-                    if line is None or odds is None:
-                        continue
-                    if player not in players:
-                        players[player] = {'game': game_info, 'commence': commence, 'books': {}}
-                    if bk not in players[player]['books']:
-                        players[player]['books'][bk] = {'line': line}
-                    if 'over' in side:
-                        players[player]['books'][bk]['over_odds'] = odds
-                    elif 'under' in side:
-                        players[player]['books'][bk]['under_odds'] = odds
-                    players[player]['books'][bk]['line'] = line
-
-        for player, data in players.items():
-            books = data['books']
-            line_groups = {}
-            for bk, bdata in books.items():
-                if 'over_odds' not in bdata or 'under_odds' not in bdata:
-                    continue
-                rounded = round(bdata['line'] * 4) / 4
-                if rounded not in line_groups:
-                    line_groups[rounded] = {}
-                line_groups[rounded][bk] = bdata
-
-            for line_val, group_books in line_groups.items():
+        for player, entry in table.items():
+            for line_val, group_books in entry['groups'].items():
                 if len(group_books) < 2:
                     continue
-                best_over_odds = best_under_odds = None
+                best_over = best_under = None
                 best_over_book = best_under_book = None
-                for bk, bdata in group_books.items():
+                for bk, q in group_books.items():
                     if bk not in CO_BETTABLE:
                         continue
-                    if best_over_odds is None or american_to_implied(bdata['over_odds']) < american_to_implied(best_over_odds):
-                        best_over_odds = bdata['over_odds']
-                        best_over_book = bk
-                    if best_under_odds is None or american_to_implied(bdata['under_odds']) < american_to_implied(best_under_odds):
-                        best_under_odds = bdata['under_odds']
-                        best_under_book = bk
+                    if best_over is None or q['ov'] < best_over['ov']:
+                        best_over, best_over_book = q, bk
+                    if best_under is None or q['un'] < best_under['un']:
+                        best_under, best_under_book = q, bk
                 if best_over_book == best_under_book:
                     continue
-                if best_over_odds is None or best_under_odds is None:
+                if best_over is None or best_under is None:
                     continue
-                imp_over = american_to_implied(best_over_odds)
-                imp_under = american_to_implied(best_under_odds)
+                best_over_odds = best_over['over_odds']
+                best_under_odds = best_under['under_odds']
+                imp_over = best_over['ov']
+                imp_under = best_under['un']
                 total = imp_over + imp_under
                 if total < 1.0:
                     profit_pct = round((1.0 - total) * 100, 2)
                     stake_over = round(100 * imp_over / (imp_over + imp_under), 2)
                     stake_under = round(100 - stake_over, 2)
                     arbs.append({
-                        'player': f"ARB: {player}", 'game': data['game'],
-                        'commence': data.get('commence', ''),
+                        'player': f"ARB: {player}", 'game': game_info,
+                        'commence': commence,
                         'market': market_name,
+                        'sport_key': sport_key_val, 'event_id': event_id_val,
                         'book': f"{BOOK_DISPLAY.get(best_over_book, best_over_book)} / {BOOK_DISPLAY.get(best_under_book, best_under_book)}",
                         'type': 'arbitrage',
                         'edge': profit_pct, 'gross_edge': profit_pct,
@@ -2487,41 +3431,71 @@ def find_prop_arbs(games_data, market_name=""):
                         'affiliate_url_a': affiliate_url(best_over_book),
                         'affiliate_url_b': affiliate_url(best_under_book),
                     })
-    return arbs
+    return out
 
 
-def fetch_event_props(sport, prop_markets, max_events=8, kalshi_props=None, poly_props=None):
+def fetch_event_props(sport, prop_markets, max_events=8, kalshi_props=None, poly_props=None,
+                      event_ids=None):
+    """event_ids: only re-scan these events of the max_events window
+    (incremental scans); None scans the whole window."""
     all_opps = []
     all_arbs = []
     events = fetch_events(sport)
     if not events:
+        _scan_memo['prop_events'][sport] = set()
         return [], []
     events_to_scan = events[:max_events]
+    _scan_memo['prop_events'][sport] = {e.get('id') for e in events_to_scan}
+    if event_ids is not None:
+        events_to_scan = [e for e in events_to_scan if e.get('id') in event_ids]
     log_debug(f"  Scanning {len(events_to_scan)} of {len(events)} {sport} events")
 
-    model_edatas, model_prop_name = [], ''
+    # Fetch every (event, market) first, then analyze each market across all
+    # of the sport's events in one batch: one parse per event feeds both the
+    # +EV and the arb pass.
+    fetched = []            # (event, prop_market, prop_name, edata)
+    exhausted = False
     for event in events_to_scan:
         eid = event.get('id')
-        home = event.get('home_team', '?')
-        away = event.get('away_team', '?')
         for prop_market, prop_name in prop_markets:
             if API_KEYS and len(_dead_keys) >= len(API_KEYS) and not providers.ENABLED:
                 log_debug("    All keys exhausted — stopping")
-                return all_opps, all_arbs
+                exhausted = True
+                break
             edata = fetch_event_odds(sport, eid, prop_market)
             if edata and edata.get('bookmakers'):
-                if prop_market == 'player_points':
-                    model_edatas.append(edata)
-                    model_prop_name = prop_name
-                opps = analyze_player_props([edata], prop_name,
-                    kalshi_props=kalshi_props, poly_props=poly_props, market_key=prop_market)
-                arbs = find_prop_arbs([edata], prop_name)
-                if opps:
-                    all_opps.extend(opps)
-                    log_debug(f"    {away} @ {home} / {prop_name}: {len(opps)} +EV")
-                if arbs:
-                    all_arbs.extend(arbs)
+                fetched.append((event, prop_market, prop_name, edata))
             time.sleep(0.3)
+        if exhausted:
+            break
+
+    results = {}            # id(edata) -> (opps, arbs)
+    for prop_market, prop_name in prop_markets:
+        batch = [f[3] for f in fetched if f[1] == prop_market]
+        if not batch:
+            continue
+        tables = [_prop_table(e) for e in batch]
+        opps_by, stats = _prop_opps_batch(batch, prop_name, kalshi_props, poly_props,
+                                          prop_market, tables)
+        arbs_by = _prop_arbs_batch(batch, prop_name, tables)
+        _log_prop_stats(stats, sum(len(o) for o in opps_by))
+        for edata, opps, arbs in zip(batch, opps_by, arbs_by):
+            results[id(edata)] = (opps, arbs)
+
+    model_edatas, model_prop_name = [], ''
+    for event, prop_market, prop_name, edata in fetched:
+        if prop_market == 'player_points':
+            model_edatas.append(edata)
+            model_prop_name = prop_name
+        opps, arbs = results[id(edata)]
+        if opps:
+            all_opps.extend(opps)
+            log_debug(f"    {event.get('away_team', '?')} @ {event.get('home_team', '?')}"
+                      f" / {prop_name}: {len(opps)} +EV")
+        if arbs:
+            all_arbs.extend(arbs)
+    if exhausted:
+        return all_opps, all_arbs
     if model_edatas:
         try:
             mo = model_prop_opportunities(model_edatas, sport, model_prop_name)
@@ -2536,6 +3510,95 @@ def fetch_event_props(sport, prop_markets, max_events=8, kalshi_props=None, poly
 # CROSS-EXCHANGE SCANNER (Kalshi vs Polymarket, non-sports)
 # ============================================================
 
+# Title matcher. Every Kalshi title used to be scored against every
+# Polymarket question with SequenceMatcher (~1000 x 500 ratio calls). Now
+# the Polymarket side is tokenized into an inverted index, each Kalshi title
+# pulls its top-k TF-IDF candidates, and SequenceMatcher only ranks those.
+# Confirmed pairs are remembered by (ticker, slug) across scans and reused
+# while both titles are unchanged.
+XMATCH_MIN_RATIO = 0.65
+XMATCH_TOPK = int(os.environ.get('XMATCH_TOPK', '16'))  # SequenceMatcher calls per Kalshi title
+_XMATCH_STOP = frozenset('a an and the of in on to by be will is for at or with than'.split())
+_xmatch_pairs = {}   # ticker -> (kalshi title, slug, poly title); replaced whole, never mutated
+
+def _title_tokens(title):
+    return {t for t in re.findall(r"[a-z0-9]+(?:\.[0-9]+)?", title) if t not in _XMATCH_STOP}
+
+def _title_index(titles):
+    """Inverted index over `titles` (already lower-cased): token -> [doc],
+    plus binary TF-IDF weights and per-doc norms."""
+    docs = [_title_tokens(t) for t in titles]
+    postings = {}
+    for i, toks in enumerate(docs):
+        for t in toks:
+            postings.setdefault(t, []).append(i)
+    n = len(docs)
+    idf = {t: math.log((n + 1) / (len(ix) + 0.5)) for t, ix in postings.items()}
+    norms = [math.sqrt(sum(idf[t] ** 2 for t in toks)) or 1.0 for toks in docs]
+    return {'titles': titles, 'postings': postings, 'idf': idf, 'norms': norms}
+
+def _title_candidates(index, title, k):
+    """Indices of the k indexed titles with the highest TF-IDF cosine
+    against `title`; titles sharing no token are never candidates."""
+    idf, postings = index['idf'], index['postings']
+    scores = {}
+    for t in _title_tokens(title):
+        w = idf.get(t)
+        if w is None:
+            continue
+        w *= w
+        for i in postings[t]:
+            scores[i] = scores.get(i, 0.0) + w
+    norms = index['norms']
+    return sorted(heapq.nlargest(k, scores, key=lambda i: scores[i] / norms[i]))
+
+def _match_title(index, title, k=None):
+    """(ratio, index title) of the best SequenceMatcher match among the
+    top-k candidates, or (0, None). Ties keep the earliest title, as the
+    full scan did."""
+    from difflib import SequenceMatcher
+    best_score, best = 0, None
+    sm = SequenceMatcher(None, title, '')   # same (kalshi, poly) order as before
+    for i in _title_candidates(index, title, XMATCH_TOPK if k is None else k):
+        cand = index['titles'][i]
+        sm.set_seq2(cand)
+        if sm.real_quick_ratio() <= best_score or sm.quick_ratio() <= best_score:
+            continue
+        score = sm.ratio()
+        if score > best_score:
+            best_score, best = score, cand
+    return best_score, best
+
+def _match_exchange_titles(kalshi_markets, poly_markets):
+    """[(kalshi title, poly title)] for every Kalshi market whose best
+    Polymarket match clears XMATCH_MIN_RATIO. Returns (pairs, cache hits).
+    Reads one snapshot of _xmatch_pairs and swaps in a fresh dict at the
+    end, so overlapping scans never see it half-updated."""
+    global _xmatch_pairs
+    known_pairs, fresh = _xmatch_pairs, {}
+    by_slug = {p['slug']: q for q, p in poly_markets.items() if p.get('slug')}
+    index = None
+    pairs, hits = [], 0
+    for k_title, k_data in kalshi_markets.items():
+        ticker = k_data.get('ticker') or ''
+        known = known_pairs.get(ticker)
+        if known and known[0] == k_title and by_slug.get(known[1]) == known[2]:
+            pairs.append((k_title, known[2]))
+            fresh[ticker] = known
+            hits += 1
+            continue
+        if index is None:
+            index = _title_index(list(poly_markets))
+        score, p_title = _match_title(index, k_title)
+        if score < XMATCH_MIN_RATIO or not p_title:
+            continue
+        pairs.append((k_title, p_title))
+        slug = poly_markets[p_title].get('slug')
+        if ticker and slug:
+            fresh[ticker] = (k_title, slug, p_title)
+    _xmatch_pairs = fresh
+    return pairs, hits
+
 def fetch_cross_exchange_opps():
     opportunities = []
     try:
@@ -2571,13 +3634,12 @@ def fetch_cross_exchange_opps():
             cursor = data.get('cursor', '')
             if not cursor:
                 break
-            time.sleep(0.3)
         log_debug(f"  Kalshi: {len(kalshi_markets)} tradeable non-combo markets")
 
         log_debug("  Fetching Polymarket markets...")
         poly_markets = {}
         try:
-            resp = requests.get(f"{POLYMARKET_API}/markets",
+            resp = poly_get(f"{POLYMARKET_API}/markets",
                 params={'closed': 'false', 'limit': 500, 'active': 'true'}, timeout=15)
             if resp.status_code == 200:
                 for m in resp.json():
@@ -2613,20 +3675,10 @@ def fetch_cross_exchange_opps():
             log_debug(f"  Polymarket error: {e}")
         log_debug(f"  Polymarket: {len(poly_markets)} active Y/N markets")
 
-        from difflib import SequenceMatcher
-        matches = 0
-        for k_title, k_data in kalshi_markets.items():
-            best_score = 0
-            best_poly = None
-            for p_title, p_data in poly_markets.items():
-                score = SequenceMatcher(None, k_title, p_title).ratio()
-                if score > best_score:
-                    best_score = score
-                    best_poly = (p_title, p_data)
-            if best_score < 0.65 or not best_poly:
-                continue
-            p_title, p_data = best_poly
-            matches += 1
+        pairs, cached = _match_exchange_titles(kalshi_markets, poly_markets)
+        matches = len(pairs)
+        for k_title, p_title in pairs:
+            k_data, p_data = kalshi_markets[k_title], poly_markets[p_title]
 
             k_mid = k_data['mid']
             p_yes = p_data['yes_price']
@@ -2664,7 +3716,8 @@ def fetch_cross_exchange_opps():
                 'kelly_fraction': round(quarter_kelly(max(k_mid, p_yes), bet_odds) * 100, 2),
                 'affiliate_url': affiliate_url(bet_on_key),
             })
-        log_debug(f"  Cross-exchange: {matches} matched, {len(opportunities)} with 3%+ spread")
+        log_debug(f"  Cross-exchange: {matches} matched ({cached} cached pairs), "
+                  f"{len(opportunities)} with 3%+ spread")
     except Exception as e:
         log_debug(f"  Cross-exchange error: {e}")
     return opportunities
@@ -2966,14 +4019,12 @@ def fetch_weather_opps():
         }
         weather_mkts = []
         log_debug("  Fetching Kalshi weather series...")
+        pages = _kalshi_series_pages(list(WEATHER_SERIES))
         for series_ticker, info in WEATHER_SERIES.items():
             try:
-                resp = kalshi_get(f"{KALSHI_API}/markets",
-                    params={'series_ticker': series_ticker, 'status': 'open', 'limit': 50}, timeout=10)
-                if resp.status_code == 429:
-                    time.sleep(5)
-                    resp = kalshi_get(f"{KALSHI_API}/markets",
-                        params={'series_ticker': series_ticker, 'status': 'open', 'limit': 50}, timeout=10)
+                resp = pages[series_ticker]
+                if isinstance(resp, Exception):
+                    raise resp
                 if resp.status_code == 200:
                     mkts = resp.json().get('markets', [])
                     count = 0
@@ -2990,7 +4041,6 @@ def fetch_weather_opps():
                               f"{count} priced / {len(mkts)} open")
                 else:
                     log_debug(f"    {series_ticker}: HTTP {resp.status_code}")
-                time.sleep(1.5)
             except Exception as e:
                 log_debug(f"    {series_ticker}: error {e}")
                 continue
@@ -3258,14 +4308,12 @@ def fetch_econ_opps():
                        'KXPAYROLLS', 'PAYROLLS', 'KXGDP', 'GDP', 'RATECUT', 'KXRATECUT']
         econ_mkts = []
         log_debug("  Fetching Kalshi economic markets...")
+        pages = _kalshi_series_pages(ECON_SERIES)
         for series in ECON_SERIES:
             try:
-                resp = kalshi_get(f"{KALSHI_API}/markets",
-                    params={'series_ticker': series, 'status': 'open', 'limit': 50}, timeout=10)
-                if resp.status_code == 429:
-                    time.sleep(5)
-                    resp = kalshi_get(f"{KALSHI_API}/markets",
-                        params={'series_ticker': series, 'status': 'open', 'limit': 50}, timeout=10)
+                resp = pages[series]
+                if isinstance(resp, Exception):
+                    raise resp
                 if resp.status_code == 200:
                     mkts = resp.json().get('markets', [])
                     count = 0
@@ -3278,14 +4326,13 @@ def fetch_econ_opps():
                             count += 1
                     if count > 0:
                         log_debug(f"    {series}: {count} markets")
-                time.sleep(1.5)
             except:
                 continue
         log_debug(f"  Kalshi: {len(econ_mkts)} economic markets")
 
         poly_mkts = []
         try:
-            resp = requests.get(f"{POLYMARKET_API}/markets",
+            resp = poly_get(f"{POLYMARKET_API}/markets",
                 params={'closed': 'false', 'limit': 500, 'active': 'true'}, timeout=15)
             if resp.status_code == 200:
                 for m in resp.json():
@@ -3577,28 +4624,88 @@ def fetch_econ_nowcast_opps():
         return []
 
 
-def scan_markets():
-    global _dead_keys
-    with _state_lock:
-        state['scanning'] = True
-        state['debug_info'] = []
-    with _key_lock:
-        _dead_keys = set()
-
-    scan_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-    all_opps = []
-
-    log_debug("=== SCAN STARTED ===")
-    log_debug(f"Scan ID: {scan_id}")
-    if True:
-        log_debug("Direct feeds: " + ("ON (Pinnacle/DK/FD/MGM/BetRivers)" if providers.ENABLED else "OFF") + (" | Odds API fallback: " + str(len(API_KEYS)) + " keys" if API_KEYS else " | no Odds API keys"))
-    log_debug(f"Bettable: {', '.join(BOOK_DISPLAY.get(b, b) for b in CO_BETTABLE)}")
-    log_debug(f"Consensus: + {', '.join(BOOK_DISPLAY.get(b, b) for b in CONSENSUS_ONLY)} + Kalshi + Polymarket")
-    log_debug(f"Build: {BUILD_TAG}")
-    log_debug(f"Strategy: CO book vs weighted consensus (Pinnacle/Kalshi/Poly 3x) | Min edge: {MIN_EDGE_NET}%")
-    log_debug(f"Markets: moneylines + spreads + totals + props | arbs, middles (cost cap {MIDDLE_MAX_COST}%), +EV")
+# What the last scan used, so incremental scans can reuse it
+_scan_memo = {
+    'full_ts': 0,          # last full scan_markets() finish
+    'exchange': None,      # {'ts', 'poly_props', 'poly_games', 'kalshi_props', 'kalshi_games'}
+    'slow_ts': 0,          # last run of the non-sports stages
+    'prop_events': {},     # sport -> event ids the props stage covered
+    'stages': {},          # last scan's stage -> {'sec', 'error'}
+}
 
-    # ---- Exchange data for consensus ----
+# Stage graph executor. Stage functions must not submit to _stage_pool
+# themselves (the Kalshi/ESPN/feed pools are separate), or a full pool
+# deadlocks.
+_stage_pool = ThreadPoolExecutor(max_workers=max(1, SCAN_WORKERS),
+                                 thread_name_prefix='stage')
+
+def _run_stages(stages, fallbacks=None):
+    """Run [(name, deps, fn)] as a DAG: a stage is submitted once every
+    stage named in `deps` has finished, and is called with their results as
+    positional args. A stage that raises (or whose input failed) yields None,
+    unless `fallbacks` has a value for it: then that value is its result and
+    its dependents still run. Returns ({name: result}, {name: {'sec': wall seconds, 'error': str|None}})."""
+    names = {name for name, _d, _f in stages}
+    for name, deps, _f in stages:
+        missing = [d for d in deps if d not in names]
+        if missing:
+            raise ValueError(f"stage {name} depends on unknown {missing}")
+    fallbacks = fallbacks or {}
+    results, timing = {}, {}
+    pending, running = list(stages), {}
+
+    def timed(fn, args):
+        t0 = time.time()
+        try:
+            return fn(*args), None, time.time() - t0
+        except Exception as e:
+            return None, str(e)[:120] or type(e).__name__, time.time() - t0
+
+    while pending or running:
+        progressed = True
+        while progressed:
+            progressed = False
+            for st in list(pending):
+                name, deps, fn = st
+                bad = [d for d in deps if d in timing and timing[d]['error']
+                       and d not in fallbacks]
+                if bad:
+                    pending.remove(st)
+                    results[name] = None
+                    timing[name] = {'sec': 0.0, 'error': f"skipped ({bad[0]} failed)"}
+                    progressed = True
+                elif all(d in timing for d in deps):
+                    pending.remove(st)
+                    fut = _stage_pool.submit(_in_xscope(timed), fn,
+                                             [results[d] for d in deps])
+                    running[fut] = name
+        if not running:
+            raise ValueError(f"stage cycle: {[n for n, _d, _f in pending]}")
+        done, _ = futures_wait(running, return_when=FIRST_COMPLETED)
+        for fut in done:
+            name = running.pop(fut)
+            results[name], err, sec = fut.result()
+            timing[name] = {'sec': round(sec, 2), 'error': err}
+            if err:
+                log_debug(f"  {name} failed: {err}")
+                if name in fallbacks:
+                    results[name] = fallbacks[name]
+    return results, timing
+
+def _log_stage_times(timing, wall):
+    """One debug line per scan: wall time vs summed stage time, the
+    slowest stages, and any failures."""
+    _scan_memo['stages'] = timing
+    total = sum(t['sec'] for t in timing.values())
+    slow = sorted(timing.items(), key=lambda kv: -kv[1]['sec'])[:3]
+    failed = [n for n, t in timing.items() if t['error']]
+    log_debug(f"Stages: {len(timing)} in {wall:.1f}s (sum {total:.1f}s) | slowest: "
+              + ', '.join(f"{n} {t['sec']:.1f}s" for n, t in slow)
+              + (f" | failed: {', '.join(failed)}" if failed else ''))
+_SLOW_TYPES = ('cross_exchange', 'weather', 'economic')
+
+
+def _load_exchange_consensus():
     log_debug("--- Polymarket sports ---")
     try:
         poly_sports = fetch_polymarket_sports(log_fn=log_debug)
@@ -3620,86 +4727,75 @@ def scan_markets():
     log_debug(f"  Exchange consensus loaded: "
               f"Kalshi {len(kalshi_props)} players / {len(kalshi_games)} games, "
               f"Poly {len(poly_props)} players / {len(poly_games)} games")
+    ex = {'ts': time.time(), 'poly_props': poly_props, 'poly_games': poly_games,
+          'kalshi_props': kalshi_props, 'kalshi_games': kalshi_games}
+    _scan_memo['exchange'] = ex
+    return ex
 
-    # ---- Sports: Player Props ----
-    if API_KEYS or providers.ENABLED:
-        log_debug("--- Player Props ---")
-        for sport, prop_markets, max_ev in PROP_MARKETS:
-            if API_KEYS and len(_dead_keys) >= len(API_KEYS) and not providers.ENABLED:
-                log_debug("  All keys exhausted — stopping props")
-                break
-            try:
-                opps, arbs = fetch_event_props(sport, prop_markets, max_events=max_ev,
-                    kalshi_props=kalshi_props, poly_props=poly_props)
-                all_opps.extend(opps)
-                all_opps.extend(arbs)
-            except Exception as e:
-                log_debug(f"  {sport} props failed: {e}")
+def _empty_exchange():
+    """Consensus with no exchange quotes, for when loading it fails."""
+    return {'ts': 0.0, 'poly_props': {}, 'poly_games': {},
+            'kalshi_props': {}, 'kalshi_games': {}}
 
-        # ---- Sports: Game lines (moneyline / spread / total) ----
-        log_debug("--- Game Lines (ML / Spread / Total) ---")
-        for sport, market, name in GAME_MARKETS:
-            if API_KEYS and len(_dead_keys) >= len(API_KEYS) and not providers.ENABLED:
-                log_debug("  All keys exhausted — stopping moneylines")
-                break
-            try:
-                games = fetch_odds(sport, market)
-                if games:
-                    opps = analyze_game_markets(games, name,
-                        poly_games=poly_games, kalshi_games=kalshi_games)
-                    arbs = find_game_arbs(games, name)
-                    all_opps.extend(opps)
-                    all_opps.extend(arbs)
-            except Exception as e:
-                log_debug(f"  {sport} {name} failed: {e}")
-            time.sleep(0.3)
 
-    # ---- Cross-Exchange ----
-    log_debug("--- Cross-Exchange (Kalshi ↔ Polymarket) ---")
-    try:
-        all_opps.extend(fetch_cross_exchange_opps())
-    except Exception as e:
-        log_debug(f"  Cross-exchange failed: {e}")
+def _scan_props(sport, prop_markets, max_ev, ex, event_ids=None):
+    opps, arbs = fetch_event_props(sport, prop_markets, max_events=max_ev,
+        kalshi_props=ex['kalshi_props'], poly_props=ex['poly_props'],
+        event_ids=event_ids)
+    return opps + arbs
 
-    # ---- Weather ----
-    log_debug("--- Weather (Ensemble Model) ---")
-    try:
-        _w = fetch_weather_opps()
-        _wc = [o for o in _w if o.get('type') == 'weather_calib']
-        for _c in _wc:
-            log_opportunity(_c, scan_id)
-        all_opps.extend([o for o in _w if o.get('type') != 'weather_calib'])
-    except Exception as e:
-        log_debug(f"  Weather failed: {e}")
 
-    # ---- Economic ----
-    log_debug("--- Economic ---")
-    try:
-        all_opps.extend(fetch_econ_opps())
-    except Exception as e:
-        log_debug(f"  Economic failed: {e}")
-    try:
-        all_opps.extend(fetch_econ_nowcast_opps())
-    except Exception as e:
-        log_debug(f"  Econ nowcast failed: {e}")
-
-    # Sort: arbs first (by edge desc), then middles (by break-even hit rate asc
-    # -- cheapest middles are the most attractive), then +EV bets by edge desc.
-    def _rank(x):
-        t = x.get('type', '')
-        if t == 'arbitrage':
-            return (0, -x.get('edge', 0.0))
-        if t == 'middle':
-            return (1, x.get('be_pct', 99.0))
-        return (2, -x.get('edge', 0.0))
+def _scan_game_lines(sport, market, name, ex, event_ids=None):
+    games = fetch_odds(sport, market)
+    if games and event_ids is not None:
+        games = [g for g in games if g.get('id') in event_ids]
+    if not games:
+        return []
+    mats = [_game_matrix(g) for g in games]
+    opps = analyze_game_markets(games, name,
+        poly_games=ex['poly_games'], kalshi_games=ex['kalshi_games'], matrices=mats)
+    return opps + find_game_arbs(games, name, matrices=mats)
+
+
+def _slow_stage_list(scan_id):
+    """Cross-exchange, weather and econ — everything not driven by the
+    sportsbook snapshots — as independent stages."""
+    def weather():
+        _w = fetch_weather_opps()
+        log_opportunities([o for o in _w if o.get('type') == 'weather_calib'], scan_id)
+        return [o for o in _w if o.get('type') != 'weather_calib']
+    return [('cross_exchange', (), fetch_cross_exchange_opps),
+            ('weather', (), weather),
+            ('econ', (), fetch_econ_opps),
+            ('econ_nowcast', (), fetch_econ_nowcast_opps)]
+
+
+def _scan_slow_stages(scan_id):
+    t0 = time.time()
+    stages = _slow_stage_list(scan_id)
+    results, timing = _run_stages(stages)
+    _log_stage_times(timing, time.time() - t0)
+    _scan_memo['slow_ts'] = time.time()
+    return [o for name, _d, _f in stages for o in results[name] or []]
+
+
+def _rank(x):
+    """Sort: arbs first (by edge desc), then middles (by break-even hit rate
+    asc -- cheapest middles are the most attractive), then +EV bets by edge
+    desc."""
+    t = x.get('type', '')
+    if t == 'arbitrage':
+        return (0, -x.get('edge', 0.0))
+    if t == 'middle':
+        return (1, x.get('be_pct', 99.0))
+    return (2, -x.get('edge', 0.0))
+
+
+def _finish_scan(all_opps, scan_id, to_log):
     all_opps.sort(key=_rank)
 
-    # Log every opportunity to DB for CLV tracking
-    try:
-        for opp in all_opps:
-            log_opportunity(opp, scan_id)
-    except Exception as e:
-        log_debug(f"DB logging error: {e}")
+    # Log opportunities to DB for CLV tracking
+    log_opportunities(to_log, scan_id)
 
     with _state_lock:
         state['opportunities'] = all_opps
@@ -3715,6 +4811,200 @@ def scan_markets():
     log_debug(f"=== DONE: {len(all_opps)} total [{summary}] ({active}/{len(API_KEYS)} keys active) ===")
 
 
+def _scanning_exchange(fn):
+    """Run a scan inside one exchange-cache scope."""
+    @functools.wraps(fn)
+    def wrapper(*a, **kw):
+        with _exchange_scope():
+            return fn(*a, **kw)
+    return wrapper
+
+
+@_scanning_exchange
+def scan_markets():
+    global _dead_keys
+    with _state_lock:
+        state['scanning'] = True
+        state['debug_info'] = []
+    with _key_lock:
+        _dead_keys = set()
+    providers.take_changes()      # a full scan covers whatever was pending
+
+    scan_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    all_opps = []
+
+    log_debug("=== SCAN STARTED ===")
+    log_debug(f"Scan ID: {scan_id}")
+    if True:
+        log_debug("Direct feeds: " + ("ON (Pinnacle/DK/FD/MGM/BetRivers)" if providers.ENABLED else "OFF") + (" | Odds API fallback: " + str(len(API_KEYS)) + " keys" if API_KEYS else " | no Odds API keys"))
+    log_debug(f"Bettable: {', '.join(BOOK_DISPLAY.get(b, b) for b in CO_BETTABLE)}")
+    log_debug(f"Consensus: + {', '.join(BOOK_DISPLAY.get(b, b) for b in CONSENSUS_ONLY)} + Kalshi + Polymarket")
+    log_debug(f"Build: {BUILD_TAG}")
+    log_debug(f"Strategy: CO book vs weighted consensus (Pinnacle/Kalshi/Poly 3x) | Min edge: {MIN_EDGE_NET}%")
+    log_debug(f"Markets: moneylines + spreads + totals + props | arbs, middles (cost cap {MIDDLE_MAX_COST}%), +EV")
+
+    def odds_stage(fn, sport, *args):
+        def run(ex):
+            if API_KEYS and len(_dead_keys) >= len(API_KEYS) and not providers.ENABLED:
+                log_debug(f"  All keys exhausted — skipping {sport}")
+                return []
+            return fn(sport, *args, ex)
+        return run
+
+    # exchange consensus feeds every sportsbook stage (an empty one if it
+    # fails); the non-sports stages need nothing and run alongside from the start
+    stages = [('exchange', (), _load_exchange_consensus)]
+    if API_KEYS or providers.ENABLED:
+        stages += [(f"props:{sport}", ('exchange',),
+                    odds_stage(_scan_props, sport, prop_markets, max_ev))
+                   for sport, prop_markets, max_ev in PROP_MARKETS]
+        stages += [(f"lines:{sport}:{market}", ('exchange',),
+                    odds_stage(_scan_game_lines, sport, market, name))
+                   for sport, market, name in GAME_MARKETS]
+    stages += _slow_stage_list(scan_id)
+    t0 = time.time()
+    results, timing = _run_stages(stages, fallbacks={'exchange': _empty_exchange()})
+    _log_stage_times(timing, time.time() - t0)
+    _scan_memo['slow_ts'] = time.time()
+    for name, _d, _f in stages[1:]:
+        all_opps.extend(results[name] or [])
+    _scan_memo['full_ts'] = time.time()
+    _finish_scan(all_opps, scan_id, all_opps)
+
+
+@_scanning_exchange
+def scan_sports_incremental():
+    """Ingest-triggered scan: re-analyze only the games whose snapshot changed
+    since the last scan (providers.take_changes) and reuse every other
+    opportunity from state['opportunities']. Exchange consensus is reused
+    for EXCHANGE_REFRESH_SEC, the non-sports stages for
+    SLOW_STAGE_REFRESH_SEC. Falls back to a full scan if none has run yet."""
+    if not _scan_memo['full_ts'] or _scan_memo['exchange'] is None:
+        return scan_markets()
+    with _state_lock:
+        state['scanning'] = True
+        state['debug_info'] = []
+        prev = list(state['opportunities'])
+    changes = providers.take_changes()
+    scan_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+    log_debug("=== INCREMENTAL SCAN STARTED ===")
+    log_debug(f"Scan ID: {scan_id}")
+
+    ex = _scan_memo['exchange']
+    if time.time() - ex['ts'] >= EXCHANGE_REFRESH_SEC:
+        try:
+            ex = _load_exchange_consensus()
+        except Exception as e:
+            log_debug(f"  exchange consensus failed, keeping previous: {str(e)[:80]}")
+        # new exchange quotes feed every game's consensus
+        changes = {sp: None for s_ in (GAME_MARKETS, PROP_MARKETS) for sp, *_r in s_}
+    if not changes:
+        log_debug("  no snapshot changes — nothing to re-analyze")
+
+    # Which (sport, event) pairs to drop and recompute. A sport mapped to
+    # None is redone whole. Events entering/leaving the props window count
+    # as changed too.
+    redo = {}
+    windows = {}
+    for sport, prop_markets, max_ev in PROP_MARKETS:
+        if sport not in changes:
+            continue
+        try:
+            events = fetch_events(sport) or []
+        except Exception:
+            events = []
+        windows[sport] = {e.get('id') for e in events[:max_ev]}
+    scanned = {s for s, _m, _n in GAME_MARKETS} | {s for s, _m, _e in PROP_MARKETS}
+    for sport, ids in changes.items():
+        if sport not in scanned:
+            continue
+        if ids is not None and sport in windows:
+            ids = set(ids) | (windows[sport] ^ _scan_memo['prop_events'].get(sport, set()))
+        redo[sport] = ids
+
+    def _stale(o):
+        if o.get('type') in _SLOW_TYPES:
+            return False
+        sp = o.get('sport_key')
+        if sp not in redo:
+            return False
+        return redo[sp] is None or o.get('event_id') in redo[sp]
+
+    all_opps = [o for o in prev if not _stale(o)]
+    fresh = []
+    for sport, prop_markets, max_ev in PROP_MARKETS:
+        if sport not in redo:
+            continue
+        ids = redo[sport]
+        try:
+            fresh.extend(_scan_props(sport, prop_markets, max_ev, ex,
+                                     event_ids=None if ids is None else ids & windows[sport]))
+        except Exception as e:
+            log_debug(f"  {sport} props failed: {e}")
+    for sport, market, name in GAME_MARKETS:
+        if sport not in redo:
+            continue
+        try:
+            fresh.extend(_scan_game_lines(sport, market, name, ex, event_ids=redo[sport]))
+        except Exception as e:
+            log_debug(f"  {sport} {name} failed: {e}")
+    log_debug(f"  re-analyzed {', '.join(f'{sp}: ' + ('all' if ids is None else str(len(ids))) for sp, ids in redo.items()) or 'nothing'}"
+              f" -> {len(fresh)} fresh, {len(all_opps)} reused")
+
+    if time.time() - _scan_memo['slow_ts'] >= SLOW_STAGE_REFRESH_SEC:
+        all_opps = [o for o in all_opps if o.get('type') not in _SLOW_TYPES]
+        fresh.extend(_scan_slow_stages(scan_id))
+    all_opps.extend(fresh)
+    _finish_scan(all_opps, scan_id, fresh)
+
+
+def _on_snapshot(sport, changed, index):
+    """providers.subscribe hook: refresh _best_index for the events whose
+    snapshot changed, re-evaluate arbs/middles for just those events, and
+    swap them into state['opportunities'] without waiting for a scan."""
+    markets = [(m, n) for s_, m, n in GAME_MARKETS if s_ == sport]
+    if not markets:
+        return
+    touched = {}
+    with _best_lock:
+        for market, name in markets:
+            view = index['markets'].get(market) or {'by_id': {}}
+            by_id = view['by_id']
+            for k in [k for k, e in _best_index.items()
+                      if k[1] == market and e['sport'] == sport and k[0] not in by_id]:
+                del _best_index[k]
+            ids = set()
+            for gid, g in by_id.items():
+                entry = _best_index.get((gid, market))
+                if changed is None or gid in changed or entry is None:
+                    _best_index[(gid, market)] = dict(_odds_matrix(g), sport=sport, game=g)
+                    ids.add(gid)
+                else:
+                    entry['game'] = g      # same odds, fresh view object
+            if changed is not None:
+                ids |= {gid for gid in changed if gid not in by_id}
+            if ids:
+                touched[(market, name)] = (ids, [by_id[i] for i in ids if i in by_id])
+    if not touched:
+        return
+    fresh, drop = [], set()
+    for (market, name), (ids, games) in touched.items():
+        drop.update((name, gid) for gid in ids)
+        if games:
+            fresh.extend(find_game_arbs(games, name))
+    with _state_lock:
+        if not state['last_scan']:
+            return
+        keep = [o for o in state['opportunities']
+                if not (o.get('type') in ('arbitrage', 'middle')
+                        and o.get('sport_key') == sport
+                        and (o.get('market'), o.get('event_id')) in drop)]
+        state['opportunities'] = sorted(keep + fresh, key=_rank)
+
+
+providers.subscribe(_on_snapshot)
+
+
 # ============================================================
 # CLOSING LINE VALUE (CLV) CAPTURE
 # ============================================================
@@ -3742,13 +5032,21 @@ def _market_name_to_api_key(market_name):
     if 'moneyline' in mn or ' ml' in mn: return 'h2h'
     return None
 
-def update_clv():
+_clv_last_run = {}   # {'at', 'updated', 'scanned', 'fetch_sec', 'write_sec'} of the last update_clv
+
+def update_clv(event_keys=None):
     """Re-fetch odds for bets where the game is approaching tip-off, capturing
-    closing line value. Runs periodically in a background thread and on demand
-    via /api/update-clv. Only touches sports bets (player_prop, game_market)."""
+    closing line value. Runs from the kickoff scheduler (event_keys = the
+    {(sport_key, event_id)} due now) and on demand via /api/update-clv (the
+    whole window). Only touches sports bets (player_prop, game_market).
+    Closing prices are collected in memory, then written in one batch.
+    Returns this run's {'updated', 'scanned', 'fetch_sec', 'write_sec'}."""
     updated = 0
     scanned = 0
+    pending = []          # (closing_odds, clv, captured_at, id)
+    fetch_sec = write_sec = 0.0
     try:
+        t0 = time.time()
         now = datetime.now()
         future_cutoff = (now + timedelta(hours=CLV_WINDOW_HOURS_AHEAD)).isoformat()
         now_iso = now.isoformat()
@@ -3765,9 +5063,11 @@ def update_clv():
                   AND event_id != ''
                 ORDER BY commence_time ASC
             """, (now_iso, future_cutoff)).fetchall()
+        if event_keys is not None:
+            rows = [r for r in rows if (r['sport_key'], r['event_id']) in event_keys]
 
         if not rows:
-            return 0
+            return {'updated': 0, 'scanned': 0, 'fetch_sec': 0.0, 'write_sec': 0.0}
 
         log_debug(f"CLV: checking {len(rows)} opps with games starting in next {CLV_WINDOW_HOURS_AHEAD}h")
 
@@ -3848,20 +5148,32 @@ def update_clv():
                     bet_implied = american_to_implied(row['odds'])
                     close_implied = american_to_implied(closing_odds)
                     clv = round((close_implied - bet_implied) * 100, 2)
-                    with get_db() as conn2:
-                        conn2.execute("""
-                            UPDATE opportunities
-                            SET closing_odds = ?, clv = ?, clv_captured_at = ?
-                            WHERE id = ?
-                        """, (int(closing_odds), clv, datetime.now().isoformat(), row['id']))
-                    updated += 1
+                    pending.append((int(closing_odds), clv, datetime.now().isoformat(), row['id']))
                 except Exception as e:
                     log_debug(f"CLV update error for id={row['id']}: {e}")
 
-        log_debug(f"CLV: {updated}/{scanned} rows updated with closing odds")
+        fetch_sec = time.time() - t0
+        if pending:
+            t1 = time.time()
+            try:
+                with get_db() as conn:
+                    conn.executemany("""
+                        UPDATE opportunities
+                        SET closing_odds = ?, clv = ?, clv_captured_at = ?
+                        WHERE id = ?
+                    """, pending)
+                updated = len(pending)
+            except Exception as e:
+                log_debug(f"CLV write error ({len(pending)} rows): {e}")
+            write_sec = time.time() - t1
+        log_debug(f"CLV: {updated}/{scanned} rows updated with closing odds "
+                  f"(fetch {fetch_sec:.1f}s, write {write_sec:.2f}s)")
     except Exception as e:
         log_debug(f"CLV capture error: {e}")
-    return updated
+    run = {'updated': updated, 'scanned': scanned,
+           'fetch_sec': round(fetch_sec, 3), 'write_sec': round(write_sec, 3)}
+    _clv_last_run.update(run, at=datetime.now().isoformat())
+    return run
 
 
 
@@ -3979,11 +5291,9 @@ def _fetch_espn_scores(league_path, date_str, cache):
         return cache[key]
     out = []
     try:
-        r = requests.get(
-            f"https://site.api.espn.com/apis/site/v2/sports/{league_path}/scoreboard",
-            params={'dates': date_str}, timeout=15)
-        if r.status_code == 200:
-            for ev in (r.json().get('events') or []):
+        data = _espn_get(f"{league_path}/scoreboard", {'dates': date_str}, timeout=15)
+        if data is not None:
+            for ev in (data.get('events') or []):
                 for comp in (ev.get('competitions') or []):
                     st = (((comp.get('status') or {}).get('type')) or {})
                     if not st.get('completed'):
@@ -4056,6 +5366,20 @@ def grade_results(max_rows=250):
                 ORDER BY id DESC LIMIT ?
             """, (max_rows,)).fetchall()
 
+            # warm every scoreboard the game rows could need in one concurrent
+            # round; the loop below then reads them from the cache
+            boards = set()
+            for row in rows:
+                league = ESPN_SB.get(row['sport_key'] or '')
+                try:
+                    start = datetime.fromisoformat((row['commence_time'] or '').replace('Z', '+00:00'))
+                except Exception:
+                    continue
+                if league and row['bet_type'] == 'game_market' and now >= start + timedelta(hours=4):
+                    boards.update((league, (start + timedelta(days=d)).strftime('%Y%m%d'))
+                                  for d in (0, -1, 1))
+            _espn_map(lambda k: _fetch_espn_scores(k[0], k[1], cache), sorted(boards))
+
             for row in rows:
                 res = pnl = None
                 bt = row['bet_type']
@@ -4063,7 +5387,6 @@ def grade_results(max_rows=250):
                     out = _grade_kalshi_row(row)
                     if out:
                         res, pnl = out
-                    time.sleep(0.15)
                 else:
                     league = ESPN_SB.get(row['sport_key'] or '')
                     mclass = _market_name_to_api_key(row['market'])
@@ -4108,23 +5431,125 @@ def grade_results(max_rows=250):
     return graded
 
 
+# Kickoff-aware CLV scheduler: a heap of (fire_at, sport_key, event_id,
+# commence_time), fire_at = start - CLV_LEAD_SEC. Fed by log_opportunities
+# as bets are logged and by a DB refresh every CLV_REFRESH_SEC (restarts,
+# other processes). 'queued' holds every scheduled or fired key until its
+# start passes, so an event is captured once; if a capture leaves rows
+# without closing odds the event is pushed back CLV_RETRY_SEC later, for
+# as long as that is still before its start.
+_clv_sched = {'heap': [], 'queued': set(), 'lock': threading.Lock(),
+              'wake': threading.Event()}
+
+def _clv_start_ts(commence):
+    try:
+        return datetime.fromisoformat(commence.replace('Z', '+00:00')).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+def _clv_schedule(events):
+    """Queue one capture per (sport_key, event_id, commence_time) not yet
+    started; wakes the worker if the new head is earlier."""
+    sc, now = _clv_sched, time.time()
+    earlier = False
+    with sc['lock']:
+        for sport_key, event_id, commence in events:
+            key = (sport_key, event_id, commence)
+            if not (sport_key and event_id and commence) or key in sc['queued']:
+                continue
+            start = _clv_start_ts(commence)
+            if start is None or start <= now:
+                continue
+            sc['queued'].add(key)
+            fire = start - CLV_LEAD_SEC
+            earlier = earlier or not sc['heap'] or fire < sc['heap'][0][0]
+            heapq.heappush(sc['heap'], (fire, sport_key, event_id, commence))
+    if earlier:
+        sc['wake'].set()
+
+def _clv_due(now):
+    """Pop every capture firing by now + CLV_COALESCE_SEC -> {(sport_key, event_id)}."""
+    sc, out = _clv_sched, set()
+    with sc['lock']:
+        while sc['heap'] and sc['heap'][0][0] <= now + CLV_COALESCE_SEC:
+            _fire, sport_key, event_id, _ct = heapq.heappop(sc['heap'])
+            out.add((sport_key, event_id))
+    return out
+
+def _clv_requeue(fired):
+    """Re-schedule the fired {(sport_key, event_id)} whose bets still have
+    no closing odds, CLV_RETRY_SEC from now if that is before the start."""
+    if not fired:
+        return
+    now = time.time()
+    with get_db() as conn:
+        rows = conn.execute("""
+            SELECT DISTINCT sport_key, event_id, commence_time FROM opportunities
+            WHERE clv_captured_at IS NULL AND commence_time > ?
+              AND bet_type IN ('player_prop', 'game_market')
+              AND odds != 0 AND sport_key != '' AND event_id != ''
+        """, (datetime.now().isoformat(),)).fetchall()
+    sc = _clv_sched
+    with sc['lock']:
+        for sport_key, event_id, commence in rows:
+            start = _clv_start_ts(commence)
+            if (sport_key, event_id) in fired and start and now + CLV_RETRY_SEC < start:
+                heapq.heappush(sc['heap'], (now + CLV_RETRY_SEC, sport_key, event_id, commence))
+
+def _clv_refresh():
+    """Schedule every tracked event starting in the next day; forget keys
+    whose start has passed."""
+    now = datetime.now()
+    with get_db() as conn:
+        rows = conn.execute("""
+            SELECT DISTINCT sport_key, event_id, commence_time FROM opportunities
+            WHERE commence_time > ? AND commence_time < ?
+              AND bet_type IN ('player_prop', 'game_market')
+              AND sport_key != '' AND event_id != ''
+        """, (now.isoformat(), (now + timedelta(hours=24)).isoformat())).fetchall()
+    _clv_schedule((r[0], r[1], r[2]) for r in rows)
+    sc, ts = _clv_sched, time.time()
+    with sc['lock']:
+        sc['queued'] = {k for k in sc['queued'] if (_clv_start_ts(k[2]) or 0) > ts}
+
 def _clv_background_worker():
-    """Periodic CLV capture — runs in a daemon thread. Interval controlled by
-    CLV_WORKER_INTERVAL_SEC env var (default 30 min)."""
+    """CLV capture + grading daemon. Sleeps until the next scheduled capture
+    (or refresh / grading run), so closing odds are taken CLV_LEAD_SEC
+    before each start and fetches scale with the number of games."""
     # Small initial delay so we don't race app startup
     time.sleep(60)
+    next_refresh = next_grade = 0.0
     while True:
-        try:
-            update_clv()
-        except Exception as e:
-            print(f"CLV worker error: {e}", flush=True)
-        try:
-            n = grade_results()
-            if n:
-                print(f"Graded {n} settled bets", flush=True)
-        except Exception as e:
-            print(f"Grading worker error: {e}", flush=True)
-        time.sleep(CLV_WORKER_INTERVAL_SEC)
+        now = time.time()
+        if now >= next_refresh:
+            try:
+                _clv_refresh()
+            except Exception as e:
+                print(f"CLV schedule refresh error: {e}", flush=True)
+            next_refresh = now + CLV_REFRESH_SEC
+        due = _clv_due(now)
+        if due:
+            try:
+                update_clv(event_keys=due)
+            except Exception as e:
+                print(f"CLV worker error: {e}", flush=True)
+            try:
+                _clv_requeue(due)
+            except Exception as e:
+                print(f"CLV retry schedule error: {e}", flush=True)
+        if now >= next_grade:
+            try:
+                n = grade_results()
+                if n:
+                    print(f"Graded {n} settled bets", flush=True)
+            except Exception as e:
+                print(f"Grading worker error: {e}", flush=True)
+            next_grade = now + CLV_WORKER_INTERVAL_SEC
+        _clv_sched['wake'].clear()          # a schedule after this still wakes the wait
+        with _clv_sched['lock']:
+            head = _clv_sched['heap'][0][0] if _clv_sched['heap'] else float('inf')
+        wait = min(head, next_refresh, next_grade) - time.time()
+        _clv_sched['wake'].wait(max(1.0, wait))
 
 
 # Fire up the background CLV thread unless explicitly disabled
@@ -4254,17 +5679,50 @@ def api_ingest():
     if auth_err:
         return auth_err
     try:
-        payload = request.get_json(force=True, silent=True) or {}
-        n = providers.ingest_snapshot(payload)
+        # plain JSON, or gzip/zstd and/or columnar (see providers.encode_ingest_body)
+        payload = providers.decode_ingest_body(request.get_data(), request.mimetype,
+                                               request.headers.get('Content-Encoding'))
+        if payload.get('format') == 'delta':
+            n = providers.ingest_delta(payload)
+            if n is None:
+                return jsonify({'error': 'snapshot version mismatch', 'resync': True,
+                                'version': providers.ingest_version()}), 409
+        else:
+            n = providers.ingest_snapshot(payload)
+        for sk in payload.get('sports') or {}:
+            _cache_drop_sport(sk)
+        # ?scan=incremental: re-analyze just the games this push changed
+        scan = None
+        if request.args.get('scan') == 'incremental':
+            with _state_lock:
+                busy = state['scanning']
+            if busy:
+                scan = 'busy'
+            else:
+                threading.Thread(target=scan_sports_incremental, daemon=True).start()
+                scan = 'started'
         return jsonify({'success': True, 'sports_loaded': n,
+                        'version': providers.ingest_version(), 'scan': scan,
                         'feed_status': providers.status()})
     except Exception as e:
         return jsonify({'error': str(e)[:200]}), 400
 
+@app.route('/api/db-pool')
+def db_pool_status():
+    auth_err = _auth_check()
+    if auth_err:
+        return auth_err
+    if not USE_PG:
+        return jsonify({'backend': 'sqlite', 'path': DB_PATH})
+    return jsonify(dict(pg_pool_stats(), backend='postgres'))
+
+
 @app.route('/api/feed-status')
 def feed_status():
     return jsonify({'direct_feeds': providers.ENABLED,
-                    'snapshots': providers.status()})
+                    'snapshots': providers.status(),
+                    'name_cache': providers.norm_cache_stats(),
+                    'exchange_cache': dict(_xscope_last)})
 
 
 @app.route('/api/debug-odds')
@@ -4882,7 +6340,6 @@ def diagnose():
                     ms = r.json().get('markets', [])
                     if ms:
                         found_series[s] = [m.get('title', '') for m in ms[:5]]
-                time.sleep(0.5)
             except:
                 pass
         out['kalshi_sports_series'] = found_series
@@ -4891,7 +6348,7 @@ def diagnose():
 
     # Polymarket — first 30 markets
     try:
-        resp = requests.get(f"{POLYMARKET_API}/markets",
+        resp = poly_get(f"{POLYMARKET_API}/markets",
             params={'closed': 'false', 'limit': 30, 'active': 'true', 'tag': 'sports'},
             timeout=15)
         if resp.status_code == 200:
@@ -4912,7 +6369,7 @@ def diagnose():
 
     # Also try without the sports tag
     try:
-        resp = requests.get(f"{POLYMARKET_API}/markets",
+        resp = poly_get(f"{POLYMARKET_API}/markets",
             params={'closed': 'false', 'limit': 30, 'active': 'true'},
             timeout=15)
         if resp.status_code == 200:
@@ -4938,8 +6395,9 @@ def trigger_clv_update():
     auth_err = _auth_check()
     if auth_err:
         return auth_err
-    updated = update_clv()
-    return jsonify({'success': True, 'updated': updated})
+    run = update_clv()
+    return jsonify({'success': True, 'updated': run['updated'],
+                    'fetch_sec': run['fetch_sec'], 'write_sec': run['write_sec']})
 
 @app.route('/api/history')
 def history():